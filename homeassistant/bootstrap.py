@@ -20,6 +20,7 @@ from homeassistant.const import (
     REQUIRED_NEXT_PYTHON_VER,
 )
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.startup_trace import async_get_startup_trace
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.setup import (
     DATA_SETUP,
@@ -35,6 +36,9 @@ _LOGGER = logging.getLogger(__name__)
 
 ERROR_LOG_FILENAME = "home-assistant.log"
 
+# Name of the bootstrap phases in the startup trace
+TRACE_BOOTSTRAP = "bootstrap"
+
 # hass.data key for logging information.
 DATA_LOGGING = "logging"
 
@@ -78,6 +82,7 @@ async def async_setup_hass(
     """Set up Home Assistant."""
     hass = core.HomeAssistant()
     hass.config.config_dir = config_dir
+    trace = async_get_startup_trace(hass)
 
     async_enable_logging(hass, verbose, log_rotate_days, log_file, log_no_color)
 
@@ -100,7 +105,8 @@ async def async_setup_hass(
         await hass.async_add_executor_job(conf_util.process_ha_config_upgrade, hass)
 
         try:
-            config_dict = await conf_util.async_hass_config_yaml(hass)
+            with trace.span(TRACE_BOOTSTRAP, "load_configuration"):
+                config_dict = await conf_util.async_hass_config_yaml(hass)
         except HomeAssistantError as err:
             _LOGGER.error(
                 "Failed to parse configuration.yaml: %s. Activating safe mode", err,
@@ -387,45 +393,39 @@ async def _async_set_up_integrations(
     """Set up all the integrations."""
     setup_started = hass.data[DATA_SETUP_STARTED] = {}
     domains_to_setup = _get_domains(hass, config)
+    trace = async_get_startup_trace(hass)
+    resolve_start = monotonic()
 
     # Resolve all dependencies so we know all integrations
-    # that will have to be loaded and start rightaway
+    # that will have to be loaded and start rightaway. The integrations
+    # of each level of the dependency graph are fetched together.
     integration_cache: Dict[str, loader.Integration] = {}
     to_resolve = domains_to_setup
     while to_resolve:
         old_to_resolve = to_resolve
         to_resolve = set()
 
-        integrations_to_process = [
-            int_or_exc
-            for int_or_exc in await asyncio.gather(
-                *(
-                    loader.async_get_integration(hass, domain)
-                    for domain in old_to_resolve
-                ),
-                return_exceptions=True,
-            )
-            if isinstance(int_or_exc, loader.Integration)
-        ]
-        resolve_dependencies_tasks = [
-            itg.resolve_dependencies()
-            for itg in integrations_to_process
-            if not itg.all_dependencies_resolved
-        ]
-
-        if resolve_dependencies_tasks:
-            await asyncio.gather(*resolve_dependencies_tasks)
+        integrations = await loader.async_get_integrations(hass, old_to_resolve)
+        for int_or_exc in integrations.values():
+            if not isinstance(int_or_exc, loader.Integration):
+                continue
 
-        for itg in integrations_to_process:
-            integration_cache[itg.domain] = itg
+            integration_cache[int_or_exc.domain] = int_or_exc
 
-            for dep in itg.all_dependencies:
+            for dep in int_or_exc.dependencies:
                 if dep in domains_to_setup:
                     continue
 
                 domains_to_setup.add(dep)
                 to_resolve.add(dep)
 
+    # All integrations are known now, so this does not wait on the executor.
+    for itg in list(integration_cache.values()):
+        if not await itg.resolve_dependencies():
+            integration_cache.pop(itg.domain)
+
+    trace.add(TRACE_BOOTSTRAP, "resolve_integrations", resolve_start, monotonic())
+
     _LOGGER.info("Domains to be set up: %s", domains_to_setup)
 
     logging_domains = domains_to_setup & LOGGING_INTEGRATIONS
@@ -433,7 +433,10 @@ async def _async_set_up_integrations(
     # Load logging as soon as possible
     if logging_domains:
         _LOGGER.info("Setting up logging: %s", logging_domains)
-        await async_setup_multi_components(hass, logging_domains, config, setup_started)
+        with trace.span(TRACE_BOOTSTRAP, "logging"):
+            await async_setup_multi_components(
+                hass, logging_domains, config, setup_started
+            )
 
     # Start up debuggers. Start these first in case they want to wait.
     debuggers = domains_to_setup & DEBUGGER_INTEGRATIONS
@@ -477,14 +480,20 @@ async def _async_set_up_integrations(
     # Start setup
     if stage_1_domains:
         _LOGGER.info("Setting up stage 1: %s", stage_1_domains)
-        await async_setup_multi_components(hass, stage_1_domains, config, setup_started)
+        with trace.span(TRACE_BOOTSTRAP, "stage_1"):
+            await async_setup_multi_components(
+                hass, stage_1_domains, config, setup_started
+            )
 
     # Enables after dependencies
     async_set_domains_to_be_loaded(hass, stage_1_domains | stage_2_domains)
 
     if stage_2_domains:
         _LOGGER.info("Setting up stage 2: %s", stage_2_domains)
-        await async_setup_multi_components(hass, stage_2_domains, config, setup_started)
+        with trace.span(TRACE_BOOTSTRAP, "stage_2"):
+            await async_setup_multi_components(
+                hass, stage_2_domains, config, setup_started
+            )
 
     # Wrap up startup
     _LOGGER.debug("Waiting for startup to wrap up")
@@ -13,7 +13,9 @@ import voluptuous as vol
 
 from homeassistant.components import recorder
 from homeassistant.components.http import HomeAssistantView
+from homeassistant.components.recorder import statistics
 from homeassistant.components.recorder.models import (
+    StateAttributesLookup,
     States,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
@@ -28,6 +30,7 @@ from homeassistant.const import (
 )
 from homeassistant.core import Context, State, split_entity_id
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.entityfilter import generate_filter
 import homeassistant.util.dt as dt_util
 
 # mypy: allow-untyped-defs, no-check-untyped-defs
@@ -83,13 +86,20 @@ QUERY_STATES = [
     States.domain,
     States.entity_id,
     States.state,
+    # States recorded before attributes were shared keep their own copy
     States.attributes,
+    States.attributes_id,
     States.last_changed,
     States.last_updated,
     States.created,
 ]
 
 
+def _query_states(session):
+    """Return a query for states referencing their shared attributes."""
+    return session.query(*QUERY_STATES)
+
+
 def get_significant_states(hass, *args, **kwargs):
     """Wrap _get_significant_states with a sql session."""
     with session_scope(hass=hass) as session:
@@ -117,7 +127,7 @@ def _get_significant_states(
     timer_start = time.perf_counter()
 
     if significant_changes_only:
-        query = session.query(*QUERY_STATES).filter(
+        query = _query_states(session).filter(
             (
                 States.domain.in_(SIGNIFICANT_DOMAINS)
                 | (States.last_changed == States.last_updated)
@@ -125,7 +135,7 @@ def _get_significant_states(
             & (States.last_updated > start_time)
         )
     else:
-        query = session.query(*QUERY_STATES).filter(States.last_updated > start_time)
+        query = _query_states(session).filter(States.last_updated > start_time)
 
     if filters:
         query = filters.apply(query, entity_ids)
@@ -156,7 +166,7 @@ def _get_significant_states(
 def state_changes_during_period(hass, start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
     with session_scope(hass=hass) as session:
-        query = session.query(*QUERY_STATES).filter(
+        query = _query_states(session).filter(
             (States.last_changed == States.last_updated)
             & (States.last_updated > start_time)
         )
@@ -165,7 +175,7 @@ def state_changes_during_period(hass, start_time, end_time=None, entity_id=None)
             query = query.filter(States.last_updated < end_time)
 
         if entity_id is not None:
-            query = query.filter_by(entity_id=entity_id.lower())
+            query = query.filter(States.entity_id == entity_id.lower())
 
         entity_ids = [entity_id] if entity_id is not None else None
 
@@ -179,12 +189,12 @@ def get_last_state_changes(hass, number_of_states, entity_id):
     start_time = dt_util.utcnow()
 
     with session_scope(hass=hass) as session:
-        query = session.query(*QUERY_STATES).filter(
+        query = _query_states(session).filter(
             States.last_changed == States.last_updated
         )
 
         if entity_id is not None:
-            query = query.filter_by(entity_id=entity_id.lower())
+            query = query.filter(States.entity_id == entity_id.lower())
 
         entity_ids = [entity_id] if entity_id is not None else None
 
@@ -220,10 +230,18 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None, filters=None)
 
 
 def _get_states_with_session(
-    session, utc_point_in_time, entity_ids=None, run=None, filters=None
+    session,
+    utc_point_in_time,
+    entity_ids=None,
+    run=None,
+    filters=None,
+    attributes_lookup=None,
 ):
     """Return the states at a specific point in time."""
-    query = session.query(*QUERY_STATES)
+    if attributes_lookup is None:
+        attributes_lookup = StateAttributesLookup(session)
+
+    query = _query_states(session)
 
     if entity_ids and len(entity_ids) == 1:
         # Use an entirely different (and extremely fast) query if we only
@@ -236,7 +254,7 @@ def _get_states_with_session(
             .order_by(States.last_updated.desc())
             .limit(1)
         )
-        return [LazyState(row) for row in execute(query)]
+        return _lazy_states(execute(query), attributes_lookup)
 
     if run is None:
         run = recorder.run_information_with_session(session, utc_point_in_time)
@@ -284,7 +302,13 @@ def _get_states_with_session(
     if filters:
         query = filters.apply(query, entity_ids)
 
-    return [LazyState(row) for row in execute(query)]
+    return _lazy_states(execute(query), attributes_lookup)
+
+
+def _lazy_states(rows, attributes_lookup):
+    """Return states of rows with their shared attributes fetched."""
+    attributes_lookup.prefetch(row.attributes_id for row in rows)
+    return [LazyState(row, attributes_lookup) for row in rows]
 
 
 def _sorted_states_to_json(
@@ -314,12 +338,19 @@ def _sorted_states_to_json(
         for ent_id in entity_ids:
             result[ent_id] = []
 
+    attributes_lookup = StateAttributesLookup(session)
+
     # Get the states at the start time
     timer_start = time.perf_counter()
     if include_start_time_state:
         run = recorder.run_information_from_instance(hass, start_time)
         for state in _get_states_with_session(
-            session, start_time, entity_ids, run=run, filters=filters
+            session,
+            start_time,
+            entity_ids,
+            run=run,
+            filters=filters,
+            attributes_lookup=attributes_lookup,
         ):
             state.last_changed = start_time
             state.last_updated = start_time
@@ -329,6 +360,10 @@ def _sorted_states_to_json(
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug("getting %d first datapoints took %fs", len(result), elapsed)
 
+    if not minimal_response:
+        states = list(states)
+        attributes_lookup.prefetch(db_state.attributes_id for db_state in states)
+
     # Called in a tight loop so cache the function
     # here
     _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
@@ -341,7 +376,9 @@ def _sorted_states_to_json(
             ent_results.extend(
                 [
                     native_state
-                    for native_state in (LazyState(db_state) for db_state in group)
+                    for native_state in (
+                        LazyState(db_state, attributes_lookup) for db_state in group
+                    )
                     if (
                         domain != SCRIPT_DOMAIN
                         or native_state.attributes.get(ATTR_CAN_CANCEL)
@@ -355,7 +392,7 @@ def _sorted_states_to_json(
         # in-between only provide the "state" and the
         # "last_changed".
         if not ent_results:
-            ent_results.append(LazyState(next(group)))
+            ent_results.append(LazyState(next(group), attributes_lookup))
 
         prev_state = ent_results[-1]
         initial_state_count = len(ent_results)
@@ -380,7 +417,16 @@ def _sorted_states_to_json(
             # There was at least one state change
             # replace the last minimal state with
             # a full state
-            ent_results[-1] = LazyState(prev_state)
+            ent_results[-1] = LazyState(prev_state, attributes_lookup)
+
+    # Fetch the attributes while the session is open
+    # pylint: disable=protected-access
+    attributes_lookup.prefetch(
+        state._row.attributes_id
+        for ent_results in result.values()
+        for state in ent_results
+        if isinstance(state, LazyState)
+    )
 
     # Filter out the empty lists if some states had 0 results.
     return {key: val for key, val in result.items() if val}
@@ -469,6 +515,23 @@ class HistoryPeriodView(HomeAssistantView):
 
         hass = request.app["hass"]
 
+        resolution = request.query.get("resolution")
+        if resolution is not None:
+            if resolution not in statistics.PERIOD_TABLES:
+                return self.json_message("Invalid resolution", HTTP_BAD_REQUEST)
+
+            return cast(
+                web.Response,
+                await hass.async_add_executor_job(
+                    self._sorted_statistics_json,
+                    hass,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    resolution,
+                ),
+            )
+
         return cast(
             web.Response,
             await hass.async_add_executor_job(
@@ -514,20 +577,48 @@ class HistoryPeriodView(HomeAssistantView):
             elapsed = time.perf_counter() - timer_start
             _LOGGER.debug("Extracted %d states in %fs", sum(map(len, result)), elapsed)
 
-        # Optionally reorder the result to respect the ordering given
-        # by any entities explicitly included in the configuration.
-        if self.use_include_order:
-            sorted_result = []
-            for order_entity in self.filters.included_entities:
-                for state_list in result:
-                    if state_list[0].entity_id == order_entity:
-                        sorted_result.append(state_list)
-                        result.remove(state_list)
-                        break
-            sorted_result.extend(result)
-            result = sorted_result
+        return self.json(self._include_order(result, lambda item: item.entity_id))
+
+    def _sorted_statistics_json(self, hass, start_time, end_time, entity_ids, period):
+        """Fetch downsampled statistics from the database as json."""
+        timer_start = time.perf_counter()
+
+        with session_scope(hass=hass) as session:
+            result = statistics.statistics_during_period(
+                session, start_time, end_time, entity_ids, period
+            )
+
+        if not entity_ids:
+            entity_filter = self.filters.entity_filter()
+            result = {
+                entity_id: rows
+                for entity_id, rows in result.items()
+                if entity_filter(entity_id)
+            }
+
+        result = list(result.values())
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            elapsed = time.perf_counter() - timer_start
+            _LOGGER.debug(
+                "Extracted %d statistics in %fs", sum(map(len, result)), elapsed
+            )
 
-        return self.json(result)
+        return self.json(self._include_order(result, lambda item: item["entity_id"]))
+
+    def _include_order(self, result, entity_id_getter):
+        """Order the result like the entities included in the configuration."""
+        if not self.use_include_order:
+            return result
+
+        sorted_result = []
+        for order_entity in self.filters.included_entities:
+            for item_list in result:
+                if entity_id_getter(item_list[0]) == order_entity:
+                    sorted_result.append(item_list)
+                    result.remove(item_list)
+                    break
+        sorted_result.extend(result)
+        return sorted_result
 
 
 class Filters:
@@ -540,6 +631,15 @@ class Filters:
         self.included_entities = []
         self.included_domains = []
 
+    def entity_filter(self):
+        """Return a function testing an entity id against the filters."""
+        return generate_filter(
+            self.included_domains,
+            self.included_entities,
+            self.excluded_domains,
+            self.excluded_entities,
+        )
+
     def apply(self, query, entity_ids=None):
         """Apply the include/exclude filter on domains and entities on query.
 
@@ -598,6 +698,7 @@ class LazyState(State):
 
     __slots__ = [
         "_row",
+        "_attributes_lookup",
         "entity_id",
         "state",
         "_attributes",
@@ -606,9 +707,11 @@ class LazyState(State):
         "_context",
     ]
 
-    def __init__(self, row):  # pylint: disable=super-init-not-called
+    def __init__(self, row, attributes_lookup=None):
         """Init the lazy state."""
+        # pylint: disable=super-init-not-called
         self._row = row
+        self._attributes_lookup = attributes_lookup
         self.entity_id = self._row.entity_id
         self.state = self._row.state
         self._attributes = None
@@ -620,6 +723,9 @@ class LazyState(State):
     def attributes(self):
         """State attributes."""
         if not self._attributes:
+            if self._row.attributes is None and self._attributes_lookup is not None:
+                self._attributes = self._attributes_lookup.get(self._row.attributes_id)
+                return self._attributes
             try:
                 self._attributes = json.loads(self._row.attributes)
             except ValueError:
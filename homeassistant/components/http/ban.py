@@ -1,9 +1,17 @@
 """Ban logic for HTTP component."""
-from collections import defaultdict
+import asyncio
+from collections import OrderedDict
 from datetime import datetime
-from ipaddress import ip_address
+from ipaddress import (
+    IPv4Address,
+    IPv4Network,
+    IPv6Address,
+    IPv6Network,
+    ip_address,
+    ip_network,
+)
 import logging
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 from aiohttp.web import middleware
 from aiohttp.web_exceptions import HTTPForbidden, HTTPUnauthorized
@@ -25,6 +33,11 @@ _LOGGER = logging.getLogger(__name__)
 KEY_BANNED_IPS = "ha_banned_ips"
 KEY_FAILED_LOGIN_ATTEMPTS = "ha_failed_login_attempts"
 KEY_LOGIN_THRESHOLD = "ha_login_threshold"
+KEY_UNSAVED_IP_BANS = "ha_unsaved_ip_bans"
+KEY_SAVE_IP_BANS_LOCK = "ha_save_ip_bans_lock"
+
+# Number of addresses to count failed login attempts of
+FAILED_LOGIN_ATTEMPTS_CACHE_SIZE = 4096
 
 NOTIFICATION_ID_BAN = "ip-ban"
 NOTIFICATION_ID_LOGIN = "http-login"
@@ -41,13 +54,17 @@ SCHEMA_IP_BAN_ENTRY = vol.Schema(
 def setup_bans(hass, app, login_threshold):
     """Create IP Ban middleware for the app."""
     app.middlewares.append(ban_middleware)
-    app[KEY_FAILED_LOGIN_ATTEMPTS] = defaultdict(int)
+    app[KEY_FAILED_LOGIN_ATTEMPTS] = FailedLoginAttempts(
+        FAILED_LOGIN_ATTEMPTS_CACHE_SIZE
+    )
     app[KEY_LOGIN_THRESHOLD] = login_threshold
+    app[KEY_UNSAVED_IP_BANS] = []
 
     async def ban_startup(app):
         """Initialize bans when app starts up."""
-        app[KEY_BANNED_IPS] = await async_load_ip_bans_config(
-            hass, hass.config.path(IP_BANS_FILE)
+        app[KEY_SAVE_IP_BANS_LOCK] = asyncio.Lock()
+        app[KEY_BANNED_IPS] = IpBanIndex(
+            await async_load_ip_bans_config(hass, hass.config.path(IP_BANS_FILE))
         )
 
     app.on_startup.append(ban_startup)
@@ -61,12 +78,7 @@ async def ban_middleware(request, handler):
         return await handler(request)
 
     # Verify if IP is not banned
-    ip_address_ = request[KEY_REAL_IP]
-    is_banned = any(
-        ip_ban.ip_address == ip_address_ for ip_ban in request.app[KEY_BANNED_IPS]
-    )
-
-    if is_banned:
+    if request.app[KEY_BANNED_IPS].is_banned(request[KEY_REAL_IP]):
         raise HTTPForbidden()
 
     try:
@@ -109,7 +121,7 @@ async def process_wrong_login(request):
     if KEY_BANNED_IPS not in request.app or request.app[KEY_LOGIN_THRESHOLD] < 1:
         return
 
-    request.app[KEY_FAILED_LOGIN_ATTEMPTS][remote_addr] += 1
+    attempts = request.app[KEY_FAILED_LOGIN_ATTEMPTS].increment(remote_addr)
 
     # Supervisor IP should never be banned
     if "hassio" in hass.config.components and hass.components.hassio.get_supervisor_ip() == str(
@@ -117,16 +129,10 @@ async def process_wrong_login(request):
     ):
         return
 
-    if (
-        request.app[KEY_FAILED_LOGIN_ATTEMPTS][remote_addr]
-        >= request.app[KEY_LOGIN_THRESHOLD]
-    ):
+    if attempts >= request.app[KEY_LOGIN_THRESHOLD]:
         new_ban = IpBan(remote_addr)
-        request.app[KEY_BANNED_IPS].append(new_ban)
-
-        await hass.async_add_job(
-            update_ip_bans_config, hass.config.path(IP_BANS_FILE), new_ban
-        )
+        request.app[KEY_BANNED_IPS].add(new_ban)
+        async_save_ip_ban(hass, request.app, new_ban)
 
         _LOGGER.warning("Banned IP %s for too many login attempts", remote_addr)
 
@@ -160,15 +166,81 @@ async def process_success_login(request):
         request.app[KEY_FAILED_LOGIN_ATTEMPTS].pop(remote_addr)
 
 
+class FailedLoginAttempts(OrderedDict):
+    """Failed login attempts per address, forgetting the least recent first."""
+
+    def __init__(self, max_size: int) -> None:
+        """Initialize the counters."""
+        super().__init__()
+        self._max_size = max_size
+
+    def increment(self, address: Union[IPv4Address, IPv6Address]) -> int:
+        """Count a failed login attempt and return the attempts of address."""
+        attempts = self[address] = self.pop(address, 0) + 1
+        if len(self) > self._max_size:
+            self.popitem(last=False)
+        return attempts
+
+
 class IpBan:
-    """Represents banned IP address."""
+    """Represents banned IP address or network."""
 
     def __init__(self, ip_ban: str, banned_at: Optional[datetime] = None) -> None:
         """Initialize IP Ban object."""
-        self.ip_address = ip_address(ip_ban)
+        self.ip_address: Union[IPv4Address, IPv6Address, IPv4Network, IPv6Network] = (
+            ip_network(ip_ban) if "/" in str(ip_ban) else ip_address(ip_ban)
+        )
         self.banned_at = banned_at or datetime.utcnow()
 
 
+class IpBanIndex:
+    """Banned addresses and networks, looked up without scanning all bans.
+
+    Addresses are hashed. Networks are grouped by prefix length, so a lookup
+    checks one network per prefix length in use.
+    """
+
+    def __init__(self, ip_bans: Iterable[IpBan] = ()) -> None:
+        """Initialize the index."""
+        self._addresses: Dict[Union[IPv4Address, IPv6Address], IpBan] = {}
+        self._networks: Dict[Tuple[int, int], Set[Union[IPv4Network, IPv6Network]]] = {}
+        self._ip_bans: List[IpBan] = []
+        for ip_ban in ip_bans:
+            self.add(ip_ban)
+
+    def __len__(self) -> int:
+        """Return the number of bans."""
+        return len(self._ip_bans)
+
+    def __iter__(self) -> Iterator[IpBan]:
+        """Iterate over the bans."""
+        return iter(self._ip_bans)
+
+    def add(self, ip_ban: IpBan) -> None:
+        """Add a ban."""
+        self._ip_bans.append(ip_ban)
+        banned = ip_ban.ip_address
+        if isinstance(banned, (IPv4Network, IPv6Network)):
+            key = (banned.version, banned.prefixlen)
+            self._networks.setdefault(key, set()).add(banned)
+        else:
+            self._addresses[banned] = ip_ban
+
+    def is_banned(self, address: Union[IPv4Address, IPv6Address]) -> bool:
+        """Return if an address is banned."""
+        if address in self._addresses:
+            return True
+
+        for (version, prefixlen), networks in self._networks.items():
+            if (
+                version == address.version
+                and ip_network((address, prefixlen), strict=False) in networks
+            ):
+                return True
+
+        return False
+
+
 async def async_load_ip_bans_config(hass: HomeAssistant, path: str) -> List[IpBan]:
     """Load list of banned IPs from config file."""
     ip_list: List[IpBan] = []
@@ -185,20 +257,48 @@ async def async_load_ip_bans_config(hass: HomeAssistant, path: str) -> List[IpBa
         try:
             ip_info = SCHEMA_IP_BAN_ENTRY(ip_info)
             ip_list.append(IpBan(ip_ban, ip_info["banned_at"]))
-        except vol.Invalid as err:
+        except (vol.Invalid, ValueError) as err:
             _LOGGER.error("Failed to load IP ban %s: %s", ip_info, err)
             continue
 
     return ip_list
 
 
-def update_ip_bans_config(path: str, ip_ban: IpBan) -> None:
-    """Update config file with new banned IP address."""
+@callback
+def async_save_ip_ban(hass: HomeAssistant, app, ip_ban: IpBan) -> None:
+    """Save a new ban in the background.
+
+    Bans added while a save is pending are written together.
+    """
+    unsaved = app[KEY_UNSAVED_IP_BANS]
+    unsaved.append(ip_ban)
+    if len(unsaved) == 1:
+        hass.async_create_task(_async_save_ip_bans(hass, app))
+
+
+async def _async_save_ip_bans(hass: HomeAssistant, app) -> None:
+    """Append the unsaved bans to the config file."""
+    async with app[KEY_SAVE_IP_BANS_LOCK]:
+        ip_bans = app[KEY_UNSAVED_IP_BANS]
+        if not ip_bans:
+            return
+        app[KEY_UNSAVED_IP_BANS] = []
+        try:
+            await hass.async_add_executor_job(
+                update_ip_bans_config, hass.config.path(IP_BANS_FILE), ip_bans
+            )
+        except OSError as err:
+            _LOGGER.error("Unable to save IP bans: %s", err)
+
+
+def update_ip_bans_config(path: str, ip_bans: List[IpBan]) -> None:
+    """Update config file with new banned IP addresses."""
     with open(path, "a") as out:
-        ip_ = {
-            str(ip_ban.ip_address): {
-                ATTR_BANNED_AT: ip_ban.banned_at.strftime("%Y-%m-%dT%H:%M:%S")
+        for ip_ban in ip_bans:
+            ip_ = {
+                str(ip_ban.ip_address): {
+                    ATTR_BANNED_AT: ip_ban.banned_at.strftime("%Y-%m-%dT%H:%M:%S")
+                }
             }
-        }
-        out.write("\n")
-        out.write(dump(ip_))
+            out.write("\n")
+            out.write(dump(ip_))
@@ -1,22 +1,101 @@
 """Static file handling for HTTP component."""
+import asyncio
+from collections import OrderedDict
+import mimetypes
 from pathlib import Path
+from typing import Optional, Tuple
 
 from aiohttp import hdrs
 from aiohttp.web import FileResponse
-from aiohttp.web_exceptions import HTTPForbidden, HTTPNotFound
+from aiohttp.web_exceptions import HTTPForbidden, HTTPNotFound, HTTPNotModified
 from aiohttp.web_urldispatcher import StaticResource
+import attr
 
 # mypy: allow-untyped-defs
 
 CACHE_TIME = 31 * 86400  # = 1 month
 CACHE_HEADERS = {hdrs.CACHE_CONTROL: f"public, max-age={CACHE_TIME}"}
 
+# Number of resolved files to remember and how long until they are checked again
+METADATA_CACHE_SIZE = 1024
+METADATA_CACHE_TIME = 10
+
+# Precompressed siblings in order of preference
+PRECOMPRESSED_EXTENSIONS = (("br", ".br"), ("gzip", ".gz"))
+
+
+@attr.s(slots=True, frozen=True)
+class StaticFile:
+    """A resolved file to serve."""
+
+    path: Path = attr.ib()
+    content_type: str = attr.ib()
+    encoding: Optional[str] = attr.ib()
+    etag: str = attr.ib()
+    checked_at: float = attr.ib()
+
 
 class CachingStaticResource(StaticResource):
     """Static Resource handler that will add cache headers."""
 
+    def __init__(self, *args, **kwargs):
+        """Initialize the resource."""
+        super().__init__(*args, **kwargs)
+        self._file_cache: "OrderedDict[Tuple[str, Tuple[str, ...]], StaticFile]" = (
+            OrderedDict()
+        )
+
     async def _handle(self, request):
         rel_url = request.match_info["filename"]
+        accept_encoding = request.headers.get(hdrs.ACCEPT_ENCODING, "")
+        encodings = tuple(
+            encoding
+            for encoding, _ in PRECOMPRESSED_EXTENSIONS
+            if encoding in accept_encoding
+        )
+        key = (rel_url, encodings)
+        loop = asyncio.get_running_loop()
+
+        static_file = self._file_cache.get(key)
+        if (
+            static_file is None
+            or loop.time() - static_file.checked_at > METADATA_CACHE_TIME
+        ):
+            static_file = await loop.run_in_executor(
+                None, self._resolve, request, rel_url, encodings, loop.time()
+            )
+            if static_file is None:
+                # on opening a dir, load its contents if allowed
+                return await super()._handle(request)
+            self._file_cache[key] = static_file
+            if len(self._file_cache) > METADATA_CACHE_SIZE:
+                self._file_cache.popitem(last=False)
+        else:
+            self._file_cache.move_to_end(key)
+
+        headers = {
+            **CACHE_HEADERS,
+            hdrs.ETAG: static_file.etag,
+            hdrs.VARY: hdrs.ACCEPT_ENCODING,
+        }
+
+        if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+        if if_none_match is not None and _etag_matches(static_file.etag, if_none_match):
+            raise HTTPNotModified(headers=headers)
+
+        headers[hdrs.CONTENT_TYPE] = static_file.content_type
+        if static_file.encoding is not None:
+            headers[hdrs.CONTENT_ENCODING] = static_file.encoding
+
+        return FileResponse(
+            static_file.path,
+            chunk_size=self._chunk_size,
+            # type ignore: https://github.com/aio-libs/aiohttp/pull/3976
+            headers=headers,  # type: ignore
+        )
+
+    def _resolve(self, request, rel_url, encodings, now) -> Optional[StaticFile]:
+        """Resolve the file to serve, or None for a directory."""
         try:
             filename = Path(rel_url)
             if filename.anchor:
@@ -35,14 +114,43 @@ class CachingStaticResource(StaticResource):
             request.app.logger.exception(error)
             raise HTTPNotFound() from error
 
-        # on opening a dir, load its contents if allowed
         if filepath.is_dir():
-            return await super()._handle(request)
-        if filepath.is_file():
-            return FileResponse(
-                filepath,
-                chunk_size=self._chunk_size,
-                # type ignore: https://github.com/aio-libs/aiohttp/pull/3976
-                headers=CACHE_HEADERS,  # type: ignore
-            )
-        raise HTTPNotFound
+            return None
+        if not filepath.is_file():
+            raise HTTPNotFound
+
+        content_type = mimetypes.guess_type(str(filepath))[0]
+        served_path, served_encoding = filepath, None
+        for encoding, extension in PRECOMPRESSED_EXTENSIONS:
+            if encoding not in encodings:
+                continue
+            compressed_path = filepath.with_name(filepath.name + extension)
+            if compressed_path.is_file():
+                served_path, served_encoding = compressed_path, encoding
+                break
+
+        try:
+            stat = served_path.stat()
+        except OSError as error:
+            raise HTTPNotFound() from error
+
+        return StaticFile(
+            served_path,
+            content_type or "application/octet-stream",
+            served_encoding,
+            f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            now,
+        )
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """Return if an If-None-Match header matches the ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -1,10 +1,13 @@
 """Event parser and human readable log generator."""
+from collections import OrderedDict
 from datetime import timedelta
-from itertools import groupby
+from itertools import groupby, islice
 import json
 import logging
+import threading
 import time
 
+from aiohttp import hdrs, web
 import sqlalchemy
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import aliased
@@ -14,6 +17,8 @@ from homeassistant.components import sun
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
     Events,
+    StateAttributes,
+    StateAttributesLookup,
     States,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
@@ -31,6 +36,7 @@ from homeassistant.const import (
     ATTR_NAME,
     CONF_EXCLUDE,
     CONF_INCLUDE,
+    CONTENT_TYPE_JSON,
     EVENT_HOMEASSISTANT_START,
     EVENT_HOMEASSISTANT_STOP,
     EVENT_LOGBOOK_ENTRY,
@@ -50,6 +56,7 @@ from homeassistant.helpers.entityfilter import (
 from homeassistant.helpers.integration_platform import (
     async_process_integration_platforms,
 )
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.loader import bind_hass
 import homeassistant.util.dt as dt_util
 
@@ -65,6 +72,15 @@ DOMAIN = "logbook"
 
 GROUP_BY_MINUTES = 15
 
+# Number of entities to remember attributes of between requests
+ENTITY_ATTR_CACHE_SIZE = 2048
+
+# Number of entries encoded into one chunk of the streamed response
+ENTRIES_PER_CHUNK = 100
+
+# Number of rows read per query, the session is closed in between
+EVENTS_PER_QUERY = 1000
+
 EMPTY_JSON_OBJECT = "{}"
 UNIT_OF_MEASUREMENT_JSON = '"unit_of_measurement":'
 
@@ -123,7 +139,16 @@ async def async_setup(hass, config):
         message = message.async_render()
         async_log_entry(hass, name, message, domain, entity_id)
 
-    hass.http.register_view(LogbookView(config.get(DOMAIN, {})))
+    entity_attr_cache = EntityAttributeCache(hass)
+
+    @callback
+    def async_invalidate_attributes(event):
+        """Forget the cached attributes of an entity that changed."""
+        entity_attr_cache.async_invalidate(event.data[ATTR_ENTITY_ID])
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, async_invalidate_attributes)
+
+    hass.http.register_view(LogbookView(config.get(DOMAIN, {}), entity_attr_cache))
 
     hass.components.frontend.async_register_built_in_panel(
         "logbook", "logbook", "hass:format-list-bulleted-type"
@@ -154,9 +179,10 @@ class LogbookView(HomeAssistantView):
     name = "api:logbook"
     extra_urls = ["/api/logbook/{datetime}"]
 
-    def __init__(self, config):
+    def __init__(self, config, entity_attr_cache):
         """Initialize the logbook view."""
         self.config = config
+        self.entity_attr_cache = entity_attr_cache
 
     async def get(self, request, datetime=None):
         """Retrieve logbook entries."""
@@ -187,14 +213,53 @@ class LogbookView(HomeAssistantView):
                 return self.json_message("Invalid end_time", HTTP_BAD_REQUEST)
 
         hass = request.app["hass"]
-
-        def json_events():
-            """Fetch events and generate JSON."""
-            return self.json(
-                _get_events(hass, self.config, start_day, end_day, entity_id)
+        chunks = _json_chunks(
+            _get_events(
+                hass,
+                self.config,
+                start_day,
+                end_day,
+                entity_id,
+                self.entity_attr_cache,
             )
+        )
 
-        return await hass.async_add_job(json_events)
+        # Read the first rows before sending the headers, so a failing
+        # query still results in an error response
+        chunk = await hass.async_add_executor_job(next, chunks)
+
+        response = web.StreamResponse(headers={hdrs.CONTENT_TYPE: CONTENT_TYPE_JSON})
+        await response.prepare(request)
+        try:
+            while chunk is not None:
+                await response.write(chunk)
+                # Rows are read in pages, no transaction is open while writing
+                chunk = await hass.async_add_executor_job(next, chunks, None)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error streaming logbook entries")
+            # The status has been sent, leave the chunked body unterminated
+            # so the client sees the response failed instead of a short one
+            request.transport.abort()
+            return response
+
+        await response.write_eof()
+        return response
+
+
+def _json_chunks(entries):
+    """Encode logbook entries as a JSON array in chunks."""
+    entries = iter(entries)
+    prefix = b"["
+    while True:
+        batch = list(islice(entries, ENTRIES_PER_CHUNK))
+        if not batch:
+            break
+        yield prefix + b",".join(
+            json.dumps(entry, cls=JSONEncoder, allow_nan=False).encode("utf-8")
+            for entry in batch
+        )
+        prefix = b","
+    yield b"[]" if prefix == b"[" else b"]"
 
 
 def humanify(hass, events, entity_attr_cache, prev_states=None):
@@ -358,96 +423,143 @@ def _all_entities_filter(_):
     return True
 
 
-def _get_events(hass, config, start_day, end_day, entity_id=None):
-    """Get events for a period of time."""
-    entity_attr_cache = EntityAttributeCache(hass)
+def _get_events(
+    hass, config, start_day, end_day, entity_id=None, entity_attr_cache=None
+):
+    """Yield humanified events of a period of time as rows arrive.
+
+    Rows are read in pages of EVENTS_PER_QUERY, each in its own session, so
+    no transaction stays open while the entries are consumed.
+    """
+    if entity_attr_cache is None:
+        entity_attr_cache = EntityAttributeCache(hass)
 
-    def yield_events(query):
+    def yield_events():
         """Yield Events that are not filtered away."""
-        for row in query.yield_per(1000):
-            event = LazyEventPartialState(row)
-            if _keep_event(hass, event, entities_filter, entity_attr_cache):
-                yield event
-
-    with session_scope(hass=hass) as session:
-        if entity_id is not None:
-            entity_ids = [entity_id.lower()]
-            entities_filter = generate_filter([], entity_ids, [], [])
-        elif config.get(CONF_EXCLUDE) or config.get(CONF_INCLUDE):
-            entities_filter = convert_include_exclude_filter(config)
-            entity_ids = _get_related_entity_ids(session, entities_filter)
-        else:
-            entities_filter = _all_entities_filter
-            entity_ids = None
-
-        old_state = aliased(States, name="old_state")
-
-        query = (
-            session.query(
-                Events.event_type,
-                Events.event_data,
-                Events.time_fired,
-                Events.context_user_id,
-                States.state_id,
-                States.state,
-                States.entity_id,
-                States.domain,
-                States.attributes,
-                old_state.state_id.label("old_state_id"),
-            )
-            .order_by(Events.time_fired)
-            .outerjoin(States, (Events.event_id == States.event_id))
-            .outerjoin(old_state, (States.old_state_id == old_state.state_id))
-            # The below filter, removes state change events that do not have
-            # and old_state, new_state, or the old and
-            # new state are the same for v8 schema or later.
-            #
-            # If the events/states were stored before v8 schema, we relay on the
-            # prev_states dict to remove them.
-            #
-            # When all data is schema v8 or later, the check for EMPTY_JSON_OBJECT
-            # can be removed.
-            .filter(
-                (Events.event_type != EVENT_STATE_CHANGED)
-                | (Events.event_data != EMPTY_JSON_OBJECT)
-                | (
-                    (States.state_id.isnot(None))
-                    & (old_state.state_id.isnot(None))
-                    & (States.state != old_state.state)
+        after = None
+        while True:
+            with session_scope(hass=hass) as session:
+                query = _generate_events_query(
+                    hass, session, start_day, end_day, entity_ids
                 )
+                if after is not None:
+                    query = query.filter(
+                        (Events.time_fired > after.time_fired)
+                        | (
+                            (Events.time_fired == after.time_fired)
+                            & (Events.event_id > after.event_id)
+                        )
+                    )
+                rows = (
+                    query.order_by(Events.time_fired, Events.event_id)
+                    .limit(EVENTS_PER_QUERY)
+                    .all()
+                )
+                # Attributes are decoded lazily after the session is closed
+                attributes_lookup = StateAttributesLookup(session)
+                attributes_lookup.prefetch(row.attributes_id for row in rows)
+
+            for row in rows:
+                event = LazyEventPartialState(row, attributes_lookup)
+                if _keep_event(hass, event, entities_filter, entity_attr_cache):
+                    yield event
+
+            if len(rows) < EVENTS_PER_QUERY:
+                return
+            after = rows[-1]
+
+    if entity_id is not None:
+        entity_ids = [entity_id.lower()]
+        entities_filter = generate_filter([], entity_ids, [], [])
+    elif config.get(CONF_EXCLUDE) or config.get(CONF_INCLUDE):
+        entities_filter = convert_include_exclude_filter(config)
+        with session_scope(hass=hass) as session:
+            entity_ids = _get_related_entity_ids(session, entities_filter)
+    else:
+        entities_filter = _all_entities_filter
+        entity_ids = None
+
+    # When all data is schema v8 or later, prev_states can be removed
+    prev_states = {}
+    yield from humanify(hass, yield_events(), entity_attr_cache, prev_states)
+
+
+def _generate_events_query(hass, session, start_day, end_day, entity_ids):
+    """Return the query of the logbook events of a period of time."""
+    old_state = aliased(States, name="old_state")
+    # States recorded before attributes were shared keep their own copy.
+    # Only used to filter, rows reference the shared attributes by id.
+    attributes = sqlalchemy.func.coalesce(
+        States.attributes, StateAttributes.shared_attrs
+    )
+
+    query = (
+        session.query(
+            Events.event_type,
+            Events.event_data,
+            Events.time_fired,
+            Events.context_user_id,
+            Events.event_id,
+            States.state_id,
+            States.state,
+            States.entity_id,
+            States.domain,
+            States.attributes,
+            States.attributes_id,
+            old_state.state_id.label("old_state_id"),
+        )
+        .outerjoin(States, (Events.event_id == States.event_id))
+        .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+        .outerjoin(
+            StateAttributes, (States.attributes_id == StateAttributes.attributes_id),
+        )
+        # The below filter, removes state change events that do not have
+        # and old_state, new_state, or the old and
+        # new state are the same for v8 schema or later.
+        #
+        # If the events/states were stored before v8 schema, we relay on the
+        # prev_states dict to remove them.
+        #
+        # When all data is schema v8 or later, the check for EMPTY_JSON_OBJECT
+        # can be removed.
+        .filter(
+            (Events.event_type != EVENT_STATE_CHANGED)
+            | (Events.event_data != EMPTY_JSON_OBJECT)
+            | (
+                (States.state_id.isnot(None))
+                & (old_state.state_id.isnot(None))
+                & (States.state != old_state.state)
             )
-            #
-            # Prefilter out continuous domains that have
-            # ATTR_UNIT_OF_MEASUREMENT as its much faster in sql.
-            #
-            .filter(
-                (Events.event_type != EVENT_STATE_CHANGED)
-                | sqlalchemy.not_(States.domain.in_(CONTINUOUS_DOMAINS))
-                | sqlalchemy.not_(States.attributes.contains(UNIT_OF_MEASUREMENT_JSON))
-            )
-            .filter(
-                Events.event_type.in_(ALL_EVENT_TYPES + list(hass.data.get(DOMAIN, {})))
-            )
-            .filter((Events.time_fired > start_day) & (Events.time_fired < end_day))
         )
+        #
+        # Prefilter out continuous domains that have
+        # ATTR_UNIT_OF_MEASUREMENT as its much faster in sql.
+        #
+        .filter(
+            (Events.event_type != EVENT_STATE_CHANGED)
+            | sqlalchemy.not_(States.domain.in_(CONTINUOUS_DOMAINS))
+            | sqlalchemy.not_(attributes.contains(UNIT_OF_MEASUREMENT_JSON))
+        )
+        .filter(
+            Events.event_type.in_(ALL_EVENT_TYPES + list(hass.data.get(DOMAIN, {})))
+        )
+        .filter((Events.time_fired > start_day) & (Events.time_fired < end_day))
+    )
 
-        if entity_ids:
-            query = query.filter(
-                (
-                    (States.last_updated == States.last_changed)
-                    & States.entity_id.in_(entity_ids)
-                )
-                | (States.state_id.is_(None))
-            )
-        else:
-            query = query.filter(
+    if entity_ids:
+        query = query.filter(
+            (
                 (States.last_updated == States.last_changed)
-                | (States.state_id.is_(None))
+                & States.entity_id.in_(entity_ids)
             )
+            | (States.state_id.is_(None))
+        )
+    else:
+        query = query.filter(
+            (States.last_updated == States.last_changed) | (States.state_id.is_(None))
+        )
 
-        # When all data is schema v8 or later, prev_states can be removed
-        prev_states = {}
-        return list(humanify(hass, yield_events(query), entity_attr_cache, prev_states))
+    return query
 
 
 def _keep_event(hass, event, entities_filter, entity_attr_cache):
@@ -574,6 +686,7 @@ class LazyEventPartialState:
 
     __slots__ = [
         "_row",
+        "_attributes_lookup",
         "_event_data",
         "_time_fired",
         "_time_fired_isoformat",
@@ -584,9 +697,10 @@ class LazyEventPartialState:
         "domain",
     ]
 
-    def __init__(self, row):
+    def __init__(self, row, attributes_lookup=None):
         """Init the lazy event."""
         self._row = row
+        self._attributes_lookup = attributes_lookup
         self._event_data = None
         self._time_fired = None
         self._time_fired_isoformat = None
@@ -605,7 +719,10 @@ class LazyEventPartialState:
     def attributes(self):
         """State attributes."""
         if not self._attributes:
-            if (
+            if self._row.attributes is None and self._attributes_lookup is not None:
+                # Shared attributes are decoded once per query
+                self._attributes = self._attributes_lookup.get(self._row.attributes_id)
+            elif (
                 self._row.attributes is None
                 or self._row.attributes == EMPTY_JSON_OBJECT
             ):
@@ -672,31 +789,51 @@ class EntityAttributeCache:
 
     This class should not be used to lookup attributes
     that are expected to change state.
+
+    The cache is shared between requests. It remembers the attributes of
+    at most max_size entities, evicting the least recently used first, and
+    forgets an entity when it changes state.
     """
 
-    def __init__(self, hass):
+    def __init__(self, hass, max_size=ENTITY_ATTR_CACHE_SIZE):
         """Init the cache."""
         self._hass = hass
-        self._cache = {}
+        self._max_size = max_size
+        self._cache = OrderedDict()
+        # Requests read the cache in executor threads
+        self._lock = threading.Lock()
 
     def get(self, entity_id, attribute, event):
         """Lookup an attribute for an entity or get it from the cache."""
-        if entity_id in self._cache:
-            if attribute in self._cache[entity_id]:
-                return self._cache[entity_id][attribute]
-        else:
-            self._cache[entity_id] = {}
+        with self._lock:
+            attributes = self._cache.get(entity_id)
+            if attributes is not None:
+                self._cache.move_to_end(entity_id)
+                if attribute in attributes:
+                    return attributes[attribute]
 
         current_state = self._hass.states.get(entity_id)
-        if current_state:
-            # Try the current state as its faster than decoding the
-            # attributes
-            self._cache[entity_id][attribute] = current_state.attributes.get(
-                attribute, None
-            )
-        else:
-            # If the entity has been removed, decode the attributes
-            # instead
-            self._cache[entity_id][attribute] = event.attributes.get(attribute)
+        if current_state is None:
+            # The entity has been removed, decode the attributes of the
+            # event instead. They are only valid for this event, so they
+            # are not shared with other requests.
+            return event.attributes.get(attribute)
+
+        # The current state is faster than decoding the attributes
+        value = current_state.attributes.get(attribute)
+        with self._lock:
+            attributes = self._cache.get(entity_id)
+            if attributes is None:
+                attributes = self._cache[entity_id] = {}
+                if len(self._cache) > self._max_size:
+                    self._cache.popitem(last=False)
+            attributes[attribute] = value
+        return value
 
-        return self._cache[entity_id][attribute]
+    @callback
+    def async_invalidate(self, entity_id):
+        """Forget the attributes of an entity."""
+        if entity_id not in self._cache:
+            return
+        with self._lock:
+            self._cache.pop(entity_id, None)
@@ -0,0 +1,115 @@
+"""Topic trie to match MQTT messages against subscriptions."""
+from typing import Dict, Generic, List, TypeVar
+
+_T = TypeVar("_T")  # pylint: disable=invalid-name
+
+SINGLE_LEVEL_WILDCARD = "+"
+MULTI_LEVEL_WILDCARD = "#"
+
+
+class _TopicNode(Generic[_T]):
+    """Node in the topic trie representing a single topic level."""
+
+    __slots__ = ("children", "items")
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children: Dict[str, "_TopicNode[_T]"] = {}
+        self.items: List[_T] = []
+
+
+class TopicTrie(Generic[_T]):
+    """Index items by MQTT topic filter.
+
+    Matching a topic against the trie costs O(topic depth) instead of
+    testing every registered topic filter.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the trie."""
+        self._root: _TopicNode[_T] = _TopicNode()
+
+    def add(self, topic_filter: str, item: _T) -> None:
+        """Add an item for a topic filter."""
+        node = self._root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TopicNode()
+            node = child
+        node.items.append(item)
+
+    def remove(self, topic_filter: str, item: _T) -> None:
+        """Remove an item for a topic filter.
+
+        Raises KeyError if the item is not registered for the topic filter.
+        """
+        path = []
+        node = self._root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                raise KeyError(topic_filter)
+            path.append((node, level))
+            node = child
+
+        try:
+            node.items.remove(item)
+        except ValueError:
+            raise KeyError(topic_filter) from None
+
+        # Prune levels that no longer lead to any item
+        for parent, level in reversed(path):
+            child = parent.children[level]
+            if child.items or child.children:
+                break
+            del parent.children[level]
+
+    def has_topic_filter(self, topic_filter: str) -> bool:
+        """Return if any item is registered for the exact topic filter."""
+        node = self._root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                return False
+            node = child
+        return bool(node.items)
+
+    def match(self, topic: str) -> List[_T]:
+        """Return all items with a topic filter matching the topic.
+
+        Wildcards do not match topics starting with '$' on the first level.
+        """
+        matches: List[_T] = []
+        wildcards = not topic.startswith("$")
+        nodes = [self._root]
+
+        for level in topic.split("/"):
+            next_nodes = []
+            for node in nodes:
+                children = node.children
+                if not children:
+                    continue
+                child = children.get(level)
+                if child is not None:
+                    next_nodes.append(child)
+                if wildcards:
+                    child = children.get(SINGLE_LEVEL_WILDCARD)
+                    if child is not None:
+                        next_nodes.append(child)
+                    child = children.get(MULTI_LEVEL_WILDCARD)
+                    if child is not None:
+                        matches.extend(child.items)
+            if not next_nodes:
+                return matches
+            nodes = next_nodes
+            wildcards = True
+
+        for node in nodes:
+            matches.extend(node.items)
+            # A multi-level wildcard also matches its parent level
+            child = node.children.get(MULTI_LEVEL_WILDCARD)
+            if child is not None:
+                matches.extend(child.items)
+
+        return matches
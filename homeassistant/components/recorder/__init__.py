@@ -1,15 +1,16 @@
 """Support for recording details."""
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
 from datetime import datetime
 import logging
 import queue
 import threading
 import time
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from sqlalchemy import create_engine, event as sqlalchemy_event, exc, select
+import attr
+from sqlalchemy import create_engine, event as sqlalchemy_event, exc, func, select
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import StaticPool
 import voluptuous as vol
@@ -34,9 +35,9 @@ from homeassistant.helpers.entityfilter import (
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.util.dt as dt_util
 
-from . import migration, purge
+from . import migration, purge, statistics
 from .const import DATA_INSTANCE
-from .models import Base, Events, RecorderRuns, States
+from .models import Base, Events, RecorderRuns, StateAttributes, States
 from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
@@ -69,6 +70,21 @@ CONF_PURGE_KEEP_DAYS = "purge_keep_days"
 CONF_PURGE_INTERVAL = "purge_interval"
 CONF_EVENT_TYPES = "event_types"
 CONF_COMMIT_INTERVAL = "commit_interval"
+CONF_MAX_QUEUE_SIZE = "max_queue_size"
+CONF_QUEUE_OVERFLOW = "queue_overflow"
+
+QUEUE_OVERFLOW_DROP_NEW = "drop_new"
+QUEUE_OVERFLOW_DROP_OLDEST = "drop_oldest"
+
+# Maximum number of queued items processed in one go
+MAX_BATCH_SIZE = 1000
+
+# Number of attributes ids to remember to avoid looking them up
+STATE_ATTRIBUTES_ID_CACHE_SIZE = 2048
+
+# Database dialects that accept explicit primary keys, allowing the recorder
+# to assign the ids itself and insert a batch of rows with a single statement.
+EXPLICIT_ID_DIALECTS = ("mysql", "sqlite")
 
 EXCLUDE_SCHEMA = INCLUDE_EXCLUDE_FILTER_SCHEMA_INNER.extend(
     {vol.Optional(CONF_EVENT_TYPES): vol.All(cv.ensure_list, [cv.string])}
@@ -101,6 +117,10 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(
                         CONF_DB_RETRY_WAIT, default=DEFAULT_DB_RETRY_WAIT
                     ): cv.positive_int,
+                    vol.Optional(CONF_MAX_QUEUE_SIZE, default=0): cv.positive_int,
+                    vol.Optional(
+                        CONF_QUEUE_OVERFLOW, default=QUEUE_OVERFLOW_DROP_OLDEST
+                    ): vol.In([QUEUE_OVERFLOW_DROP_NEW, QUEUE_OVERFLOW_DROP_OLDEST]),
                 }
             ),
         )
@@ -158,6 +178,8 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     commit_interval = conf[CONF_COMMIT_INTERVAL]
     db_max_retries = conf[CONF_DB_MAX_RETRIES]
     db_retry_wait = conf[CONF_DB_RETRY_WAIT]
+    max_queue_size = conf[CONF_MAX_QUEUE_SIZE]
+    queue_overflow = conf[CONF_QUEUE_OVERFLOW]
 
     db_url = conf.get(CONF_DB_URL)
     if not db_url:
@@ -174,6 +196,8 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         db_retry_wait=db_retry_wait,
         entity_filter=entity_filter,
         exclude_t=exclude_t,
+        max_queue_size=max_queue_size,
+        queue_overflow=queue_overflow,
     )
     instance.async_initialize()
     instance.start()
@@ -190,6 +214,28 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
 
 PurgeTask = namedtuple("PurgeTask", ["keep_days", "repack"])
+StatisticsTask = namedtuple("StatisticsTask", ["start"])
+
+
+def _is_control_item(item) -> bool:
+    """Return if a queued item controls the recorder instead of being recorded."""
+    return (
+        item is None
+        or isinstance(item, (PurgeTask, StatisticsTask))
+        or item.event_type == EVENT_TIME_CHANGED
+    )
+
+
+@attr.s(slots=True)
+class IngestMetrics:
+    """Counters about the events written by the recorder."""
+
+    events_recorded = attr.ib(type=int, default=0)
+    states_recorded = attr.ib(type=int, default=0)
+    events_dropped = attr.ib(type=int, default=0)
+    last_batch_size = attr.ib(type=int, default=0)
+    # Events recorded per second between the last two commits
+    ingest_rate = attr.ib(type=float, default=0.0)
 
 
 class Recorder(threading.Thread):
@@ -206,6 +252,8 @@ class Recorder(threading.Thread):
         db_retry_wait: int,
         entity_filter: Callable[[str], bool],
         exclude_t: List[str],
+        max_queue_size: int,
+        queue_overflow: str,
     ) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name="Recorder")
@@ -225,10 +273,20 @@ class Recorder(threading.Thread):
 
         self.entity_filter = entity_filter
         self.exclude_t = exclude_t
-
+        self.max_queue_size = max_queue_size
+        self.queue_overflow = queue_overflow
+        self.metrics = IngestMetrics()
+        self.purge_progress: Optional[purge.PurgeProgress] = None
+
+        self._queue_overflowing = False
+        self._events_since_commit = 0
+        self._last_commit = time.monotonic()
+        self._bulk_insert = False
         self._timechanges_seen = 0
         self._keepalive_count = 0
         self._old_state_ids = {}
+        self._next_ids: Dict[str, int] = {}
+        self._state_attributes_ids: "OrderedDict[str, int]" = OrderedDict()
         self.event_session = None
         self.get_session = None
         self._completed_database_setup = False
@@ -332,83 +390,278 @@ class Recorder(threading.Thread):
                 async_purge, hour=4, minute=12, second=0
             )
 
+            # Resume a purge that was interrupted by a restart
+            if purge.purge_pending(self, self.keep_days):
+                self.queue.put(PurgeTask(self.keep_days, repack=False))
+
+        @callback
+        def async_compile_statistics(now):
+            """Trigger compiling statistics of the period that just ended."""
+            start = statistics.period_start(now, statistics.SHORT_TERM_PERIOD)
+            self.queue.put(StatisticsTask(start - statistics.SHORT_TERM_PERIOD))
+
+        # Compile statistics shortly after every 5 minute period ended
+        self.hass.helpers.event.track_utc_time_change(
+            async_compile_statistics, minute="/5", second=10
+        )
+
         self.event_session = self.get_session()
         # Use a session for the event read loop
         # with a commit every time the event time
         # has changed. This reduces the disk io.
         while True:
-            event = self.queue.get()
-            if event is None:
+            batch = [self.queue.get()]
+            # Drain everything that is waiting so rows are written in bulk
+            while len(batch) < MAX_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not self._process_batch(batch):
+                return
+
+    def _process_batch(self, batch):
+        """Process a batch of queued items in order.
+
+        Returns False when the recorder has been stopped.
+        """
+        pending = []
+
+        for item in batch:
+            if not _is_control_item(item):
+                if self._should_record(item):
+                    pending.append(item)
+                else:
+                    self.queue.task_done()
+                continue
+
+            # Keep the order of events and the items controlling the recorder
+            self._record_events(pending)
+            pending = []
+
+            if item is None:
                 self._close_run()
                 self._close_connection()
                 self.queue.task_done()
-                return
-            if isinstance(event, PurgeTask):
+                return False
+            if isinstance(item, PurgeTask):
                 # Schedule a new purge task if this one didn't finish
-                if not purge.purge_old_data(self, event.keep_days, event.repack):
-                    self.queue.put(PurgeTask(event.keep_days, event.repack))
+                if not purge.purge_old_data(self, item.keep_days, item.repack):
+                    self.queue.put(PurgeTask(item.keep_days, item.repack))
+                # Purging removes attributes no longer used by any state
+                self._state_attributes_ids.clear()
                 self.queue.task_done()
                 continue
-            if event.event_type == EVENT_TIME_CHANGED:
-                self.queue.task_done()
-                self._keepalive_count += 1
-                if self._keepalive_count >= KEEPALIVE_TIME:
-                    self._keepalive_count = 0
-                    self._send_keep_alive()
-                if self.commit_interval:
-                    self._timechanges_seen += 1
-                    if self._timechanges_seen >= self.commit_interval:
-                        self._timechanges_seen = 0
-                        self._commit_event_session_or_retry()
-                continue
-            if event.event_type in self.exclude_t:
+            if isinstance(item, StatisticsTask):
+                # Statistics are compiled from committed states
+                self._commit_event_session_or_retry()
+                statistics.compile_statistics(self, item.start)
                 self.queue.task_done()
                 continue
 
-            entity_id = event.data.get(ATTR_ENTITY_ID)
-            if entity_id is not None:
-                if not self.entity_filter(entity_id):
-                    self.queue.task_done()
-                    continue
+            self.queue.task_done()
+            self._keepalive_count += 1
+            if self._keepalive_count >= KEEPALIVE_TIME:
+                self._keepalive_count = 0
+                self._send_keep_alive()
+            if self.commit_interval:
+                self._timechanges_seen += 1
+                if self._timechanges_seen >= self.commit_interval:
+                    self._timechanges_seen = 0
+                    self._commit_event_session_or_retry()
+
+        self._record_events(pending)
+        return True
+
+    def _should_record(self, event):
+        """Return if the event passes the configured filters."""
+        if event.event_type in self.exclude_t:
+            return False
+
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        return entity_id is None or self.entity_filter(entity_id)
+
+    def _record_events(self, events):
+        """Write a batch of events to the database."""
+        if not events:
+            return
+
+        self._add_events(events)
+        self.metrics.last_batch_size = len(events)
+
+        # If they do not have a commit interval
+        # than we commit right away
+        if not self.commit_interval:
+            self._commit_event_session_or_retry()
 
+        for _ in events:
+            self.queue.task_done()
+
+    def _add_events(self, events):
+        """Add events and the states of state changes to the event session.
+
+        When the recorder can assign the row ids itself, all events and all
+        states are each inserted with a single executemany. Otherwise every
+        row has to be flushed to learn its id.
+        """
+        bulk = self._bulk_insert
+        state_changes = []
+
+        for event in events:
             try:
-                dbevent = Events.from_event(event)
                 if event.event_type == EVENT_STATE_CHANGED:
-                    dbevent.event_data = "{}"
+                    # The state is stored in the states table
+                    dbevent = Events.from_event(event, event_data="{}")
+                else:
+                    dbevent = Events.from_event(event)
+                if bulk:
+                    dbevent.event_id = self._allocate_id(Events.event_id)
                 self.event_session.add(dbevent)
-                self.event_session.flush()
+                if not bulk:
+                    self.event_session.flush()
             except (TypeError, ValueError):
                 _LOGGER.warning("Event is not JSON serializable: %s", event)
+                continue
             except Exception as err:  # pylint: disable=broad-except
                 # Must catch the exception to prevent the loop from collapsing
                 _LOGGER.exception("Error adding event: %s", err)
+                continue
 
-            if dbevent and event.event_type == EVENT_STATE_CHANGED:
-                try:
-                    dbstate = States.from_event(event)
-                    dbstate.old_state_id = self._old_state_ids.get(dbstate.entity_id)
-                    dbstate.event_id = dbevent.event_id
-                    self.event_session.add(dbstate)
-                    self.event_session.flush()
-                    if "new_state" in event.data:
-                        self._old_state_ids[dbstate.entity_id] = dbstate.state_id
-                    elif dbstate.entity_id in self._old_state_ids:
-                        del self._old_state_ids[dbstate.entity_id]
-                except (TypeError, ValueError):
-                    _LOGGER.warning(
-                        "State is not JSON serializable: %s",
-                        event.data.get("new_state"),
+            self.metrics.events_recorded += 1
+            self._events_since_commit += 1
+            if event.event_type == EVENT_STATE_CHANGED:
+                state_changes.append((event, dbevent))
+
+        if bulk and not self._flush_event_session():
+            return
+
+        pending_states = []
+
+        for event, dbevent in state_changes:
+            try:
+                shared_attrs = StateAttributes.shared_attrs_from_event(event)
+                attributes_id = self._get_attributes_id(shared_attrs)
+                if attributes_id is None:
+                    dbattrs = StateAttributes(
+                        hash=StateAttributes.hash_shared_attrs(shared_attrs),
+                        shared_attrs=shared_attrs,
                     )
-                except Exception as err:  # pylint: disable=broad-except
-                    # Must catch the exception to prevent the loop from collapsing
-                    _LOGGER.exception("Error adding state change: %s", err)
+                    if bulk:
+                        dbattrs.attributes_id = self._allocate_id(
+                            StateAttributes.attributes_id
+                        )
+                    self.event_session.add(dbattrs)
+                    if not bulk:
+                        self.event_session.flush()
+                    attributes_id = dbattrs.attributes_id
+                    self._cache_attributes_id(shared_attrs, attributes_id)
+            except (TypeError, ValueError):
+                _LOGGER.warning(
+                    "State is not JSON serializable: %s", event.data.get("new_state"),
+                )
+                continue
+            except Exception as err:  # pylint: disable=broad-except
+                # Must catch the exception to prevent the loop from collapsing
+                _LOGGER.exception("Error adding state attributes: %s", err)
+                continue
 
-            # If they do not have a commit interval
-            # than we commit right away
-            if not self.commit_interval:
-                self._commit_event_session_or_retry()
+            pending_states.append((event, dbevent, attributes_id))
 
-            self.queue.task_done()
+        if bulk and not self._flush_event_session():
+            return
+
+        for event, dbevent, attributes_id in pending_states:
+            try:
+                dbstate = States.from_event(event)
+                dbstate.old_state_id = self._old_state_ids.get(dbstate.entity_id)
+                dbstate.event_id = dbevent.event_id
+                dbstate.attributes_id = attributes_id
+                if bulk:
+                    dbstate.state_id = self._allocate_id(States.state_id)
+                self.event_session.add(dbstate)
+                if not bulk:
+                    self.event_session.flush()
+                if "new_state" in event.data:
+                    self._old_state_ids[dbstate.entity_id] = dbstate.state_id
+                elif dbstate.entity_id in self._old_state_ids:
+                    del self._old_state_ids[dbstate.entity_id]
+            except Exception as err:  # pylint: disable=broad-except
+                # Must catch the exception to prevent the loop from collapsing
+                _LOGGER.exception("Error adding state change: %s", err)
+                continue
+
+            self.metrics.states_recorded += 1
+
+        if bulk:
+            self._flush_event_session()
+
+    def _get_attributes_id(self, shared_attrs):
+        """Return the id of stored attributes or None if not stored yet."""
+        attributes_id = self._state_attributes_ids.get(shared_attrs)
+        if attributes_id is not None:
+            self._state_attributes_ids.move_to_end(shared_attrs)
+            return attributes_id
+
+        # Rows pending in this batch are in the cache, don't flush them early
+        with self.event_session.no_autoflush:
+            query = self.event_session.query(
+                StateAttributes.attributes_id, StateAttributes.shared_attrs
+            ).filter(
+                StateAttributes.hash == StateAttributes.hash_shared_attrs(shared_attrs)
+            )
+            # Compare in Python as database collations may ignore case
+            for attributes_id, stored_attrs in query:
+                if stored_attrs == shared_attrs:
+                    self._cache_attributes_id(shared_attrs, attributes_id)
+                    return attributes_id
+
+        return None
+
+    def _cache_attributes_id(self, shared_attrs, attributes_id):
+        """Remember the id of stored attributes."""
+        self._state_attributes_ids[shared_attrs] = attributes_id
+        if len(self._state_attributes_ids) > STATE_ATTRIBUTES_ID_CACHE_SIZE:
+            self._state_attributes_ids.popitem(last=False)
+
+    def _allocate_id(self, column):
+        """Return a new id for a primary key column.
+
+        The highest stored id is read once per event session, the recorder
+        is the only writer so later ids are counted in memory.
+        """
+        next_id = self._next_ids.get(column.key)
+        if next_id is None:
+            next_id = (self.event_session.query(func.max(column)).scalar() or 0) + 1
+        self._next_ids[column.key] = next_id + 1
+        return next_id
+
+    def _flush_event_session(self):
+        """Flush the pending rows of the event session.
+
+        On failure the session is rolled back, which drops all rows added
+        since the last commit.
+        """
+        try:
+            self.event_session.flush()
+            return True
+        except Exception as err:  # pylint: disable=broad-except
+            # Must catch the exception to prevent the loop from collapsing
+            _LOGGER.exception("Error adding events: %s", err)
+
+        self._forget_uncommitted()
+        try:
+            self.event_session.rollback()
+        except Exception as err:  # pylint: disable=broad-except
+            # Must catch the exception to prevent the loop from collapsing
+            _LOGGER.exception("Error while rolling back event session: %s", err)
+        return False
+
+    def _forget_uncommitted(self):
+        """Forget the ids of rows that may not have been committed."""
+        self._next_ids.clear()
+        self._old_state_ids.clear()
+        self._state_attributes_ids.clear()
 
     def _send_keep_alive(self):
         try:
@@ -460,6 +713,7 @@ class Recorder(threading.Thread):
         self._reopen_event_session()
 
     def _reopen_event_session(self):
+        self._forget_uncommitted()
         try:
             self.event_session.rollback()
         except Exception as err:  # pylint: disable=broad-except
@@ -484,13 +738,70 @@ class Recorder(threading.Thread):
         except Exception as err:
             _LOGGER.error("Error executing query: %s", err)
             self.event_session.rollback()
+            self._forget_uncommitted()
             raise
 
+        now = time.monotonic()
+        elapsed = now - self._last_commit
+        if elapsed > 0:
+            self.metrics.ingest_rate = self._events_since_commit / elapsed
+        self._last_commit = now
+        self._events_since_commit = 0
+
+    @property
+    def backlog(self) -> int:
+        """Return the number of queued items waiting to be processed."""
+        return self.queue.qsize()
+
     @callback
     def event_listener(self, event):
         """Listen for new events and put them in the process queue."""
+        if (
+            self.max_queue_size
+            and event.event_type != EVENT_TIME_CHANGED
+            and self.queue.qsize() >= self.max_queue_size
+        ):
+            self._async_handle_queue_overflow(event)
+            return
+
+        if self._queue_overflowing:
+            self._queue_overflowing = False
+            _LOGGER.info(
+                "The recorder caught up, %s events have been dropped so far",
+                self.metrics.events_dropped,
+            )
+
         self.queue.put(event)
 
+    @callback
+    def _async_handle_queue_overflow(self, event):
+        """Drop an event because the queue is full."""
+        if not self._queue_overflowing:
+            self._queue_overflowing = True
+            _LOGGER.warning(
+                "The recorder queue reached its maximum size of %s, "
+                "events are dropped until the backlog is written (%s)",
+                self.max_queue_size,
+                self.queue_overflow,
+            )
+
+        if self.queue_overflow == QUEUE_OVERFLOW_DROP_OLDEST:
+            try:
+                oldest = self.queue.get_nowait()
+            except queue.Empty:
+                # The backlog was written in the meantime
+                self.queue.put(event)
+                return
+
+            self.queue.task_done()
+            if _is_control_item(oldest):
+                # Items controlling the recorder are never dropped
+                self.queue.put(oldest)
+            else:
+                self.queue.put(event)
+
+        self.metrics.events_dropped += 1
+
     def block_till_done(self):
         """Block till all events processed."""
         self.queue.join()
@@ -534,6 +845,9 @@ class Recorder(threading.Thread):
             self.engine.dispose()
 
         self.engine = create_engine(self.db_url, **kwargs)
+        # The recorder is the only writer of events and states, on databases
+        # accepting explicit ids it assigns them to insert rows in bulk.
+        self._bulk_insert = self.engine.dialect.name in EXPLICIT_ID_DIALECTS
 
         sqlalchemy_event.listen(self.engine, "connect", setup_recorder_connection)
 
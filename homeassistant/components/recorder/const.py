@@ -1,3 +1,5 @@
 """Recorder constants."""
 
 DATA_INSTANCE = "recorder_instance"
+
+EVENT_RECORDER_PURGE_PROGRESS = "recorder_purge_progress"
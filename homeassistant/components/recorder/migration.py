@@ -287,6 +287,16 @@ def _apply_update(engine, new_version, old_version):
         _drop_index(engine, "states", "ix_states_entity_id")
         _create_index(engine, "events", "ix_events_event_type_time_fired")
         _drop_index(engine, "events", "ix_events_event_type")
+    elif new_version == 10:
+        # Attributes are stored once in the state_attributes table, which
+        # is created with the other missing tables. Existing states keep
+        # their attributes column until they are purged.
+        _add_columns(engine, "states", ["attributes_id INTEGER"])
+        _create_index(engine, "states", "ix_states_attributes_id")
+    elif new_version == 11:
+        # The statistics tables are created with the other missing tables
+        # and are filled from the time of the upgrade on
+        pass
     else:
         raise ValueError(f"No schema migration defined for version {new_version}")
 
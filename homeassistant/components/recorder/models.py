@@ -1,11 +1,14 @@
 """Models for SQLAlchemy."""
 import json
 import logging
+import zlib
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -14,6 +17,7 @@ from sqlalchemy import (
     distinct,
 )
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from sqlalchemy.orm.session import Session
 
 from homeassistant.core import Context, Event, EventOrigin, State, split_entity_id
@@ -24,12 +28,17 @@ import homeassistant.util.dt as dt_util
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 9
+SCHEMA_VERSION = 11
 
 _LOGGER = logging.getLogger(__name__)
 
 DB_TIMEZONE = "+00:00"
 
+EMPTY_JSON_OBJECT = "{}"
+
+# Number of ids per IN clause, stays below the SQLite variable limit
+MAX_IDS_PER_QUERY = 500
+
 
 class Events(Base):  # type: ignore
     """Event history data."""
@@ -52,11 +61,11 @@ class Events(Base):  # type: ignore
     )
 
     @staticmethod
-    def from_event(event):
+    def from_event(event, event_data=None):
         """Create an event database object from a native event."""
         return Events(
             event_type=event.event_type,
-            event_data=json.dumps(event.data, cls=JSONEncoder),
+            event_data=event_data or json.dumps(event.data, cls=JSONEncoder),
             origin=str(event.origin),
             time_fired=event.time_fired,
             context_id=event.context.id,
@@ -95,10 +104,15 @@ class States(Base):  # type: ignore
     state = Column(String(255))
     attributes = Column(Text)
     event_id = Column(Integer, ForeignKey("events.event_id"), index=True)
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
     last_changed = Column(DateTime(timezone=True), default=dt_util.utcnow)
     last_updated = Column(DateTime(timezone=True), default=dt_util.utcnow, index=True)
     created = Column(DateTime(timezone=True), default=dt_util.utcnow)
     old_state_id = Column(Integer)
+    # Rows sharing attributes resolve to the same object within a session
+    state_attributes = relationship("StateAttributes")
 
     __table_args__ = (
         # Used for fetching the state of entities at a specific time
@@ -108,7 +122,11 @@ class States(Base):  # type: ignore
 
     @staticmethod
     def from_event(event):
-        """Create object from a state_changed event."""
+        """Create object from a state_changed event.
+
+        The attributes are stored in the state_attributes table and
+        referenced by attributes_id.
+        """
         entity_id = event.data["entity_id"]
         state = event.data.get("new_state")
 
@@ -118,13 +136,11 @@ class States(Base):  # type: ignore
         if state is None:
             dbstate.state = ""
             dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = "{}"
             dbstate.last_changed = event.time_fired
             dbstate.last_updated = event.time_fired
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes), cls=JSONEncoder)
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
@@ -133,10 +149,16 @@ class States(Base):  # type: ignore
     def to_native(self, validate_entity_id=True):
         """Convert to an HA state object."""
         try:
+            if self.attributes:
+                attributes = json.loads(self.attributes)
+            elif self.state_attributes is not None:
+                attributes = self.state_attributes.to_native()
+            else:
+                attributes = {}
             return State(
                 self.entity_id,
                 self.state,
-                json.loads(self.attributes),
+                attributes,
                 process_timestamp(self.last_changed),
                 process_timestamp(self.last_updated),
                 # Join the events table on event_id to get the context instead
@@ -150,6 +172,140 @@ class States(Base):  # type: ignore
             return None
 
 
+class StateAttributes(Base):  # type: ignore
+    """State attributes shared between state rows with identical attributes."""
+
+    __tablename__ = "state_attributes"
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def shared_attrs_from_event(event):
+        """Return the JSON encoded attributes of a state_changed event."""
+        state = event.data.get("new_state")
+
+        # State got deleted
+        if state is None:
+            return EMPTY_JSON_OBJECT
+
+        return json.dumps(dict(state.attributes), cls=JSONEncoder)
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the hash of JSON encoded attributes."""
+        return zlib.crc32(shared_attrs.encode("utf-8"))
+
+    def to_native(self):
+        """Convert to a state attributes dictionary."""
+        try:
+            return json.loads(self.shared_attrs)
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to state attributes: %s", self)
+            return {}
+
+
+class StateAttributesLookup:
+    """Decode the shared attributes of queried states once per attributes_id.
+
+    Queries select the attributes_id of states instead of joining the
+    attributes text into every row. States with identical attributes then
+    share a single decoded dictionary.
+    """
+
+    def __init__(self, session):
+        """Initialize the lookup for a session."""
+        self._session = session
+        self._attributes = {}
+
+    def prefetch(self, attributes_ids):
+        """Fetch the attributes of ids not looked up yet with few queries."""
+        pending = list(
+            {
+                attributes_id
+                for attributes_id in attributes_ids
+                if attributes_id is not None and attributes_id not in self._attributes
+            }
+        )
+        for idx in range(0, len(pending), MAX_IDS_PER_QUERY):
+            chunk = pending[idx : idx + MAX_IDS_PER_QUERY]
+            for attributes_id in chunk:
+                self._attributes[attributes_id] = EMPTY_JSON_OBJECT
+            query = self._session.query(
+                StateAttributes.attributes_id, StateAttributes.shared_attrs
+            ).filter(StateAttributes.attributes_id.in_(chunk))
+            for attributes_id, shared_attrs in query:
+                self._attributes[attributes_id] = shared_attrs
+
+    def get(self, attributes_id):
+        """Return the decoded attributes of an attributes_id."""
+        if attributes_id is None:
+            return {}
+
+        attributes = self._attributes.get(attributes_id)
+        if attributes is None:
+            self.prefetch([attributes_id])
+            attributes = self._attributes[attributes_id]
+
+        if isinstance(attributes, str):
+            try:
+                attributes = json.loads(attributes)
+            except ValueError:
+                # When json.loads fails
+                _LOGGER.exception(
+                    "Error converting shared attributes %s to dict", attributes_id
+                )
+                attributes = {}
+            self._attributes[attributes_id] = attributes
+
+        return attributes
+
+
+class StatisticsBase:
+    """Aggregated numeric states of an entity over a period."""
+
+    id = Column(Integer, primary_key=True)
+    entity_id = Column(String(255))
+    start = Column(DateTime(timezone=True))
+    mean = Column(Float)
+    min = Column(Float)
+    max = Column(Float)
+    last = Column(Float)
+    count = Column(Integer)
+
+    def to_dict(self):
+        """Return a dictionary representation of the aggregates."""
+        return {
+            "entity_id": self.entity_id,
+            "start": process_timestamp_to_utc_isoformat(self.start),
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "last": self.last,
+        }
+
+
+class StatisticsShortTerm(StatisticsBase, Base):  # type: ignore
+    """Statistics over 5 minute periods."""
+
+    __tablename__ = "statistics_short_term"
+    __table_args__ = (
+        Index("ix_statistics_short_term_entity_id_start", "entity_id", "start"),
+        Index("ix_statistics_short_term_start", "start"),
+    )
+
+
+class Statistics(StatisticsBase, Base):  # type: ignore
+    """Statistics over hourly periods."""
+
+    __tablename__ = "statistics"
+    __table_args__ = (
+        Index("ix_statistics_entity_id_start", "entity_id", "start"),
+        Index("ix_statistics_start", "start"),
+    )
+
+
 class RecorderRuns(Base):  # type: ignore
     """Representation of recorder run."""
 
@@ -1,65 +1,113 @@
 """Purge old data helper."""
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
+import time
 
+import attr
+from sqlalchemy import exists
 from sqlalchemy.exc import SQLAlchemyError
 
 import homeassistant.util.dt as dt_util
 
-from .models import Events, RecorderRuns, States
-from .util import execute, session_scope
+from .const import EVENT_RECORDER_PURGE_PROGRESS
+from .models import Events, RecorderRuns, StateAttributes, States, StatisticsShortTerm
+from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+# Rows deleted per statement, keeps the database locked only briefly
+PURGE_BATCH_SIZE = 1000
+
+
+@attr.s(slots=True)
+class PurgeProgress:
+    """Progress of a purge spanning multiple batches."""
+
+    keep_days: int = attr.ib()
+    purge_before: datetime = attr.ib()
+    remaining: int = attr.ib()
+    started: float = attr.ib()
+    deleted: int = attr.ib(default=0)
+
+    @property
+    def rows_per_second(self) -> float:
+        """Return the number of rows deleted per second."""
+        elapsed = time.monotonic() - self.started
+        return self.deleted / elapsed if elapsed > 0 else 0.0
+
+
+def purge_pending(instance, keep_days: int) -> bool:
+    """Return if states exist that a completed nightly purge would have removed.
+
+    Used to resume a purge interrupted by a restart.
+    """
+    purge_before = dt_util.utcnow() - timedelta(days=keep_days + 1)
+    try:
+        with session_scope(session=instance.get_session()) as session:
+            query = session.query(States.state_id).filter(
+                States.last_updated < purge_before
+            )
+            return query.first() is not None
+    except SQLAlchemyError as err:
+        _LOGGER.warning("Error checking for pending purge: %s.", err)
+        return False
+
 
 def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
     """Purge events and states older than purge_days ago.
 
-    Cleans up an timeframe of an hour, based on the oldest record.
+    Deletes at most PURGE_BATCH_SIZE rows per call and returns False until
+    all old rows are removed, so the recorder can record queued events in
+    between batches. States are purged before the events they reference and
+    the attributes they share. A failed batch keeps the progress, the next
+    purge resumes from it.
     """
-    purge_before = dt_util.utcnow() - timedelta(days=purge_days)
-    _LOGGER.debug("Purging events before %s", purge_before)
+    progress = instance.purge_progress
+    if progress is None or progress.keep_days != purge_days:
+        progress = instance.purge_progress = _start_purge(instance, purge_days)
+        if progress is None:
+            return True
+
+    purge_before = progress.purge_before
 
     try:
         with session_scope(session=instance.get_session()) as session:
-            query = session.query(States).order_by(States.last_updated.asc()).limit(1)
-            states = execute(query, to_native=True, validate_entity_ids=False)
+            deleted_rows = _delete_batch(
+                session, States, States.state_id, States.last_updated, purge_before
+            )
+            _LOGGER.debug("Deleted %s states", deleted_rows)
 
-            states_purge_before = purge_before
-            if states:
-                states_purge_before = min(
-                    purge_before, states[0].last_updated + timedelta(hours=1)
+            if not deleted_rows:
+                deleted_rows = _delete_batch(
+                    session, Events, Events.event_id, Events.time_fired, purge_before
                 )
+                _LOGGER.debug("Deleted %s events", deleted_rows)
 
-            deleted_rows_states = (
-                session.query(States)
-                .filter(States.last_updated < states_purge_before)
-                .delete(synchronize_session=False)
-            )
-            _LOGGER.debug("Deleted %s states", deleted_rows_states)
-
-            query = session.query(Events).order_by(Events.time_fired.asc()).limit(1)
-            events = execute(query, to_native=True)
+            if deleted_rows:
+                progress.deleted += deleted_rows
+                progress.remaining = max(progress.remaining - deleted_rows, 0)
+                _fire_progress(instance, progress, False)
+                _LOGGER.debug("Purging hasn't fully completed yet.")
+                return False
 
-            events_purge_before = purge_before
-            if events:
-                events_purge_before = min(
-                    purge_before, events[0].time_fired + timedelta(hours=1)
+            deleted_rows = _delete_unused_attributes_batch(session)
+            _LOGGER.debug("Deleted %s state attributes", deleted_rows)
+
+            if not deleted_rows:
+                # Hourly statistics are kept, they are small compared to states
+                deleted_rows = _delete_batch(
+                    session,
+                    StatisticsShortTerm,
+                    StatisticsShortTerm.id,
+                    StatisticsShortTerm.start,
+                    purge_before,
                 )
+                _LOGGER.debug("Deleted %s short term statistics", deleted_rows)
 
-            deleted_rows_events = (
-                session.query(Events)
-                .filter(Events.time_fired < events_purge_before)
-                .delete(synchronize_session=False)
-            )
-            _LOGGER.debug("Deleted %s events", deleted_rows_events)
-
-            # If states or events purging isn't processing the purge_before yet,
-            # return false, as we are not done yet.
-            if (states_purge_before and states_purge_before != purge_before) or (
-                events_purge_before and events_purge_before != purge_before
-            ):
-                _LOGGER.debug("Purging hasn't fully completed yet.")
+            if deleted_rows:
+                # Not part of the estimate, remaining rows are left unchanged
+                progress.deleted += deleted_rows
+                _fire_progress(instance, progress, False)
                 return False
 
             # Recorder runs is small, no need to batch run it
@@ -78,9 +126,110 @@ def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
             # Optimize mysql / mariadb tables to free up space on disk
             elif instance.engine.driver in ("mysqldb", "pymysql"):
                 _LOGGER.debug("Optimizing SQL DB to free space")
-                instance.engine.execute("OPTIMIZE TABLE states, events, recorder_runs")
+                instance.engine.execute(
+                    "OPTIMIZE TABLE states, state_attributes, events, "
+                    "recorder_runs, statistics_short_term"
+                )
 
     except SQLAlchemyError as err:
         _LOGGER.warning("Error purging history: %s.", err)
-
+        _fire_progress(instance, progress, False, failed=True)
+        return True
+
+    instance.purge_progress = None
+    _fire_progress(instance, progress, True)
+    _LOGGER.debug(
+        "Purged %s rows at %.1f rows per second",
+        progress.deleted,
+        progress.rows_per_second,
+    )
     return True
+
+
+def _start_purge(instance, purge_days: int):
+    """Return the progress of a new purge or None if the database failed."""
+    purge_before = dt_util.utcnow() - timedelta(days=purge_days)
+    _LOGGER.debug("Purging events before %s", purge_before)
+
+    try:
+        with session_scope(session=instance.get_session()) as session:
+            remaining = _estimate_rows(
+                session, States.state_id, States.last_updated, purge_before
+            ) + _estimate_rows(
+                session, Events.event_id, Events.time_fired, purge_before
+            )
+    except SQLAlchemyError as err:
+        _LOGGER.warning("Error purging history: %s.", err)
+        return None
+
+    return PurgeProgress(purge_days, purge_before, remaining, time.monotonic())
+
+
+def _estimate_rows(session, id_column, time_column, purge_before) -> int:
+    """Estimate the number of rows before purge_before.
+
+    Ids grow with time, so the rows lie between the ids of the oldest and
+    the newest row before purge_before. Both are found with the index on
+    time_column, counting the rows would scan all of them.
+    """
+    old_rows = session.query(id_column).filter(time_column < purge_before)
+    first_id = old_rows.order_by(time_column, id_column).limit(1).scalar()
+    if first_id is None:
+        return 0
+    last_id = old_rows.order_by(time_column.desc(), id_column.desc()).limit(1).scalar()
+    return max(last_id - first_id + 1, 1)
+
+
+def _delete_unused_attributes_batch(session) -> int:
+    """Delete attributes no longer used by any state, at most PURGE_BATCH_SIZE."""
+    # The index on states.attributes_id makes this a lookup per attributes row
+    ids = [
+        row[0]
+        for row in session.query(StateAttributes.attributes_id)
+        .filter(~exists().where(States.attributes_id == StateAttributes.attributes_id))
+        .limit(PURGE_BATCH_SIZE)
+    ]
+    if not ids:
+        return 0
+
+    return (
+        session.query(StateAttributes)
+        .filter(StateAttributes.attributes_id.in_(ids))
+        .delete(synchronize_session=False)
+    )
+
+
+def _delete_batch(session, table, id_column, time_column, purge_before) -> int:
+    """Delete the oldest rows before purge_before, at most PURGE_BATCH_SIZE."""
+    # Select the ids first as MySQL does not support LIMIT in subqueries
+    ids = [
+        row[0]
+        for row in session.query(id_column)
+        .filter(time_column < purge_before)
+        .order_by(time_column)
+        .limit(PURGE_BATCH_SIZE)
+    ]
+    if not ids:
+        return 0
+
+    return (
+        session.query(table)
+        .filter(id_column.in_(ids))
+        .delete(synchronize_session=False)
+    )
+
+
+def _fire_progress(
+    instance, progress: PurgeProgress, finished: bool, failed: bool = False
+) -> None:
+    """Report the progress of a purge."""
+    instance.hass.bus.fire(
+        EVENT_RECORDER_PURGE_PROGRESS,
+        {
+            "deleted": progress.deleted,
+            "remaining": 0 if finished else progress.remaining,
+            "rows_per_second": round(progress.rows_per_second, 1),
+            "finished": finished,
+            "failed": failed,
+        },
+    )
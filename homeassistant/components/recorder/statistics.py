@@ -0,0 +1,242 @@
+"""Compile and query downsampled statistics of numeric states."""
+from datetime import datetime, timedelta
+from itertools import groupby
+import logging
+import math
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func
+from sqlalchemy.exc import SQLAlchemyError
+
+import homeassistant.util.dt as dt_util
+
+from .models import (
+    MAX_IDS_PER_QUERY,
+    States,
+    Statistics,
+    StatisticsShortTerm,
+    process_timestamp,
+)
+from .util import session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+PERIOD_5MINUTE = "5minute"
+PERIOD_HOUR = "hour"
+
+SHORT_TERM_PERIOD = timedelta(minutes=5)
+LONG_TERM_PERIOD = timedelta(hours=1)
+
+PERIOD_TABLES = {PERIOD_5MINUTE: StatisticsShortTerm, PERIOD_HOUR: Statistics}
+
+
+def period_start(point_in_time: datetime, period: timedelta) -> datetime:
+    """Return the start of the period containing point_in_time."""
+    point_in_time = dt_util.as_utc(point_in_time)
+    day_start = point_in_time.replace(hour=0, minute=0, second=0, microsecond=0)
+    periods = (point_in_time - day_start) // period
+    return day_start + periods * period
+
+
+def _numeric(state: Optional[str]) -> Optional[float]:
+    """Return the value of a state representing a finite number."""
+    try:
+        value = float(state)  # type: ignore
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _carried_states(session, start: datetime) -> Dict[str, Optional[str]]:
+    """Return the last state before start of entities with earlier statistics."""
+    last_start = (
+        session.query(func.max(StatisticsShortTerm.start))
+        .filter(StatisticsShortTerm.start < start)
+        .scalar()
+    )
+    if last_start is None:
+        return {}
+
+    entity_ids = [
+        row.entity_id
+        for row in session.query(StatisticsShortTerm.entity_id).filter(
+            StatisticsShortTerm.start == last_start
+        )
+    ]
+
+    carried = {}
+    for idx in range(0, len(entity_ids), MAX_IDS_PER_QUERY):
+        chunk = entity_ids[idx : idx + MAX_IDS_PER_QUERY]
+        most_recent = (
+            session.query(
+                States.entity_id.label("max_entity_id"),
+                func.max(States.last_updated).label("max_last_updated"),
+            )
+            .filter(States.entity_id.in_(chunk) & (States.last_updated < start))
+            .group_by(States.entity_id)
+            .subquery()
+        )
+        query = session.query(States.entity_id, States.state).join(
+            most_recent,
+            and_(
+                States.entity_id == most_recent.c.max_entity_id,
+                States.last_updated == most_recent.c.max_last_updated,
+            ),
+        )
+        for entity_id, state in query:
+            carried[entity_id] = state
+    return carried
+
+
+def _compile_short_term(session, start: datetime) -> List[StatisticsShortTerm]:
+    """Aggregate the numeric states of a 5 minute period.
+
+    The state an entity had when the period started counts until its first
+    change in the period, entities that did not change keep getting a row.
+    The mean is weighted by how long each value was held.
+    """
+    end = start + SHORT_TERM_PERIOD
+    carried = _carried_states(session, start)
+    query = (
+        session.query(States.entity_id, States.state, States.last_updated)
+        .filter((States.last_updated >= start) & (States.last_updated < end))
+        .order_by(States.entity_id, States.last_updated)
+    )
+    changes = {
+        entity_id: [(process_timestamp(row.last_updated), row.state) for row in group]
+        for entity_id, group in groupby(query, lambda row: row.entity_id)
+    }
+
+    rows = []
+    for entity_id in sorted(set(carried) | set(changes)):
+        samples = [(start, carried.get(entity_id))] + changes.get(entity_id, [])
+        values = []
+        weighted_sum = 0.0
+        duration = 0.0
+        for idx, (point_in_time, state) in enumerate(samples):
+            value = _numeric(state)
+            if value is None:
+                continue
+            until = samples[idx + 1][0] if idx + 1 < len(samples) else end
+            seconds = (until - point_in_time).total_seconds()
+            values.append(value)
+            weighted_sum += value * seconds
+            duration += seconds
+
+        if not values:
+            continue
+
+        rows.append(
+            StatisticsShortTerm(
+                entity_id=entity_id,
+                start=start,
+                mean=weighted_sum / duration if duration else values[-1],
+                min=min(values),
+                max=max(values),
+                last=values[-1],
+                count=len(values),
+            )
+        )
+    return rows
+
+
+def _compile_long_term(session, start: datetime) -> List[Statistics]:
+    """Aggregate the 5 minute statistics of an hour.
+
+    The 5 minute means are time weighted over equally long periods, so the
+    mean of the hour is their plain average.
+    """
+    end = start + LONG_TERM_PERIOD
+    query = (
+        session.query(StatisticsShortTerm)
+        .filter(
+            (StatisticsShortTerm.start >= start) & (StatisticsShortTerm.start < end)
+        )
+        .order_by(StatisticsShortTerm.entity_id, StatisticsShortTerm.start)
+    )
+
+    rows = []
+    for entity_id, group in groupby(query, lambda row: row.entity_id):
+        periods = list(group)
+        rows.append(
+            Statistics(
+                entity_id=entity_id,
+                start=start,
+                mean=sum(period.mean for period in periods) / len(periods),
+                min=min(period.min for period in periods),
+                max=max(period.max for period in periods),
+                last=periods[-1].last,
+                count=sum(period.count for period in periods),
+            )
+        )
+    return rows
+
+
+def _compile_missing_hours(session, end: datetime) -> None:
+    """Compile hourly statistics of the hours ended before end.
+
+    Hours missed while Home Assistant was not running are compiled from the
+    5 minute statistics that are still stored.
+    """
+    last_start = session.query(func.max(Statistics.start)).scalar()
+    if last_start is not None:
+        hour = process_timestamp(last_start) + LONG_TERM_PERIOD
+    else:
+        first_start = session.query(func.min(StatisticsShortTerm.start)).scalar()
+        if first_start is None:
+            return
+        hour = period_start(process_timestamp(first_start), LONG_TERM_PERIOD)
+
+    hour_end = period_start(end, LONG_TERM_PERIOD)
+    while hour < hour_end:
+        session.add_all(_compile_long_term(session, hour))
+        hour += LONG_TERM_PERIOD
+
+
+def compile_statistics(instance, start: datetime) -> None:
+    """Compile statistics for the 5 minute period starting at start.
+
+    Hourly statistics are compiled from the 5 minute statistics once the
+    last period of an hour has been compiled.
+    """
+    end = start + SHORT_TERM_PERIOD
+    _LOGGER.debug("Compiling statistics for %s-%s", start, end)
+
+    try:
+        with session_scope(session=instance.get_session()) as session:
+            if (
+                session.query(StatisticsShortTerm.id)
+                .filter(StatisticsShortTerm.start == start)
+                .first()
+            ):
+                _LOGGER.debug("Statistics already compiled for %s", start)
+            else:
+                session.add_all(_compile_short_term(session, start))
+                session.flush()
+
+            _compile_missing_hours(session, end)
+    except SQLAlchemyError as err:
+        _LOGGER.warning("Error compiling statistics: %s", err)
+
+
+def statistics_during_period(
+    session,
+    start_time: datetime,
+    end_time: Optional[datetime] = None,
+    entity_ids: Optional[List[str]] = None,
+    period: str = PERIOD_HOUR,
+) -> Dict[str, List[dict]]:
+    """Return statistics per entity for periods starting in the given time range."""
+    table = PERIOD_TABLES[period]
+    query = session.query(table).filter(table.start >= start_time)
+
+    if end_time is not None:
+        query = query.filter(table.start < end_time)
+
+    if entity_ids is not None:
+        query = query.filter(table.entity_id.in_(entity_ids))
+
+    result: Dict[str, List[dict]] = {}
+    for row in query.order_by(table.entity_id, table.start):
+        result.setdefault(row.entity_id, []).append(row.to_dict())
+    return result
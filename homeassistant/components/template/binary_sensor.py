@@ -1,4 +1,5 @@
 """Support for exposing a templated binary sensor."""
+from functools import partial
 import logging
 
 import voluptuous as vol
@@ -18,15 +19,18 @@ from homeassistant.const import (
     CONF_SENSORS,
     CONF_VALUE_TEMPLATE,
     EVENT_HOMEASSISTANT_START,
-    MATCH_ALL,
 )
 from homeassistant.core import callback
 from homeassistant.exceptions import TemplateError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity import async_generate_entity_id
-from homeassistant.helpers.event import async_track_same_state, async_track_state_change
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change,
+    async_track_template_result,
+)
 
-from . import extract_entities, initialise_templates
+from . import initialise_templates
 from .const import CONF_AVAILABILITY_TEMPLATE
 
 _LOGGER = logging.getLogger(__name__)
@@ -79,13 +83,8 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
         }
 
         initialise_templates(hass, templates, attribute_templates)
-        entity_ids = extract_entities(
-            device,
-            "binary sensor",
-            device_config.get(ATTR_ENTITY_ID),
-            templates,
-            attribute_templates,
-        )
+        # The states used by the templates are tracked unless configured
+        entity_ids = device_config.get(ATTR_ENTITY_ID)
 
         sensors.append(
             BinarySensorTemplate(
@@ -141,8 +140,10 @@ class BinarySensorTemplate(BinarySensorEntity):
         self._delay_on = delay_on
         self._delay_off = delay_off
         self._available = True
-        self._attribute_templates = attribute_templates
+        self._attribute_templates = attribute_templates or {}
         self._attributes = {}
+        self._delay_state = None
+        self._delay_cancel = None
 
     async def async_added_to_hass(self):
         """Register callbacks."""
@@ -155,11 +156,21 @@ class BinarySensorTemplate(BinarySensorEntity):
         @callback
         def template_bsensor_startup(event):
             """Update template on startup."""
-            if self._entities != MATCH_ALL:
-                # Track state change only for valid templates
-                async_track_state_change(
-                    self.hass, self._entities, template_bsensor_state_listener
+            if self._entities is not None:
+                self.async_on_remove(
+                    async_track_state_change(
+                        self.hass, self._entities, template_bsensor_state_listener
+                    )
                 )
+            else:
+                for template, handle_result in self._template_results():
+                    self.async_on_remove(
+                        async_track_template_result(
+                            self.hass,
+                            template,
+                            self._async_template_result_listener(handle_result),
+                        )
+                    )
 
             self.async_check_state()
 
@@ -167,6 +178,46 @@ class BinarySensorTemplate(BinarySensorEntity):
             EVENT_HOMEASSISTANT_START, template_bsensor_startup
         )
 
+    async def async_will_remove_from_hass(self):
+        """Cancel a delayed state change."""
+        if self._delay_cancel is not None:
+            self._delay_cancel()
+            self._delay_cancel = None
+
+    def _async_template_result_listener(self, handle_result):
+        """Return a listener updating the sensor with a new template result."""
+
+        @callback
+        def template_result_listener(event, result):
+            """Handle the new result of a template."""
+            handle_result(result)
+            self.async_write_ha_state()
+
+        return template_result_listener
+
+    def _template_results(self):
+        """Return the templates with the handler of their result."""
+        results = [(self._template, self._async_handle_state_result)]
+        for key, template in self._attribute_templates.items():
+            results.append(
+                (template, partial(self._async_handle_attribute_result, key))
+            )
+
+        for property_name, template in (
+            ("_icon", self._icon_template),
+            ("_entity_picture", self._entity_picture_template),
+            ("_available", self._availability_template),
+        ):
+            if template is not None:
+                results.append(
+                    (
+                        template,
+                        partial(self._async_handle_property_result, property_name),
+                    )
+                )
+
+        return results
+
     @property
     def name(self):
         """Return the name of the sensor."""
@@ -208,13 +259,14 @@ class BinarySensorTemplate(BinarySensorEntity):
         return self._available
 
     @callback
-    def _async_render(self):
-        """Get the state of template."""
-        state = None
-        try:
-            state = self._template.async_render().lower() == "true"
-        except TemplateError as ex:
-            if ex.args and ex.args[0].startswith(
+    def _async_handle_state_result(self, result):
+        """Update the state with the result of the value template.
+
+        A state change with a delay is only applied if the template keeps
+        rendering the new state for the whole delay.
+        """
+        if isinstance(result, TemplateError):
+            if result.args and result.args[0].startswith(
                 "UndefinedError: 'None' has no attribute"
             ):
                 # Common during HA startup - so just a warning
@@ -222,83 +274,86 @@ class BinarySensorTemplate(BinarySensorEntity):
                     "Could not render template %s, the state is unknown", self._name
                 )
                 return
-            _LOGGER.error("Could not render template %s: %s", self._name, ex)
-
-        attrs = {}
-        if self._attribute_templates is not None:
-            for key, value in self._attribute_templates.items():
-                try:
-                    attrs[key] = value.async_render()
-                except TemplateError as err:
-                    _LOGGER.error("Error rendering attribute %s: %s", key, err)
-            self._attributes = attrs
-
-        templates = {
-            "_icon": self._icon_template,
-            "_entity_picture": self._entity_picture_template,
-            "_available": self._availability_template,
-        }
-
-        for property_name, template in templates.items():
-            if template is None:
-                continue
-
-            try:
-                value = template.async_render()
-                if property_name == "_available":
-                    value = value.lower() == "true"
-                setattr(self, property_name, value)
-            except TemplateError as ex:
-                friendly_property_name = property_name[1:].replace("_", " ")
-                if ex.args and ex.args[0].startswith(
-                    "UndefinedError: 'None' has no attribute"
-                ):
-                    # Common during HA startup - so just a warning
-                    _LOGGER.warning(
-                        "Could not render %s template %s, the state is unknown.",
-                        friendly_property_name,
-                        self._name,
-                    )
-                else:
-                    _LOGGER.error(
-                        "Could not render %s template %s: %s",
-                        friendly_property_name,
-                        self._name,
-                        ex,
-                    )
-                return state
+            _LOGGER.error("Could not render template %s: %s", self._name, result)
+            return
 
-        return state
+        state = result.lower() == "true"
+        if self._delay_cancel is not None:
+            if state == self._delay_state:
+                return
+            self._delay_cancel()
+            self._delay_cancel = None
 
-    @callback
-    def async_check_state(self):
-        """Update the state from the template."""
-        state = self._async_render()
+        if state == self._state:
+            return
 
-        # return if the state don't change or is invalid
-        if state is None or state == self.state:
+        # state without delay
+        if (state and not self._delay_on) or (not state and not self._delay_off):
+            self._state = state
             return
 
         @callback
-        def set_state():
+        def set_state(now):
             """Set state of template binary sensor."""
+            self._delay_cancel = None
             self._state = state
             self.async_write_ha_state()
 
-        # state without delay
-        if (state and not self._delay_on) or (not state and not self._delay_off):
-            set_state()
-            return
-
         period = self._delay_on if state else self._delay_off
-        async_track_same_state(
-            self.hass,
-            period,
-            set_state,
-            entity_ids=self._entities,
-            async_check_same_func=lambda *args: self._async_render() == state,
+        self._delay_state = state
+        self._delay_cancel = async_call_later(
+            self.hass, period.total_seconds(), set_state
         )
 
+    @callback
+    def _async_handle_attribute_result(self, key, result):
+        """Update an attribute with the result of its template."""
+        if not isinstance(result, TemplateError):
+            self._attributes[key] = result
+            return
+
+        self._attributes.pop(key, None)
+        _LOGGER.error("Error rendering attribute %s: %s", key, result)
+
+    @callback
+    def _async_handle_property_result(self, property_name, result):
+        """Update a property with the result of its template."""
+        if not isinstance(result, TemplateError):
+            if property_name == "_available":
+                result = result.lower() == "true"
+            setattr(self, property_name, result)
+            return
+
+        friendly_property_name = property_name[1:].replace("_", " ")
+        if result.args and result.args[0].startswith(
+            "UndefinedError: 'None' has no attribute"
+        ):
+            # Common during HA startup - so just a warning
+            _LOGGER.warning(
+                "Could not render %s template %s, the state is unknown.",
+                friendly_property_name,
+                self._name,
+            )
+        else:
+            _LOGGER.error(
+                "Could not render %s template %s: %s",
+                friendly_property_name,
+                self._name,
+                result,
+            )
+
+    @callback
+    def async_check_state(self):
+        """Update the state from the templates."""
+        for template, handle_result in self._template_results():
+            try:
+                result = template.async_render()
+            except TemplateError as ex:
+                result = ex
+            handle_result(result)
+
+        self.async_write_ha_state()
+
     async def async_update(self):
         """Force update of the state from the template."""
         self.async_check_state()
@@ -1,4 +1,5 @@
 """Allows the creation of a sensor that breaks out state_attributes."""
+from functools import partial
 import logging
 from typing import Optional
 
@@ -20,15 +21,17 @@ from homeassistant.const import (
     CONF_SENSORS,
     CONF_VALUE_TEMPLATE,
     EVENT_HOMEASSISTANT_START,
-    MATCH_ALL,
 )
 from homeassistant.core import callback
 from homeassistant.exceptions import TemplateError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    async_track_state_change,
+    async_track_template_result,
+)
 
-from . import extract_entities, initialise_templates
+from . import initialise_templates
 from .const import CONF_AVAILABILITY_TEMPLATE
 
 CONF_ATTRIBUTE_TEMPLATES = "attribute_templates"
@@ -81,13 +84,8 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
         }
 
         initialise_templates(hass, templates, attribute_templates)
-        entity_ids = extract_entities(
-            device,
-            "sensor",
-            device_config.get(ATTR_ENTITY_ID),
-            templates,
-            attribute_templates,
-        )
+        # The states used by the templates are tracked unless configured
+        entity_ids = device_config.get(ATTR_ENTITY_ID)
 
         sensors.append(
             SensorTemplate(
@@ -161,11 +159,21 @@ class SensorTemplate(Entity):
         @callback
         def template_sensor_startup(event):
             """Update template on startup."""
-            if self._entities != MATCH_ALL:
-                # Track state change only for valid templates
-                async_track_state_change(
-                    self.hass, self._entities, template_sensor_state_listener
+            if self._entities is not None:
+                self.async_on_remove(
+                    async_track_state_change(
+                        self.hass, self._entities, template_sensor_state_listener
+                    )
                 )
+            else:
+                for template, handle_result in self._template_results():
+                    self.async_on_remove(
+                        async_track_template_result(
+                            self.hass,
+                            template,
+                            self._async_template_result_listener(handle_result),
+                        )
+                    )
 
             self.async_schedule_update_ha_state(True)
 
@@ -173,6 +181,45 @@ class SensorTemplate(Entity):
             EVENT_HOMEASSISTANT_START, template_sensor_startup
         )
 
+    def _async_template_result_listener(self, handle_result):
+        """Return a listener updating the sensor with a new template result."""
+
+        @callback
+        def template_result_listener(event, result):
+            """Handle the new result of a template."""
+            handle_result(result)
+            self.async_write_ha_state()
+
+        return template_result_listener
+
+    def _template_results(self):
+        """Return the templates with the handler of their result.
+
+        The availability template is last, it overrides the availability
+        set by the value template.
+        """
+        results = [(self._template, self._async_handle_state_result)]
+        for key, template in self._attribute_templates.items():
+            results.append(
+                (template, partial(self._async_handle_attribute_result, key))
+            )
+
+        for property_name, template in (
+            ("_icon", self._icon_template),
+            ("_entity_picture", self._entity_picture_template),
+            ("_name", self._friendly_name_template),
+            ("_available", self._availability_template),
+        ):
+            if template is not None:
+                results.append(
+                    (
+                        template,
+                        partial(self._async_handle_property_result, property_name),
+                    )
+                )
+
+        return results
+
     @property
     def name(self):
         """Return the name of the sensor."""
@@ -220,66 +267,72 @@ class SensorTemplate(Entity):
 
     async def async_update(self):
         """Update the state from the template."""
-        try:
-            self._state = self._template.async_render()
-            self._available = True
-        except TemplateError as ex:
-            self._available = False
-            if ex.args and ex.args[0].startswith(
-                "UndefinedError: 'None' has no attribute"
-            ):
-                # Common during HA startup - so just a warning
-                _LOGGER.warning(
-                    "Could not render template %s, the state is unknown.", self._name
-                )
-            else:
-                self._state = None
-                _LOGGER.error("Could not render template %s: %s", self._name, ex)
-
-        attrs = {}
-        for key, value in self._attribute_templates.items():
-            try:
-                attrs[key] = value.async_render()
-            except TemplateError as err:
-                _LOGGER.error("Error rendering attribute %s: %s", key, err)
-
-        self._attributes = attrs
-
-        templates = {
-            "_icon": self._icon_template,
-            "_entity_picture": self._entity_picture_template,
-            "_name": self._friendly_name_template,
-            "_available": self._availability_template,
-        }
-
-        for property_name, template in templates.items():
-            if template is None:
-                continue
-
+        for template, handle_result in self._template_results():
             try:
-                value = template.async_render()
-                if property_name == "_available":
-                    value = value.lower() == "true"
-                setattr(self, property_name, value)
+                result = template.async_render()
             except TemplateError as ex:
-                friendly_property_name = property_name[1:].replace("_", " ")
-                if ex.args and ex.args[0].startswith(
-                    "UndefinedError: 'None' has no attribute"
-                ):
-                    # Common during HA startup - so just a warning
-                    _LOGGER.warning(
-                        "Could not render %s template %s, the state is unknown.",
-                        friendly_property_name,
-                        self._name,
-                    )
-                    continue
-
-                try:
-                    setattr(self, property_name, getattr(super(), property_name))
-                except AttributeError:
-                    _LOGGER.error(
-                        "Could not render %s template %s: %s",
-                        friendly_property_name,
-                        self._name,
-                        ex,
-                    )
+                result = ex
+            handle_result(result)
+
+    @callback
+    def _async_handle_state_result(self, result):
+        """Update the state with the result of the value template."""
+        # An availability template overrides the availability
+        track_available = self._availability_template is None
+        if not isinstance(result, TemplateError):
+            self._state = result
+            if track_available:
+                self._available = True
+            return
+
+        ex = result
+        if track_available:
+            self._available = False
+        if ex.args and ex.args[0].startswith("UndefinedError: 'None' has no attribute"):
+            # Common during HA startup - so just a warning
+            _LOGGER.warning(
+                "Could not render template %s, the state is unknown.", self._name
+            )
+        else:
+            self._state = None
+            _LOGGER.error("Could not render template %s: %s", self._name, ex)
+
+    @callback
+    def _async_handle_attribute_result(self, key, result):
+        """Update an attribute with the result of its template."""
+        if not isinstance(result, TemplateError):
+            self._attributes[key] = result
+            return
+
+        self._attributes.pop(key, None)
+        _LOGGER.error("Error rendering attribute %s: %s", key, result)
+
+    @callback
+    def _async_handle_property_result(self, property_name, result):
+        """Update a property with the result of its template."""
+        if not isinstance(result, TemplateError):
+            if property_name == "_available":
+                result = result.lower() == "true"
+            setattr(self, property_name, result)
+            return
+
+        ex = result
+        friendly_property_name = property_name[1:].replace("_", " ")
+        if ex.args and ex.args[0].startswith("UndefinedError: 'None' has no attribute"):
+            # Common during HA startup - so just a warning
+            _LOGGER.warning(
+                "Could not render %s template %s, the state is unknown.",
+                friendly_property_name,
+                self._name,
+            )
+            return
+
+        try:
+            setattr(self, property_name, getattr(super(), property_name))
+        except AttributeError:
+            _LOGGER.error(
+                "Could not render %s template %s: %s",
+                friendly_property_name,
+                self._name,
+                ex,
+            )
@@ -9,7 +9,9 @@ from homeassistant.core import DOMAIN as HASS_DOMAIN, callback
 from homeassistant.exceptions import HomeAssistantError, ServiceNotFound, Unauthorized
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.polling import async_get_polling_stats
 from homeassistant.helpers.service import async_get_all_descriptions
+from homeassistant.helpers.startup_trace import async_get_startup_trace
 from homeassistant.loader import IntegrationNotFound, async_get_integration
 
 from . import const, decorators, messages
@@ -30,6 +32,8 @@ def async_register_commands(hass, async_reg):
     async_reg(hass, handle_render_template)
     async_reg(hass, handle_manifest_list)
     async_reg(hass, handle_manifest_get)
+    async_reg(hass, handle_startup_trace)
+    async_reg(hass, handle_polling_stats)
 
 
 def pong_message(iden):
@@ -65,7 +69,7 @@ def handle_subscribe_events(hass, connection, msg):
             ):
                 return
 
-            connection.send_message(messages.event_message(msg["id"], event))
+            connection.send_message(messages.cached_event_message(msg["id"], event))
 
     else:
 
@@ -75,7 +79,7 @@ def handle_subscribe_events(hass, connection, msg):
             if event.event_type == EVENT_TIME_CHANGED:
                 return
 
-            connection.send_message(messages.event_message(msg["id"], event.as_dict()))
+            connection.send_message(messages.cached_event_message(msg["id"], event))
 
     connection.subscriptions[msg["id"]] = hass.bus.async_listen(
         event_type, forward_events
@@ -219,6 +223,31 @@ async def handle_manifest_get(hass, connection, msg):
         connection.send_error(msg["id"], const.ERR_NOT_FOUND, "Integration not found")
 
 
+@callback
+@decorators.require_admin
+@decorators.websocket_command({vol.Required("type"): "startup/trace"})
+def handle_startup_trace(hass, connection, msg):
+    """Handle startup trace command.
+
+    The result is in the Chrome trace event format.
+    """
+    connection.send_result(msg["id"], async_get_startup_trace(hass).as_chrome_trace())
+
+
+@callback
+@decorators.require_admin
+@decorators.websocket_command({vol.Required("type"): "polling/stats"})
+def handle_polling_stats(hass, connection, msg):
+    """Handle polling stats command."""
+    connection.send_result(
+        msg["id"],
+        {
+            name: stats.as_dict()
+            for name, stats in async_get_polling_stats(hass).items()
+        },
+    )
+
+
 @callback
 @decorators.websocket_command({vol.Required("type"): "ping"})
 def handle_ping(hass, connection, msg):
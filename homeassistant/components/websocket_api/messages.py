@@ -1,7 +1,10 @@
 """Message templates for websocket commands."""
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, Union
 
 import voluptuous as vol
 
+from homeassistant.core import Event
 from homeassistant.helpers import config_validation as cv
 
 from . import const
@@ -14,6 +17,16 @@ MINIMAL_MESSAGE_SCHEMA = vol.Schema(
     extra=vol.ALLOW_EXTRA,
 )
 
+# Placeholder for the message id in cached event messages
+IDEN_TEMPLATE = "__IDEN__"
+IDEN_JSON_TEMPLATE = f'"{IDEN_TEMPLATE}"'
+
+# Number of serialized events to keep around. Events are forwarded to all
+# subscribers right after being fired, so a small cache is enough.
+EVENT_MESSAGE_CACHE_SIZE = 32
+
+_EVENT_MESSAGE_CACHE: "OrderedDict[int, Tuple[Event, str]]" = OrderedDict()
+
 # Base schema to extend by message handlers
 BASE_COMMAND_MESSAGE_SCHEMA = vol.Schema({vol.Required("id"): cv.positive_int})
 
@@ -36,3 +49,31 @@ def error_message(iden, code, message):
 def event_message(iden, event):
     """Return an event message."""
     return {"id": iden, "type": "event", "event": event}
+
+
+def cached_event_message(iden: int, event: Event) -> Union[str, Dict[str, Any]]:
+    """Return a JSON serialized event message.
+
+    The event is serialized once and shared between all connections that
+    are subscribed to it, only the message id differs per subscription.
+    If the event can't be serialized, the plain event message is returned
+    so the connection reports the error.
+    """
+    # The cache holds a reference to the event, so its id can't be reused
+    key = id(event)
+    cached = _EVENT_MESSAGE_CACHE.get(key)
+
+    if cached is not None:
+        _EVENT_MESSAGE_CACHE.move_to_end(key)
+        dumped = cached[1]
+    else:
+        try:
+            dumped = const.JSON_DUMP(event_message(IDEN_TEMPLATE, event))
+        except (ValueError, TypeError):
+            return event_message(iden, event)
+
+        _EVENT_MESSAGE_CACHE[key] = (event, dumped)
+        if len(_EVENT_MESSAGE_CACHE) > EVENT_MESSAGE_CACHE_SIZE:
+            _EVENT_MESSAGE_CACHE.popitem(last=False)
+
+    return dumped.replace(IDEN_JSON_TEMPLATE, str(iden), 1)
@@ -12,7 +12,7 @@ import attr
 from homeassistant import data_entry_flow, loader
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
-from homeassistant.helpers import entity_registry
+from homeassistant.helpers import entity_registry, startup_trace
 from homeassistant.helpers.event import Event
 from homeassistant.setup import async_process_deps_reqs, async_setup_component
 from homeassistant.util.decorator import Registry
@@ -216,9 +216,15 @@ class ConfigEntry:
                 return
 
         try:
-            result = await component.async_setup_entry(  # type: ignore
-                hass, self
-            )
+            with startup_trace.async_get_startup_trace(hass).span(
+                integration.domain,
+                startup_trace.PHASE_SETUP_ENTRY,
+                entry_id=self.entry_id,
+                title=self.title,
+            ):
+                result = await component.async_setup_entry(  # type: ignore
+                    hass, self
+                )
 
             if not isinstance(result, bool):
                 _LOGGER.error(
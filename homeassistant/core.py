@@ -28,6 +28,7 @@ from typing import (
     Mapping,
     Optional,
     Set,
+    Tuple,
     TypeVar,
     Union,
     cast,
@@ -553,7 +554,9 @@ class EventBus:
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
-        self._listeners: Dict[str, List[Callable]] = {}
+        self._listeners: Dict[
+            str, List[Tuple[Callable, Optional[Callable[[Event], bool]]]]
+        ] = {}
         self._hass = hass
 
     @callback
@@ -608,17 +611,29 @@ class EventBus:
         if not listeners:
             return
 
-        for func in listeners:
+        for func, event_filter in listeners:
+            if event_filter is not None:
+                try:
+                    if not event_filter(event):
+                        continue
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error in event filter")
+                    continue
             self._hass.async_add_job(func, event)
 
-    def listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
+    def listen(
+        self,
+        event_type: str,
+        listener: Callable,
+        event_filter: Optional[Callable[[Event], bool]] = None,
+    ) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
 
         To listen to all events specify the constant ``MATCH_ALL``
         as event_type.
         """
         async_remove_listener = run_callback_threadsafe(
-            self._hass.loop, self.async_listen, event_type, listener
+            self._hass.loop, self.async_listen, event_type, listener, event_filter
         ).result()
 
         def remove_listener() -> None:
@@ -628,22 +643,32 @@ class EventBus:
         return remove_listener
 
     @callback
-    def async_listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
+    def async_listen(
+        self,
+        event_type: str,
+        listener: Callable,
+        event_filter: Optional[Callable[[Event], bool]] = None,
+    ) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
 
         To listen to all events specify the constant ``MATCH_ALL``
         as event_type.
 
+        An event_filter is called with the event before the listener is
+        scheduled, the listener is only scheduled if it returns True. It
+        must be a cheap callback as it runs for every event of the type.
+
         This method must be run in the event loop.
         """
+        filterable_job = (listener, event_filter)
         if event_type in self._listeners:
-            self._listeners[event_type].append(listener)
+            self._listeners[event_type].append(filterable_job)
         else:
-            self._listeners[event_type] = [listener]
+            self._listeners[event_type] = [filterable_job]
 
         def remove_listener() -> None:
             """Remove the listener."""
-            self._async_remove_listener(event_type, listener)
+            self._async_remove_listener(event_type, filterable_job)
 
         return remove_listener
 
@@ -688,19 +713,23 @@ class EventBus:
             # multiple times as well.
             # This will make sure the second time it does nothing.
             setattr(onetime_listener, "run", True)
-            self._async_remove_listener(event_type, onetime_listener)
+            self._async_remove_listener(event_type, (onetime_listener, None))
             self._hass.async_run_job(listener, event)
 
         return self.async_listen(event_type, onetime_listener)
 
     @callback
-    def _async_remove_listener(self, event_type: str, listener: Callable) -> None:
+    def _async_remove_listener(
+        self,
+        event_type: str,
+        filterable_job: Tuple[Callable, Optional[Callable[[Event], bool]]],
+    ) -> None:
         """Remove a listener of a specific event_type.
 
         This method must be run in the event loop.
         """
         try:
-            self._listeners[event_type].remove(listener)
+            self._listeners[event_type].remove(filterable_job)
 
             # delete event_type list if empty
             if not self._listeners[event_type]:
@@ -708,7 +737,7 @@ class EventBus:
         except (KeyError, ValueError):
             # KeyError is key event_type listener did not exist
             # ValueError if listener did not exist within event_type
-            _LOGGER.warning("Unable to remove unknown listener %s", listener)
+            _LOGGER.warning("Unable to remove unknown listener %s", filterable_job[0])
 
 
 class State:
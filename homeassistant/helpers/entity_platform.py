@@ -1,20 +1,23 @@
 """Class to manage the entities for a single platform."""
 import asyncio
+from collections import ChainMap
 from contextvars import ContextVar
 from datetime import datetime, timedelta
 from logging import Logger
+from time import monotonic
 from types import ModuleType
 from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
 
 from homeassistant.const import DEVICE_DEFAULT_NAME
 from homeassistant.core import CALLBACK_TYPE, callback, split_entity_id, valid_entity_id
 from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
-from homeassistant.helpers import config_validation as cv, service
+from homeassistant.helpers import config_validation as cv, service, startup_trace
 from homeassistant.helpers.typing import HomeAssistantType
 from homeassistant.util.async_ import run_callback_threadsafe
 
 from .entity_registry import DISABLED_INTEGRATION
-from .event import async_call_later, async_track_time_interval
+from .event import async_call_later
+from .polling import async_track_polling
 
 if TYPE_CHECKING:
     from .entity import Entity
@@ -25,6 +28,7 @@ SLOW_SETUP_WARNING = 10
 SLOW_SETUP_MAX_WAIT = 60
 PLATFORM_NOT_READY_RETRIES = 10
 DATA_ENTITY_PLATFORM = "entity_platform"
+DATA_PENDING_ENTITY_IDS = "entity_platform_pending_entity_ids"
 
 
 class EntityPlatform:
@@ -56,9 +60,10 @@ class EntityPlatform:
         self._async_unsub_polling: Optional[CALLBACK_TYPE] = None
         # Method to cancel the retry of setup
         self._async_cancel_retry_setup: Optional[CALLBACK_TYPE] = None
-        self._process_updates: Optional[asyncio.Lock] = None
 
         self.parallel_updates: Optional[asyncio.Semaphore] = None
+        self._parallel_updates_limit: Optional[int] = None
+        self.parallel_adds: Optional[asyncio.Semaphore] = None
 
         # Platform is None for the EntityComponent "catch-all" EntityPlatform
         # which powers entity_component.add_entities
@@ -95,6 +100,7 @@ class EntityPlatform:
 
         if parallel_updates is not None:
             self.parallel_updates = asyncio.Semaphore(parallel_updates)
+            self._parallel_updates_limit = parallel_updates
 
         return self.parallel_updates
 
@@ -128,7 +134,9 @@ class EntityPlatform:
             # we don't want to track this task in case it blocks startup.
             return hass.loop.run_in_executor(
                 None,
-                platform.setup_platform,
+                startup_trace.async_get_startup_trace(hass).executor_job(
+                    self.platform_name, platform.setup_platform
+                ),
                 hass,
                 platform_config,
                 self._schedule_add_entities,
@@ -173,17 +181,22 @@ class EntityPlatform:
         )
 
         try:
-            task = async_create_setup_task()
+            with startup_trace.async_get_startup_trace(hass).span(
+                self.platform_name,
+                startup_trace.PHASE_SETUP_PLATFORM,
+                platform=self.domain,
+            ):
+                task = async_create_setup_task()
 
-            await asyncio.wait_for(asyncio.shield(task), SLOW_SETUP_MAX_WAIT)
+                await asyncio.wait_for(asyncio.shield(task), SLOW_SETUP_MAX_WAIT)
 
-            # Block till all entities are done
-            if self._tasks:
-                pending = [task for task in self._tasks if not task.done()]
-                self._tasks.clear()
+                # Block till all entities are done
+                if self._tasks:
+                    pending = [task for task in self._tasks if not task.done()]
+                    self._tasks.clear()
 
-                if pending:
-                    await asyncio.gather(*pending)
+                    if pending:
+                        await asyncio.gather(*pending)
 
             hass.config.components.add(full_name)
             return True
@@ -268,6 +281,10 @@ class EntityPlatform:
     ) -> None:
         """Add entities for a single platform async.
 
+        Entity IDs are resolved against the registries in a single pass, the
+        entities are then added to Home Assistant concurrently and their first
+        states are written together.
+
         This method must be run in the event loop.
         """
         # handle empty list from component/platform
@@ -275,54 +292,138 @@ class EntityPlatform:
             return
 
         hass = self.hass
+        start = monotonic()
 
         device_registry = await hass.helpers.device_registry.async_get_registry()
         entity_registry = await hass.helpers.entity_registry.async_get_registry()
-        tasks = [
-            self._async_add_entity(  # type: ignore
-                entity, update_before_add, entity_registry, device_registry
+
+        entities = list(new_entities)
+        for entity in entities:
+            if entity is None:
+                raise ValueError("Entity cannot be None")
+
+            entity.hass = hass
+            entity.platform = self
+            entity.parallel_updates = self._get_parallel_updates_semaphore(
+                hasattr(entity, "async_update")
             )
-            for entity in new_entities
-        ]
+
+        # Update properties before we generate the entity_id
+        if update_before_add:
+            updated = await asyncio.gather(
+                *[self._async_update_before_add(entity) for entity in entities]
+            )
+            entities = [entity for entity, ok in zip(entities, updated) if ok]
 
         # No entities for processing
-        if not tasks:
+        if not entities:
             return
 
-        await asyncio.gather(*tasks)
+        # Entity IDs that are claimed by any platform but have no state yet
+        pending_entity_ids: Dict[str, "Entity"] = hass.data.setdefault(
+            DATA_PENDING_ENTITY_IDS, {}
+        )
+        known_object_ids = ChainMap(self.entities, pending_entity_ids)
+        errors: List[Exception] = []
+        added: List["Entity"] = []
+
+        try:
+            for entity in entities:
+                try:
+                    if self._async_resolve_entity(
+                        entity, entity_registry, device_registry, known_object_ids
+                    ):
+                        added.append(entity)
+                        pending_entity_ids[entity.entity_id] = entity
+                except Exception as err:  # pylint: disable=broad-except
+                    errors.append(err)
+
+            semaphore = self._get_parallel_adds_semaphore()
+            if len(added) == 1:
+                # Not worth scheduling a task for a single entity
+                results = [await self._async_added_to_hass(added[0], semaphore)]
+            else:
+                results = await asyncio.gather(
+                    *[self._async_added_to_hass(entity, semaphore) for entity in added]
+                )
+
+            for entity, error in zip(added, results):
+                if error is not None:
+                    errors.append(error)
+                    continue
+                try:
+                    entity.async_write_ha_state()
+                except Exception as err:  # pylint: disable=broad-except
+                    errors.append(err)
+        finally:
+            for entity in added:
+                pending_entity_ids.pop(entity.entity_id, None)
+
+        end = monotonic()
+        startup_trace.async_get_startup_trace(hass).add(
+            self.platform_name,
+            startup_trace.PHASE_ADD_ENTITIES,
+            start,
+            end,
+            platform=self.domain,
+            entities=len(added),
+            entities_per_second=round(len(added) / max(end - start, 1e-6)),
+        )
+        self.logger.debug(
+            "Added %d %s.%s entities in %.3f seconds",
+            len(added),
+            self.domain,
+            self.platform_name,
+            end - start,
+        )
 
-        if self._async_unsub_polling is not None or not any(
+        if self._async_unsub_polling is None and any(
             entity.should_poll for entity in self.entities.values()
         ):
-            return
+            self._async_unsub_polling = async_track_polling(
+                self.hass,
+                f"{self.domain}.{self.platform_name}",
+                self._update_entity_states,
+                self.scan_interval,
+            )
 
-        self._async_unsub_polling = async_track_time_interval(
-            self.hass, self._update_entity_states, self.scan_interval,
-        )
+        if errors:
+            raise errors[0]
 
-    async def _async_add_entity(
-        self, entity, update_before_add, entity_registry, device_registry
-    ):
-        """Add an entity to the platform."""
-        if entity is None:
-            raise ValueError("Entity cannot be None")
-
-        entity.hass = self.hass
-        entity.platform = self
-        entity.parallel_updates = self._get_parallel_updates_semaphore(
-            hasattr(entity, "async_update")
-        )
+    @callback
+    def _get_parallel_adds_semaphore(self) -> Optional[asyncio.Semaphore]:
+        """Get or create a semaphore for adding entities in parallel.
 
-        # Update properties before we generate the entity_id
-        if update_before_add:
-            try:
-                await entity.async_device_update(warning=False)
-            except Exception:  # pylint: disable=broad-except
-                self.logger.exception("%s: Error on device update!", self.platform_name)
-                entity.hass = None
-                entity.platform = None
-                return
+        Platforms can set PARALLEL_ADDS to limit how many entities run
+        async_added_to_hass at the same time. By default there is no limit.
+        """
+        if self.parallel_adds is None:
+            parallel_adds = getattr(self.platform, "PARALLEL_ADDS", None)
+            if parallel_adds:
+                self.parallel_adds = asyncio.Semaphore(parallel_adds)
+
+        return self.parallel_adds
+
+    async def _async_update_before_add(self, entity: "Entity") -> bool:
+        """Update an entity before it is added, return if it succeeded."""
+        try:
+            await entity.async_device_update(warning=False)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception("%s: Error on device update!", self.platform_name)
+            entity.hass = None
+            entity.platform = None
+            return False
 
+        return True
+
+    @callback
+    def _async_resolve_entity(
+        self, entity, entity_registry, device_registry, known_object_ids
+    ) -> bool:
+        """Resolve the entity ID of an entity and claim it for the platform.
+
+        Return False if the entity should not be added.
+        """
         suggested_object_id = None
 
         # Get entity_id from unique ID registration
@@ -373,7 +474,7 @@ class EntityPlatform:
                 suggested_object_id=suggested_object_id,
                 config_entry=self.config_entry,
                 device_id=device_id,
-                known_object_ids=self.entities.keys(),
+                known_object_ids=known_object_ids,
                 disabled_by=disabled_by,
                 capabilities=entity.capability_attributes,
                 supported_features=entity.supported_features,
@@ -395,7 +496,7 @@ class EntityPlatform:
                 )
                 entity.hass = None
                 entity.platform = None
-                return
+                return False
 
         # We won't generate an entity ID if the platform has already set one
         # We will however make sure that platform cannot pick a registered ID
@@ -415,7 +516,7 @@ class EntityPlatform:
             if self.entity_namespace is not None:
                 suggested_object_id = f"{self.entity_namespace} {suggested_object_id}"
             entity.entity_id = entity_registry.async_generate_entity_id(
-                self.domain, suggested_object_id, self.entities.keys()
+                self.domain, suggested_object_id, known_object_ids
             )
 
         # Make sure it is valid in case an entity set the value themselves
@@ -424,7 +525,7 @@ class EntityPlatform:
             entity.platform = None
             raise HomeAssistantError(f"Invalid entity id: {entity.entity_id}")
 
-        already_exists = entity.entity_id in self.entities
+        already_exists = entity.entity_id in known_object_ids
 
         if not already_exists:
             existing = self.hass.states.get(entity.entity_id)
@@ -439,16 +540,35 @@ class EntityPlatform:
             self.logger.error(msg)
             entity.hass = None
             entity.platform = None
-            return
+            return False
 
         entity_id = entity.entity_id
         self.entities[entity_id] = entity
         entity.async_on_remove(lambda: self.entities.pop(entity_id))
 
-        await entity.async_internal_added_to_hass()
-        await entity.async_added_to_hass()
+        return True
+
+    @staticmethod
+    async def _async_added_to_hass(
+        entity: "Entity", semaphore: Optional[asyncio.Semaphore]
+    ) -> Optional[Exception]:
+        """Run the added to hass callbacks of an entity.
+
+        Return the error if one of them failed.
+        """
+        try:
+            if semaphore is None:
+                await entity.async_internal_added_to_hass()
+                await entity.async_added_to_hass()
+                return None
+
+            async with semaphore:
+                await entity.async_internal_added_to_hass()
+                await entity.async_added_to_hass()
+        except Exception as err:  # pylint: disable=broad-except
+            return err
 
-        entity.async_write_ha_state()
+        return None
 
     async def async_reset(self) -> None:
         """Remove all entities and reset data.
@@ -530,30 +650,71 @@ class EntityPlatform:
         """Update the states of all the polling entities.
 
         To protect from flooding the executor, we will update async entities
-        in parallel and other entities sequential.
+        in parallel and batch the updates of other entities into as many
+        executor jobs as the platform allows parallel updates.
 
         This method must be run in the event loop.
         """
-        if self._process_updates is None:
-            self._process_updates = asyncio.Lock()
-        if self._process_updates.locked():
-            self.logger.warning(
-                "Updating %s %s took longer than the scheduled update interval %s",
-                self.platform_name,
-                self.domain,
-                self.scan_interval,
+        tasks = []
+        sync_entities = []
+        for entity in self.entities.values():
+            if not entity.should_poll:
+                continue
+            if (
+                self._parallel_updates_limit is not None
+                and not hasattr(entity, "async_update")
+                and hasattr(entity, "update")
+            ):
+                sync_entities.append(entity)
+            else:
+                tasks.append(entity.async_update_ha_state(True))
+
+        if sync_entities:
+            batches = min(self._parallel_updates_limit, len(sync_entities))
+            tasks.extend(
+                self._async_update_sync_entities(sync_entities[idx::batches])
+                for idx in range(batches)
             )
-            return
 
-        async with self._process_updates:
-            tasks = []
-            for entity in self.entities.values():
-                if not entity.should_poll:
-                    continue
-                tasks.append(entity.async_update_ha_state(True))
+        if tasks:
+            await asyncio.gather(*tasks)
 
-            if tasks:
-                await asyncio.gather(*tasks)
+    async def _async_update_sync_entities(self, entities: List["Entity"]) -> None:
+        """Update entities with a sync update method in one executor job."""
+        # pylint: disable=protected-access
+        entities = [entity for entity in entities if not entity._update_staged]
+        for entity in entities:
+            entity._update_staged = True
+
+        try:
+            if self.parallel_updates is None:
+                updated = await self.hass.async_add_executor_job(
+                    self._update_entities, entities
+                )
+            else:
+                async with self.parallel_updates:
+                    updated = await self.hass.async_add_executor_job(
+                        self._update_entities, entities
+                    )
+        finally:
+            for entity in entities:
+                entity._update_staged = False
+
+        for entity in updated:
+            if entity.hass is not None:
+                entity.async_write_ha_state()
+
+    def _update_entities(self, entities: List["Entity"]) -> List["Entity"]:
+        """Update entities one after another, return those that were updated."""
+        updated = []
+        for entity in entities:
+            try:
+                entity.update()  # type: ignore
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception("Update for %s fails", entity.entity_id)
+                continue
+            updated.append(entity)
+        return updated
 
 
 current_platform: ContextVar[Optional[EntityPlatform]] = ContextVar(
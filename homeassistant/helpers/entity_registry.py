@@ -7,7 +7,7 @@ The Entity Registry will persist itself 10 seconds after a new entity is
 registered. Registering a new entity while a timer is in progress resets the
 timer.
 """
-from collections import OrderedDict
+from collections import UserDict
 import logging
 from typing import (
     TYPE_CHECKING,
@@ -118,13 +118,49 @@ class RegistryEntry:
         return self.disabled_by is not None
 
 
+class EntityRegistryItems(UserDict):
+    """Registry entries by entity ID, indexed by unique ID.
+
+    Entries are frozen, so every change goes through __setitem__ and keeps
+    the index in sync.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the container."""
+        super().__init__()
+        self._unique_ids: Dict[Tuple[str, str, str], str] = {}
+
+    def __setitem__(self, key: str, entry: RegistryEntry) -> None:
+        """Add or update an entry."""
+        if key in self.data:
+            self._unindex(self.data[key])
+        self.data[key] = entry
+        self._unique_ids[(entry.domain, entry.platform, entry.unique_id)] = key
+
+    def __delitem__(self, key: str) -> None:
+        """Remove an entry."""
+        self._unindex(self.data.pop(key))
+
+    def _unindex(self, entry: RegistryEntry) -> None:
+        """Remove an entry from the index."""
+        unique_key = (entry.domain, entry.platform, entry.unique_id)
+        if self._unique_ids.get(unique_key) == entry.entity_id:
+            del self._unique_ids[unique_key]
+
+    def get_entity_id(
+        self, domain: str, platform: str, unique_id: str
+    ) -> Optional[str]:
+        """Return the entity ID registered for a unique ID."""
+        return self._unique_ids.get((domain, platform, unique_id))
+
+
 class EntityRegistry:
     """Class to hold a registry of entities."""
 
     def __init__(self, hass: HomeAssistantType):
         """Initialize the registry."""
         self.hass = hass
-        self.entities: Dict[str, RegistryEntry]
+        self.entities: EntityRegistryItems
         self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
         self.hass.bus.async_listen(
             EVENT_DEVICE_REGISTRY_UPDATED, self.async_device_removed
@@ -161,14 +197,7 @@ class EntityRegistry:
         self, domain: str, platform: str, unique_id: str
     ) -> Optional[str]:
         """Check if an entity_id is currently registered."""
-        for entity in self.entities.values():
-            if (
-                entity.domain == domain
-                and entity.platform == platform
-                and entity.unique_id == unique_id
-            ):
-                return entity.entity_id
-        return None
+        return self.entities.get_entity_id(domain, platform, unique_id)
 
     @callback
     def async_generate_entity_id(
@@ -381,20 +410,13 @@ class EntityRegistry:
             entity_id = changes["entity_id"] = new_entity_id
 
         if new_unique_id is not _UNDEF:
-            conflict = next(
-                (
-                    entity
-                    for entity in self.entities.values()
-                    if entity.unique_id == new_unique_id
-                    and entity.domain == old.domain
-                    and entity.platform == old.platform
-                ),
-                None,
+            conflict_entity_id = self.async_get_entity_id(
+                old.domain, old.platform, new_unique_id
             )
-            if conflict:
+            if conflict_entity_id:
                 raise ValueError(
                     f"Unique id '{new_unique_id}' is already in use by "
-                    f"'{conflict.entity_id}'"
+                    f"'{conflict_entity_id}'"
                 )
             changes["unique_id"] = new_unique_id
 
@@ -424,7 +446,7 @@ class EntityRegistry:
             old_conf_load_func=load_yaml,
             old_conf_migrate_func=_async_migrate,
         )
-        entities: Dict[str, RegistryEntry] = OrderedDict()
+        entities = EntityRegistryItems()
 
         if data is not None:
             for entity in data["entities"]:
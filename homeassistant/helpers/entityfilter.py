@@ -1,7 +1,8 @@
 """Helper class to implement include/exclude of entities and domains."""
 import fnmatch
+from functools import lru_cache
 import re
-from typing import Callable, Dict, List, Pattern
+from typing import Callable, Dict, Iterable, List, Optional, Pattern
 
 import voluptuous as vol
 
@@ -18,6 +19,9 @@ CONF_EXCLUDE_ENTITIES = "exclude_entities"
 
 CONF_ENTITY_GLOBS = "entity_globs"
 
+# Number of entity ids to remember the verdict of per filter
+FILTER_CACHE_SIZE = 4096
+
 
 def convert_filter(config: Dict[str, List[str]]) -> Callable[[str], bool]:
     """Convert the filter schema into a filter."""
@@ -102,18 +106,15 @@ INCLUDE_EXCLUDE_FILTER_SCHEMA = vol.All(
 )
 
 
-def _glob_to_re(glob: str) -> Pattern:
-    """Translate and compile glob string into pattern."""
-    return re.compile(fnmatch.translate(glob))
-
-
-def _test_against_patterns(patterns: List[Pattern], entity_id: str) -> bool:
-    """Test entity against list of patterns, true if any match."""
-    for pattern in patterns:
-        if pattern.match(entity_id):
-            return True
+def _convert_globs_to_pattern(globs: Iterable[str]) -> Optional[Pattern]:
+    """Translate and compile glob strings into a single pattern.
 
-    return False
+    Matching one alternation is cheaper than testing a pattern per glob.
+    """
+    translated = [fnmatch.translate(glob) for glob in sorted(set(globs))]
+    if not translated:
+        return None
+    return re.compile("|".join(translated))
 
 
 # It's safe since we don't modify it. And None causes typing warnings
@@ -125,16 +126,49 @@ def generate_filter(
     exclude_entities: List[str],
     include_entity_globs: List[str] = [],
     exclude_entity_globs: List[str] = [],
+) -> Callable[[str], bool]:
+    """Return a function that will filter entities based on the args.
+
+    The verdict is memoized per entity id.
+    """
+    # Case 1 - no includes or excludes - pass all entities
+    if not (
+        include_domains
+        or include_entities
+        or exclude_domains
+        or exclude_entities
+        or include_entity_globs
+        or exclude_entity_globs
+    ):
+        return lambda entity_id: True
+
+    return lru_cache(maxsize=FILTER_CACHE_SIZE)(
+        _generate_filter(
+            include_domains,
+            include_entities,
+            exclude_domains,
+            exclude_entities,
+            include_entity_globs,
+            exclude_entity_globs,
+        )
+    )
+
+
+def _generate_filter(
+    include_domains: List[str],
+    include_entities: List[str],
+    exclude_domains: List[str],
+    exclude_entities: List[str],
+    include_entity_globs: List[str],
+    exclude_entity_globs: List[str],
 ) -> Callable[[str], bool]:
     """Return a function that will filter entities based on the args."""
     include_d = set(include_domains)
     include_e = set(include_entities)
     exclude_d = set(exclude_domains)
     exclude_e = set(exclude_entities)
-    include_eg_set = set(include_entity_globs)
-    exclude_eg_set = set(exclude_entity_globs)
-    include_eg = list(map(_glob_to_re, include_eg_set))
-    exclude_eg = list(map(_glob_to_re, exclude_eg_set))
+    include_eg = _convert_globs_to_pattern(include_entity_globs)
+    exclude_eg = _convert_globs_to_pattern(exclude_entity_globs)
 
     have_exclude = bool(exclude_e or exclude_d or exclude_eg)
     have_include = bool(include_e or include_d or include_eg)
@@ -144,7 +178,7 @@ def generate_filter(
         return (
             entity_id in include_e
             or domain in include_d
-            or bool(include_eg and _test_against_patterns(include_eg, entity_id))
+            or bool(include_eg and include_eg.match(entity_id))
         )
 
     def entity_excluded(domain: str, entity_id: str) -> bool:
@@ -152,13 +186,9 @@ def generate_filter(
         return (
             entity_id in exclude_e
             or domain in exclude_d
-            or bool(exclude_eg and _test_against_patterns(exclude_eg, entity_id))
+            or bool(exclude_eg and exclude_eg.match(entity_id))
         )
 
-    # Case 1 - no includes or excludes - pass all entities
-    if not have_include and not have_exclude:
-        return lambda entity_id: True
-
     # Case 2 - includes, no excludes - only include specified entities
     if have_include and not have_exclude:
 
@@ -194,11 +224,9 @@ def generate_filter(
             if domain in include_d:
                 return not (
                     entity_id in exclude_e
-                    or bool(
-                        exclude_eg and _test_against_patterns(exclude_eg, entity_id)
-                    )
+                    or bool(exclude_eg and exclude_eg.match(entity_id))
                 )
-            if _test_against_patterns(include_eg, entity_id):
+            if include_eg and include_eg.match(entity_id):
                 return not entity_excluded(domain, entity_id)
             return entity_id in include_e
 
@@ -216,9 +244,7 @@ def generate_filter(
         def entity_filter_4b(entity_id: str) -> bool:
             """Return filter function for case 4b."""
             domain = split_entity_id(entity_id)[0]
-            if domain in exclude_d or (
-                exclude_eg and _test_against_patterns(exclude_eg, entity_id)
-            ):
+            if domain in exclude_d or (exclude_eg and exclude_eg.match(entity_id)):
                 return entity_id in include_e
             return entity_id not in exclude_e
 
@@ -1,8 +1,22 @@
 """Helpers for listening to events."""
+import asyncio
 from datetime import datetime, timedelta
 import functools as ft
+import heapq
+from itertools import count
 import logging
-from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import attr
 
@@ -15,9 +29,17 @@ from homeassistant.const import (
     SUN_EVENT_SUNRISE,
     SUN_EVENT_SUNSET,
 )
-from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HomeAssistant,
+    State,
+    callback,
+    split_entity_id,
+)
+from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.sun import get_astral_event_next
-from homeassistant.helpers.template import Template
+from homeassistant.helpers.template import RenderInfo, Template
 from homeassistant.loader import bind_hass
 from homeassistant.util import dt as dt_util
 from homeassistant.util.async_ import run_callback_threadsafe
@@ -25,6 +47,14 @@ from homeassistant.util.async_ import run_callback_threadsafe
 TRACK_STATE_CHANGE_CALLBACKS = "track_state_change_callbacks"
 TRACK_STATE_CHANGE_LISTENER = "track_state_change_listener"
 
+TRACK_DOMAIN_STATE_CHANGE_CALLBACKS = "track_domain_state_change_callbacks"
+TRACK_DOMAIN_STATE_CHANGE_LISTENER = "track_domain_state_change_listener"
+
+TRACK_POINT_IN_TIME_TIMERS = "track_point_in_time_timers"
+
+# Minimum time between renders of templates that iterate all states
+ALL_STATES_RATE_LIMIT = timedelta(seconds=1)
+
 _LOGGER = logging.getLogger(__name__)
 
 # PyLint does not like the use of threaded_listener_factory
@@ -140,6 +170,11 @@ def async_track_state_change_event(
 
     if TRACK_STATE_CHANGE_LISTENER not in hass.data:
 
+        @callback
+        def _async_state_change_filter(event: Event) -> bool:
+            """Filter state changes by entity_id."""
+            return event.data.get("entity_id") in entity_callbacks
+
         @callback
         def _async_state_change_dispatcher(event: Event) -> None:
             """Dispatch state changes by entity_id."""
@@ -148,7 +183,7 @@ def async_track_state_change_event(
             if entity_id not in entity_callbacks:
                 return
 
-            for action in entity_callbacks[entity_id]:
+            for action in entity_callbacks[entity_id][:]:
                 try:
                     hass.async_run_job(action, event)
                 except Exception:  # pylint: disable=broad-except
@@ -157,7 +192,9 @@ def async_track_state_change_event(
                     )
 
         hass.data[TRACK_STATE_CHANGE_LISTENER] = hass.bus.async_listen(
-            EVENT_STATE_CHANGED, _async_state_change_dispatcher
+            EVENT_STATE_CHANGED,
+            _async_state_change_dispatcher,
+            event_filter=_async_state_change_filter,
         )
 
     entity_ids = [entity_id.lower() for entity_id in entity_ids]
@@ -193,6 +230,240 @@ def _async_remove_state_change_listeners(
         del hass.data[TRACK_STATE_CHANGE_LISTENER]
 
 
+@callback
+@bind_hass
+def async_track_domain_state_change_event(
+    hass: HomeAssistant, domains: Iterable[str], action: Callable[[Event], None]
+) -> Callable[[], None]:
+    """Track state change events of all entities in specific domains.
+
+    Like async_track_state_change_event, events are routed with a dict
+    lookup on the domain, and state changes in other domains do not create
+    a job at all.
+    """
+
+    domain_callbacks = hass.data.setdefault(TRACK_DOMAIN_STATE_CHANGE_CALLBACKS, {})
+
+    if TRACK_DOMAIN_STATE_CHANGE_LISTENER not in hass.data:
+
+        @callback
+        def _async_domain_state_change_filter(event: Event) -> bool:
+            """Filter state changes by domain."""
+            return split_entity_id(event.data["entity_id"])[0] in domain_callbacks
+
+        @callback
+        def _async_domain_state_change_dispatcher(event: Event) -> None:
+            """Dispatch state changes by domain."""
+            domain = split_entity_id(event.data["entity_id"])[0]
+
+            if domain not in domain_callbacks:
+                return
+
+            for action in domain_callbacks[domain][:]:
+                try:
+                    hass.async_run_job(action, event)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception(
+                        "Error while processing state changed for %s", domain
+                    )
+
+        hass.data[TRACK_DOMAIN_STATE_CHANGE_LISTENER] = hass.bus.async_listen(
+            EVENT_STATE_CHANGED,
+            _async_domain_state_change_dispatcher,
+            event_filter=_async_domain_state_change_filter,
+        )
+
+    domains = [domain.lower() for domain in domains]
+
+    for domain in domains:
+        domain_callbacks.setdefault(domain, []).append(action)
+
+    @callback
+    def remove_listener() -> None:
+        """Remove state change listener."""
+        for domain in domains:
+            domain_callbacks[domain].remove(action)
+            if not domain_callbacks[domain]:
+                del domain_callbacks[domain]
+
+        if not domain_callbacks:
+            hass.data[TRACK_DOMAIN_STATE_CHANGE_LISTENER]()
+            del hass.data[TRACK_DOMAIN_STATE_CHANGE_LISTENER]
+
+    return remove_listener
+
+
+class _TrackTemplateResultInfo:
+    """Re-render a template when the states it depends on change."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        template: Template,
+        action: Callable[[Event, Union[str, TemplateError]], None],
+        variables: Optional[Dict[str, Any]],
+    ):
+        """Initialize the tracker."""
+        self.hass = hass
+        self._template = template
+        self._action = action
+        self._variables = variables
+        self._info: Optional[RenderInfo] = None
+        self._track_all = False
+        self._dependencies: Optional[Tuple[bool, bool, FrozenSet, FrozenSet]] = None
+        self._unsubs: List[CALLBACK_TYPE] = []
+        self._last_render: Optional[datetime] = None
+        self._pending_event: Optional[Event] = None
+        self._unsub_rate_limit: Optional[CALLBACK_TYPE] = None
+
+    @callback
+    def async_setup(self) -> None:
+        """Render the template once to find out what to track."""
+        self._async_render()
+
+    @callback
+    def async_remove(self) -> None:
+        """Stop tracking the template."""
+        self._async_unsubscribe()
+        if self._unsub_rate_limit is not None:
+            self._unsub_rate_limit()
+            self._unsub_rate_limit = None
+
+    @callback
+    def _async_render(self) -> Union[str, TemplateError]:
+        """Render the template and update the tracked dependencies."""
+        self._last_render = dt_util.utcnow()
+        info = self._info = self._template.async_render_to_info(self._variables)
+
+        try:
+            result: Union[str, TemplateError] = info.result
+        except TemplateError as ex:
+            result = ex
+
+        # Without any dependency, or if rendering failed before collecting
+        # them, fall back to rendering on every state change.
+        self._track_all = not self._template.is_static and (
+            isinstance(result, TemplateError)
+            or not (info.all_states or info.domains or info.entities)
+        )
+        dependencies = (self._track_all, info.all_states, info.domains, info.entities)
+        if dependencies != self._dependencies:
+            self._dependencies = dependencies
+            self._async_subscribe(info)
+
+        return result
+
+    @callback
+    def _async_subscribe(self, info: RenderInfo) -> None:
+        """Listen to the state changes the template depends on."""
+        self._async_unsubscribe()
+
+        if self._track_all or info.all_states:
+            self._unsubs.append(
+                self.hass.bus.async_listen(
+                    EVENT_STATE_CHANGED,
+                    self._async_state_changed,
+                    event_filter=self._async_event_filter,
+                )
+            )
+            return
+
+        if info.domains:
+            self._unsubs.append(
+                async_track_domain_state_change_event(
+                    self.hass, info.domains, self._async_state_changed
+                )
+            )
+
+        entities = [
+            entity_id
+            for entity_id in info.entities
+            if split_entity_id(entity_id)[0] not in info.domains
+        ]
+        if entities:
+            self._unsubs.append(
+                async_track_state_change_event(
+                    self.hass, entities, self._async_state_changed
+                )
+            )
+
+    @callback
+    def _async_unsubscribe(self) -> None:
+        """Remove the state change listeners."""
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    @callback
+    def _async_event_filter(self, event: Event) -> bool:
+        """Return if the state change affects the template."""
+        if self._track_all:
+            return True
+
+        info = self._info
+        assert info is not None
+        entity_id = event.data["entity_id"]
+        if info.filter(entity_id):
+            return True
+
+        # Iterating or counting only depends on entities being added or removed
+        return (
+            event.data.get("old_state") is None or event.data.get("new_state") is None
+        ) and info.filter_lifecycle(entity_id)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Re-render the template if the state change affects it."""
+        if not self._async_event_filter(event):
+            return
+
+        if not self._track_all and self._info.all_states:  # type: ignore
+            assert self._last_render is not None
+            next_render = self._last_render + ALL_STATES_RATE_LIMIT
+            if dt_util.utcnow() < next_render:
+                self._pending_event = event
+                if self._unsub_rate_limit is None:
+                    self._unsub_rate_limit = async_track_point_in_utc_time(
+                        self.hass, self._async_rate_limit_expired, next_render
+                    )
+                return
+
+        self._async_run_action(event)
+
+    @callback
+    def _async_rate_limit_expired(self, now: datetime) -> None:
+        """Render the template with the last state change that was held back."""
+        self._unsub_rate_limit = None
+        event, self._pending_event = self._pending_event, None
+        if event is not None:
+            self._async_run_action(event)
+
+    @callback
+    def _async_run_action(self, event: Event) -> None:
+        """Render the template and pass the result to the action."""
+        self.hass.async_run_job(self._action, event, self._async_render())
+
+
+@callback
+@bind_hass
+def async_track_template_result(
+    hass: HomeAssistant,
+    template: Template,
+    action: Callable[[Event, Union[str, TemplateError]], None],
+    variables: Optional[Dict[str, Any]] = None,
+) -> CALLBACK_TYPE:
+    """Add a listener that renders a template when the states it uses change.
+
+    The states the template accessed during the last render are tracked.
+    Iterating or counting a domain only re-renders when entities of the
+    domain are added or removed, and templates iterating all states are
+    rendered at most once per ALL_STATES_RATE_LIMIT. The action is called
+    with the state change event and the result or TemplateError of the render.
+    """
+    tracker = _TrackTemplateResultInfo(hass, template, action, variables)
+    tracker.async_setup()
+    return tracker.async_remove
+
+
 @callback
 @bind_hass
 def async_track_template(
@@ -202,26 +473,36 @@ def async_track_template(
     variables: Optional[Dict[str, Any]] = None,
 ) -> CALLBACK_TYPE:
     """Add a listener that track state changes with template condition."""
-    from . import condition  # pylint: disable=import-outside-toplevel
-
     # Local variable to keep track of if the action has already been triggered
     already_triggered = False
 
     @callback
-    def template_condition_listener(entity_id: str, from_s: State, to_s: State) -> None:
+    def template_condition_listener(
+        event: Event, result: Union[str, TemplateError]
+    ) -> None:
         """Check if condition is correct and run action."""
         nonlocal already_triggered
-        template_result = condition.async_template(hass, template, variables)
+
+        if isinstance(result, TemplateError):
+            _LOGGER.error("Error during template condition: %s", result)
+            template_result = False
+        else:
+            template_result = result.lower() == "true"
 
         # Check to see if template returns true
         if template_result and not already_triggered:
             already_triggered = True
-            hass.async_run_job(action, entity_id, from_s, to_s)
+            hass.async_run_job(
+                action,
+                event.data.get("entity_id"),
+                event.data.get("old_state"),
+                event.data.get("new_state"),
+            )
         elif not template_result:
             already_triggered = False
 
-    return async_track_state_change(
-        hass, template.extract_entities(variables), template_condition_listener
+    return async_track_template_result(
+        hass, template, template_condition_listener, variables
     )
 
 
@@ -306,36 +587,263 @@ def async_track_point_in_time(
 track_point_in_time = threaded_listener_factory(async_track_point_in_time)
 
 
-@callback
-@bind_hass
-def async_track_point_in_utc_time(
-    hass: HomeAssistant, action: Callable[..., Any], point_in_time: datetime
-) -> CALLBACK_TYPE:
-    """Add a listener that fires once after a specific point in UTC time."""
-    # Ensure point_in_time is UTC
-    point_in_time = dt_util.as_utc(point_in_time)
+@attr.s(slots=True)
+class _PointInTimeTimer:
+    """A listener waiting for a point in UTC time."""
+
+    action: Callable[..., Any] = attr.ib()
+    cancelled: bool = attr.ib(default=False)
+
+
+class _PointInTimeTimers:
+    """Run point in time listeners from a heap ordered by their deadline.
+
+    A single loop timer is armed for the earliest deadline. A single time
+    changed listener runs the listeners whose deadline has passed, so
+    listeners still follow the wall clock when it jumps.
+
+    Time patterns schedule their next matching time as a point in time.
+    They are armed from the first time changed event after they are added,
+    and armed again when the clock rolls back or the time zone changes.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the timers."""
+        self.hass = hass
+        self._heap: List[Tuple[datetime, int, _PointInTimeTimer]] = []
+        self._sequence = count()
+        self._cancelled = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._handle_deadline: Optional[datetime] = None
+        self._unsub_time_changed: Optional[CALLBACK_TYPE] = None
+        self._unsub_config_update: Optional[CALLBACK_TYPE] = None
+        # Dicts keep the patterns in the order they were added
+        self._time_patterns: Dict["_TimePattern", None] = {}
+        self._unarmed_patterns: Dict["_TimePattern", None] = {}
+        self._last_now: Optional[datetime] = None
 
     @callback
-    def point_in_time_listener(event: Event) -> None:
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
+    def async_add(
+        self, action: Callable[..., Any], point_in_time: datetime
+    ) -> CALLBACK_TYPE:
+        """Add a listener that runs once point_in_time has passed."""
+        timer = _PointInTimeTimer(action)
+        heapq.heappush(self._heap, (point_in_time, next(self._sequence), timer))
+
+        self._async_listen_time_changed()
+        if self._heap[0][2] is timer:
+            self._async_arm()
 
-        if now < point_in_time or hasattr(point_in_time_listener, "run"):
+        @callback
+        def async_cancel() -> None:
+            """Cancel the listener."""
+            if timer.cancelled:
+                return
+            timer.cancelled = True
+            self._cancelled += 1
+            self._async_remove_cancelled()
+
+        return async_cancel
+
+    @callback
+    def async_add_time_pattern(self, pattern: "_TimePattern") -> CALLBACK_TYPE:
+        """Add a time pattern, armed at the next time changed event."""
+        self._time_patterns[pattern] = None
+        self._unarmed_patterns[pattern] = None
+        self._async_listen_time_changed()
+
+        if pattern.local and self._unsub_config_update is None:
+            self._unsub_config_update = self.hass.bus.async_listen(
+                EVENT_CORE_CONFIG_UPDATE, self._async_config_updated
+            )
+
+        @callback
+        def async_remove() -> None:
+            """Remove the time pattern."""
+            self._time_patterns.pop(pattern, None)
+            self._unarmed_patterns.pop(pattern, None)
+            pattern.async_disarm()
+            self._async_unlisten_time_changed()
+
+        return async_remove
+
+    @callback
+    def _async_listen_time_changed(self) -> None:
+        """Listen to time changed events while listeners are pending."""
+        if self._unsub_time_changed is None:
+            self._unsub_time_changed = self.hass.bus.async_listen(
+                EVENT_TIME_CHANGED, self._async_time_changed
+            )
+
+    @callback
+    def _async_unlisten_time_changed(self) -> None:
+        """Stop listening to time changed events once nothing is pending."""
+        if self._heap or self._time_patterns or self._unsub_time_changed is None:
             return
 
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        setattr(point_in_time_listener, "run", True)
-        async_unsub()
+        self._unsub_time_changed()
+        self._unsub_time_changed = None
+        self._last_now = None
 
-        hass.async_run_job(action, now)
+    @callback
+    def _async_config_updated(self, event: Event) -> None:
+        """Arm local time patterns again in case the time zone changed."""
+        for pattern in self._time_patterns:
+            if pattern.local:
+                pattern.async_disarm()
+                self._unarmed_patterns[pattern] = None
+
+    @callback
+    def _async_remove_cancelled(self) -> None:
+        """Drop cancelled listeners once they make up half of the heap."""
+        if self._cancelled * 2 < len(self._heap):
+            return
+
+        self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+        heapq.heapify(self._heap)
+        self._cancelled = 0
+        self._async_unlisten_time_changed()
+        self._async_arm()
 
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED, point_in_time_listener)
+    @callback
+    def _async_arm(self) -> None:
+        """Arm the loop timer for the earliest deadline."""
+        deadline = self._heap[0][0] if self._heap else None
+        if deadline == self._handle_deadline:
+            return
 
-    return async_unsub
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = self._handle_deadline = None
+
+        if deadline is None:
+            return
+
+        # Listeners that are already due run on the next time changed event
+        delay = (deadline - dt_util.utcnow()).total_seconds()
+        if delay > 0:
+            self._handle = self.hass.loop.call_later(delay, self._async_expired)
+            self._handle_deadline = deadline
+
+    @callback
+    def _async_expired(self) -> None:
+        """Run the listeners that are due when the loop timer expires."""
+        self._handle = self._handle_deadline = None
+        self._async_run_due(dt_util.utcnow())
+
+    @callback
+    def _async_time_changed(self, event: Event) -> None:
+        """Run the listeners that are due at a time changed event."""
+        now = event.data[ATTR_NOW]
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=dt_util.UTC)
+
+        if self._last_now is not None and now < self._last_now:
+            # The clock rolled back, find the next matching times from now
+            for pattern in self._time_patterns:
+                pattern.async_disarm()
+            self._unarmed_patterns = dict(self._time_patterns)
+        self._last_now = now
+
+        if self._unarmed_patterns:
+            patterns, self._unarmed_patterns = self._unarmed_patterns, {}
+            for pattern in patterns:
+                pattern.async_arm(now)
+
+        self._async_run_due(now)
+
+    @callback
+    def _async_run_due(self, now: datetime) -> None:
+        """Run the listeners with a deadline before now."""
+        heap = self._heap
+        # Listeners added by the actions wait for the next time changed event
+        due = []
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)[2]
+            if timer.cancelled:
+                self._cancelled -= 1
+            else:
+                timer.cancelled = True
+                due.append(timer)
+
+        # Time patterns are armed again by their action
+        self._async_unlisten_time_changed()
+
+        for timer in due:
+            self.hass.async_run_job(timer.action, now)
+
+        self._async_arm()
+
+
+class _TimePattern:
+    """Run an action at the times matching a time pattern."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        action: Callable[..., None],
+        seconds: List[int],
+        minutes: List[int],
+        hours: List[int],
+        local: bool,
+    ):
+        """Initialize the time pattern."""
+        self.hass = hass
+        self.local = local
+        self._action = action
+        self._seconds = seconds
+        self._minutes = minutes
+        self._hours = hours
+        self._cancel_timer: Optional[CALLBACK_TYPE] = None
+
+    @callback
+    def async_arm(self, now: datetime) -> None:
+        """Schedule the action at the first matching time from now."""
+        self.async_disarm()
+        localized_now = dt_util.as_local(now) if self.local else now
+        next_time = dt_util.find_next_time_expression_time(
+            localized_now, self._seconds, self._minutes, self._hours
+        )
+        self._cancel_timer = _async_get_point_in_time_timers(self.hass).async_add(
+            self._async_fire, dt_util.as_utc(next_time)
+        )
+
+    @callback
+    def async_disarm(self) -> None:
+        """Cancel the scheduled action."""
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+
+    @callback
+    def _async_fire(self, now: datetime) -> None:
+        """Run the action and schedule the next matching time."""
+        self._cancel_timer = None
+        self.hass.async_run_job(
+            self._action, dt_util.as_local(now) if self.local else now
+        )
+        self.async_arm(now + timedelta(seconds=1))
+
+
+@callback
+def _async_get_point_in_time_timers(hass: HomeAssistant) -> _PointInTimeTimers:
+    """Return the timers running the point in time listeners."""
+    timers = hass.data.get(TRACK_POINT_IN_TIME_TIMERS)
+    if timers is None:
+        timers = hass.data[TRACK_POINT_IN_TIME_TIMERS] = _PointInTimeTimers(hass)
+    return timers
+
+
+@callback
+@bind_hass
+def async_track_point_in_utc_time(
+    hass: HomeAssistant, action: Callable[..., Any], point_in_time: datetime
+) -> CALLBACK_TYPE:
+    """Add a listener that fires once after a specific point in UTC time."""
+    # Ensure point_in_time is UTC
+    return _async_get_point_in_time_timers(hass).async_add(
+        action, dt_util.as_utc(point_in_time)
+    )
 
 
 track_point_in_utc_time = threaded_listener_factory(async_track_point_in_utc_time)
@@ -502,42 +1010,10 @@ def async_track_utc_time_change(
     matching_minutes = dt_util.parse_time_expression(minute, 0, 59)
     matching_hours = dt_util.parse_time_expression(hour, 0, 23)
 
-    next_time = None
-
-    def calculate_next(now: datetime) -> None:
-        """Calculate and set the next time the trigger should fire."""
-        nonlocal next_time
-
-        localized_now = dt_util.as_local(now) if local else now
-        next_time = dt_util.find_next_time_expression_time(
-            localized_now, matching_seconds, matching_minutes, matching_hours
-        )
-
-    # Make sure rolling back the clock doesn't prevent the timer from
-    # triggering.
-    last_now: Optional[datetime] = None
-
-    @callback
-    def pattern_time_change_listener(event: Event) -> None:
-        """Listen for matching time_changed events."""
-        nonlocal next_time, last_now
-
-        now = event.data[ATTR_NOW]
-
-        if last_now is None or now < last_now:
-            # Time rolled back or next time not yet calculated
-            calculate_next(now)
-
-        last_now = now
-
-        if next_time <= now:
-            hass.async_run_job(action, dt_util.as_local(now) if local else now)
-            calculate_next(now + timedelta(seconds=1))
-
-    # We can't use async_track_point_in_utc_time here because it would
-    # break in the case that the system time abruptly jumps backwards.
-    # Our custom last_now logic takes care of resolving that scenario.
-    return hass.bus.async_listen(EVENT_TIME_CHANGED, pattern_time_change_listener)
+    pattern = _TimePattern(
+        hass, action, matching_seconds, matching_minutes, matching_hours, local
+    )
+    return _async_get_point_in_time_timers(hass).async_add_time_pattern(pattern)
 
 
 track_utc_time_change = threaded_listener_factory(async_track_utc_time_change)
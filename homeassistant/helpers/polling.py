@@ -0,0 +1,239 @@
+"""Poll entity platforms from a single scheduler."""
+from datetime import datetime, timedelta
+import heapq
+from itertools import count
+import logging
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import attr
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.loader import bind_hass
+import homeassistant.util.dt as dt_util
+
+from .event import async_track_point_in_utc_time
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_POLLING_SCHEDULER = "polling_scheduler"
+
+# Spreads the phases of jobs evenly over their interval, however many there are
+PHASE_STEP = 0.6180339887498949
+
+# Jobs that keep overrunning are polled at most this many intervals apart
+MAX_BACKOFF = 8
+
+
+@attr.s(slots=True)
+class PollingStats:
+    """Statistics of the polls of a platform."""
+
+    polls: int = attr.ib(default=0)
+    overruns: int = attr.ib(default=0)
+    last_duration: float = attr.ib(default=0.0)
+    max_duration: float = attr.ib(default=0.0)
+    total_duration: float = attr.ib(default=0.0)
+
+    @property
+    def average_duration(self) -> float:
+        """Return the average duration of a poll."""
+        return self.total_duration / self.polls if self.polls else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a dictionary version of the statistics."""
+        return {
+            "polls": self.polls,
+            "overruns": self.overruns,
+            "last_duration": self.last_duration,
+            "max_duration": self.max_duration,
+            "average_duration": self.average_duration,
+        }
+
+
+@attr.s(slots=True, eq=False)
+class _PollingJob:
+    """A job polled at an interval."""
+
+    name: str = attr.ib()
+    action: Callable[[datetime], Awaitable[None]] = attr.ib()
+    interval: timedelta = attr.ib()
+    # Fraction of the interval the job is polled at
+    phase: float = attr.ib()
+    stats: PollingStats = attr.ib()
+    backoff: int = attr.ib(default=1)
+    running: bool = attr.ib(default=False)
+    cancelled: bool = attr.ib(default=False)
+
+
+class PollingScheduler:
+    """Run polling jobs from a heap ordered by their next poll.
+
+    A single point in time listener is armed for the earliest poll. After
+    their first poll, jobs are polled at their own phase of the interval,
+    so jobs that were added at the same time do not poll at the same time.
+    A job that is still running when it is due is skipped and polled less
+    often until it catches up.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.stats: Dict[str, PollingStats] = {}
+        self._epoch = dt_util.utcnow()
+        self._heap: List[Tuple[datetime, int, _PollingJob]] = []
+        self._sequence = count()
+        self._jobs_added = 0
+        self._jobs = 0
+        self._unsub_timer: Optional[CALLBACK_TYPE] = None
+        self._timer_deadline: Optional[datetime] = None
+
+    @callback
+    def async_add(
+        self,
+        name: str,
+        action: Callable[[datetime], Awaitable[None]],
+        interval: timedelta,
+    ) -> CALLBACK_TYPE:
+        """Poll action every interval, return a function to stop polling."""
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = PollingStats()
+
+        job = _PollingJob(
+            name, action, interval, (self._jobs_added * PHASE_STEP) % 1, stats
+        )
+        self._jobs_added += 1
+        self._jobs += 1
+        self._async_push(job, dt_util.utcnow() + interval)
+        self._async_arm()
+
+        @callback
+        def async_remove() -> None:
+            """Stop polling the job."""
+            if job.cancelled:
+                return
+            job.cancelled = True
+            self._jobs -= 1
+            if self._jobs == 0:
+                self._heap.clear()
+                self._async_disarm()
+
+        return async_remove
+
+    @callback
+    def _async_push(self, job: _PollingJob, due: datetime) -> None:
+        """Schedule the next poll of a job."""
+        heapq.heappush(self._heap, (due, next(self._sequence), job))
+
+    @callback
+    def _async_arm(self) -> None:
+        """Arm the timer for the earliest poll."""
+        if not self._heap:
+            return
+
+        deadline = self._heap[0][0]
+        if self._timer_deadline is not None and self._timer_deadline <= deadline:
+            return
+
+        self._async_disarm()
+        self._timer_deadline = deadline
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass, self._async_run_due, deadline
+        )
+
+    @callback
+    def _async_disarm(self) -> None:
+        """Cancel the timer."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._timer_deadline = None
+
+    @callback
+    def _async_run_due(self, now: datetime) -> None:
+        """Poll the jobs that are due."""
+        self._unsub_timer = None
+        self._timer_deadline = None
+        utcnow = dt_util.utcnow()
+
+        due_jobs = []
+        while self._heap and self._heap[0][0] <= now:
+            job = heapq.heappop(self._heap)[2]
+            if not job.cancelled:
+                due_jobs.append(job)
+
+        for job in due_jobs:
+            if job.running:
+                job.stats.overruns += 1
+                job.backoff = min(job.backoff * 2, MAX_BACKOFF)
+                _LOGGER.warning(
+                    "Updating %s took longer than the scheduled update interval %s",
+                    job.name,
+                    job.interval,
+                )
+            else:
+                job.running = True
+                self.hass.async_create_task(self._async_poll(job, now))
+
+            self._async_push(job, self._next_due(job, utcnow))
+
+        self._async_arm()
+
+    def _next_due(self, job: _PollingJob, utcnow: datetime) -> datetime:
+        """Return the last time at the phase of the job within its interval."""
+        latest = utcnow + job.interval * job.backoff
+        period = job.interval.total_seconds()
+        if period <= 0:
+            return latest
+
+        offset = ((latest - self._epoch).total_seconds() - job.phase * period) % period
+        return latest - timedelta(seconds=offset)
+
+    async def _async_poll(self, job: _PollingJob, now: datetime) -> None:
+        """Poll a job and record how long it took."""
+        start = monotonic()
+        try:
+            await job.action(now)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error while polling %s", job.name)
+        finally:
+            duration = monotonic() - start
+            job.running = False
+
+            stats = job.stats
+            stats.polls += 1
+            stats.last_duration = duration
+            stats.max_duration = max(stats.max_duration, duration)
+            stats.total_duration += duration
+
+            if job.backoff > 1 and duration < job.interval.total_seconds():
+                job.backoff //= 2
+
+
+@callback
+def _async_get_scheduler(hass: HomeAssistant) -> PollingScheduler:
+    """Return the polling scheduler."""
+    scheduler: Optional[PollingScheduler] = hass.data.get(DATA_POLLING_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_POLLING_SCHEDULER] = PollingScheduler(hass)
+    return scheduler
+
+
+@callback
+@bind_hass
+def async_track_polling(
+    hass: HomeAssistant,
+    name: str,
+    action: Callable[[datetime], Awaitable[None]],
+    interval: timedelta,
+) -> CALLBACK_TYPE:
+    """Poll action every interval from the polling scheduler."""
+    return _async_get_scheduler(hass).async_add(name, action, interval)
+
+
+@callback
+@bind_hass
+def async_get_polling_stats(hass: HomeAssistant) -> Dict[str, PollingStats]:
+    """Return the polling statistics by platform."""
+    return _async_get_scheduler(hass).stats
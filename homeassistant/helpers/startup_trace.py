@@ -0,0 +1,127 @@
+"""Trace where time goes while integrations are set up."""
+from contextlib import contextmanager
+import functools
+from time import monotonic
+from typing import Any, Callable, Dict, Iterator, List, TypeVar
+
+import attr
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.loader import bind_hass
+
+CALLABLE_T = TypeVar("CALLABLE_T", bound=Callable)  # pylint: disable=invalid-name
+
+DATA_STARTUP_TRACE = "startup_trace"
+
+# Stop recording when reloads and late setups produced this many spans
+MAX_SPANS = 20000
+
+PHASE_WAIT_DEPENDENCIES = "wait_dependencies"
+PHASE_REQUIREMENTS = "requirements"
+PHASE_IMPORT = "import"
+PHASE_CONFIG = "config_validation"
+PHASE_EXECUTOR_WAIT = "executor_wait"
+PHASE_SETUP = "async_setup"
+PHASE_SETUP_ENTRY = "async_setup_entry"
+PHASE_SETUP_PLATFORM = "async_setup_platform"
+PHASE_ADD_ENTITIES = "add_entities"
+
+
+@attr.s(slots=True, frozen=True)
+class Span:
+    """A phase of setting up an integration."""
+
+    domain: str = attr.ib()
+    phase: str = attr.ib()
+    start: float = attr.ib()
+    end: float = attr.ib()
+    args: Dict[str, Any] = attr.ib(factory=dict)
+
+
+class StartupTrace:
+    """Spans recorded while integrations are set up."""
+
+    def __init__(self) -> None:
+        """Initialize the trace."""
+        self.origin = monotonic()
+        self.spans: List[Span] = []
+
+    def add(
+        self, domain: str, phase: str, start: float, end: float, **args: Any
+    ) -> None:
+        """Record a span.
+
+        Thread safe, so executor jobs can record how long they were queued.
+        """
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append(Span(domain, phase, start, end, args))
+
+    @contextmanager
+    def span(self, domain: str, phase: str, **args: Any) -> Iterator[None]:
+        """Record the time spent in the block."""
+        start = monotonic()
+        try:
+            yield
+        finally:
+            self.add(domain, phase, start, monotonic(), **args)
+
+    def executor_job(self, domain: str, target: CALLABLE_T) -> CALLABLE_T:
+        """Wrap a job to record how long it waits for an executor thread.
+
+        Call this when submitting the job.
+        """
+        queued = monotonic()
+
+        @functools.wraps(target)
+        def job(*args: Any) -> Any:
+            self.add(domain, PHASE_EXECUTOR_WAIT, queued, monotonic())
+            return target(*args)
+
+        return job  # type: ignore
+
+    def as_chrome_trace(self) -> Dict[str, Any]:
+        """Return the trace in the Chrome trace event format.
+
+        Each integration is shown as its own thread.
+        """
+        thread_ids: Dict[str, int] = {}
+        events: List[Dict[str, Any]] = []
+
+        for span in self.spans:
+            tid = thread_ids.get(span.domain)
+            if tid is None:
+                tid = thread_ids[span.domain] = len(thread_ids) + 1
+                events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": 1,
+                        "tid": tid,
+                        "args": {"name": span.domain},
+                    }
+                )
+
+            events.append(
+                {
+                    "name": span.phase,
+                    "cat": span.domain,
+                    "ph": "X",
+                    "pid": 1,
+                    "tid": tid,
+                    "ts": round((span.start - self.origin) * 1e6),
+                    "dur": round((span.end - span.start) * 1e6),
+                    "args": span.args,
+                }
+            )
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+@callback
+@bind_hass
+def async_get_startup_trace(hass: HomeAssistant) -> StartupTrace:
+    """Return the startup trace of Home Assistant."""
+    trace: StartupTrace = hass.data.get(DATA_STARTUP_TRACE)
+    if trace is None:
+        trace = hass.data[DATA_STARTUP_TRACE] = StartupTrace()
+    return trace
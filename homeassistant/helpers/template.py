@@ -2,13 +2,14 @@
 import base64
 import collections.abc
 from datetime import datetime
-from functools import wraps
+from functools import lru_cache, wraps
 import json
 import logging
 import math
 import random
 import re
-from typing import Any, Dict, Iterable, List, Optional, Union
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Union
+import weakref
 
 import jinja2
 from jinja2 import contextfilter, contextfunction
@@ -42,6 +43,9 @@ DATE_STR_FORMAT = "%Y-%m-%d %H:%M:%S"
 _RENDER_INFO = "template.render_info"
 _ENVIRONMENT = "template.environment"
 
+# Number of template sources whose compiled code is kept per environment
+COMPILE_CACHE_SIZE = 1024
+
 _RE_NONE_ENTITIES = re.compile(r"distance\(|closest\(", re.I | re.M)
 _RE_GET_ENTITIES = re.compile(
     r"(?:(?:states\.|(?P<func>is_state|is_state_attr|state_attr|states|expand)"
@@ -146,6 +150,21 @@ class RenderInfo:
             or entity_id in self._entities
         )
 
+    @property
+    def all_states(self) -> bool:
+        """Return if the template iterated or counted all states."""
+        return self._all_states
+
+    @property
+    def domains(self) -> FrozenSet[str]:
+        """Return the domains the template iterated or counted."""
+        return getattr(self, "_domains", frozenset())
+
+    @property
+    def entities(self) -> FrozenSet[str]:
+        """Return the entities whose state the template accessed."""
+        return self._entities
+
     @property
     def result(self) -> str:
         """Results of the template computation."""
@@ -188,6 +207,11 @@ class Template:
             ret = self.hass.data[_ENVIRONMENT] = TemplateEnvironment(self.hass)
         return ret
 
+    @property
+    def is_static(self) -> bool:
+        """Return if the template contains no Jinja expressions or statements."""
+        return _RE_JINJA_DELIMITERS.search(self.template) is None
+
     def ensure_valid(self):
         """Return if template is valid."""
         if self._compiled_code is not None:
@@ -299,10 +323,14 @@ class Template:
 
         env = self._env
 
-        self._compiled = jinja2.Template.from_code(
-            env, self._compiled_code, env.globals, None
-        )
+        # Templates with the same source share the bound template
+        compiled = env.template_cache.get(self.template)
+        if compiled is None:
+            compiled = env.template_cache[self.template] = jinja2.Template.from_code(
+                env, self._compiled_code, env.globals, None
+            )
 
+        self._compiled = compiled
         return self._compiled
 
     def __eq__(self, other):
@@ -952,6 +980,8 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         """Initialise template environment."""
         super().__init__()
         self.hass = hass
+        self.template_cache: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._compile_cached = lru_cache(maxsize=COMPILE_CACHE_SIZE)(super().compile)
         self.filters["round"] = forgiving_round
         self.filters["multiply"] = multiply
         self.filters["log"] = logarithm
@@ -1027,6 +1057,18 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         self.globals["state_attr"] = hassfunction(state_attr)
         self.globals["states"] = AllStates(hass)
 
+    def compile(self, source, name=None, filename=None, raw=False, defer_init=False):
+        """Compile a template, reusing the code compiled for the same source."""
+        if (
+            name is None
+            and filename is None
+            and not raw
+            and not defer_init
+            and isinstance(source, str)
+        ):
+            return self._compile_cached(source)
+        return super().compile(source, name, filename, raw, defer_init)
+
     def is_safe_callable(self, obj):
         """Test if callback is safe."""
         return isinstance(obj, AllStates) or super().is_safe_callable(obj)
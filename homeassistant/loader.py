@@ -11,15 +11,18 @@ import json
 import logging
 import pathlib
 import sys
+from timeit import default_timer as timer
 from types import ModuleType
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Dict,
+    Iterable,
     List,
     Optional,
     Set,
+    Tuple,
     TypeVar,
     Union,
     cast,
@@ -36,6 +39,10 @@ _LOGGER = logging.getLogger(__name__)
 DATA_COMPONENTS = "components"
 DATA_INTEGRATIONS = "integrations"
 DATA_CUSTOM_COMPONENTS = "custom_components"
+DATA_MANIFEST_INDEX = "manifest_index"
+MANIFEST_INDEX_KEY = "core.manifest_index"
+MANIFEST_INDEX_VERSION = 1
+MANIFEST_INDEX_SAVE_DELAY = 60
 PACKAGE_CUSTOM_COMPONENTS = "custom_components"
 PACKAGE_BUILTIN = "homeassistant.components"
 CUSTOM_WARNING = (
@@ -83,6 +90,7 @@ async def _async_get_custom_components(
     dirs = await hass.async_add_executor_job(
         get_sub_directories, custom_components.__path__
     )
+    await _async_get_manifest_index(hass)
 
     integrations = await asyncio.gather(
         *(
@@ -92,6 +100,7 @@ async def _async_get_custom_components(
             for comp in dirs
         )
     )
+    await _async_save_manifest_index(hass)
 
     return {
         integration.domain: integration
@@ -142,6 +151,94 @@ async def async_get_config_flows(hass: "HomeAssistant") -> Set[str]:
     return flows
 
 
+class ManifestIndex:
+    """Manifests that were read before, stored in a single file.
+
+    A manifest is read again when its modification time changed.
+    """
+
+    def __init__(self, hass: "HomeAssistant") -> None:
+        """Initialize the index."""
+        # pylint: disable=import-outside-toplevel
+        from homeassistant.helpers.storage import Store
+
+        self._store = Store(hass, MANIFEST_INDEX_VERSION, MANIFEST_INDEX_KEY)
+        self._manifests: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._changed = False
+
+    async def async_load(self) -> None:
+        """Load the index."""
+        data = await self._store.async_load()
+        if isinstance(data, dict):
+            self._manifests = {
+                path: (entry["mtime"], entry["manifest"])
+                for path, entry in data["manifests"].items()
+            }
+
+    def get_manifest(self, manifest_path: pathlib.Path) -> Optional[Dict[str, Any]]:
+        """Return the manifest at a path or None if it does not exist.
+
+        Raises ValueError if the manifest is not valid JSON.
+        """
+        try:
+            mtime = manifest_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        key = str(manifest_path)
+        cached = self._manifests.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = self._manifests[key] = (
+                mtime,
+                json.loads(manifest_path.read_text()),
+            )
+            self._changed = True
+
+        return dict(cached[1])
+
+    def async_schedule_save(self) -> None:
+        """Save the index if manifests were read."""
+        if self._changed:
+            self._changed = False
+            self._store.async_delay_save(self._data_to_save, MANIFEST_INDEX_SAVE_DELAY)
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the data of the index to store."""
+        return {
+            "manifests": {
+                path: {"mtime": mtime, "manifest": manifest}
+                # Copy as manifests can be read in the executor while saving
+                for path, (mtime, manifest) in list(self._manifests.items())
+            }
+        }
+
+
+async def _async_get_manifest_index(hass: "HomeAssistant") -> ManifestIndex:
+    """Return the loaded manifest index."""
+    index_or_evt = hass.data.get(DATA_MANIFEST_INDEX)
+
+    if index_or_evt is None:
+        evt = hass.data[DATA_MANIFEST_INDEX] = asyncio.Event()
+        index = ManifestIndex(hass)
+        try:
+            await index.async_load()
+        finally:
+            hass.data[DATA_MANIFEST_INDEX] = index
+            evt.set()
+        return index
+
+    if isinstance(index_or_evt, asyncio.Event):
+        await index_or_evt.wait()
+        return cast(ManifestIndex, hass.data[DATA_MANIFEST_INDEX])
+
+    return cast(ManifestIndex, index_or_evt)
+
+
+async def _async_save_manifest_index(hass: "HomeAssistant") -> None:
+    """Save the manifest index if manifests were read."""
+    (await _async_get_manifest_index(hass)).async_schedule_save()
+
+
 class Integration:
     """An integration in Home Assistant."""
 
@@ -150,20 +247,27 @@ class Integration:
         cls, hass: "HomeAssistant", root_module: ModuleType, domain: str
     ) -> "Optional[Integration]":
         """Resolve an integration from a root module."""
+        index = hass.data.get(DATA_MANIFEST_INDEX)
+
         for base in root_module.__path__:  # type: ignore
             manifest_path = pathlib.Path(base) / domain / "manifest.json"
 
-            if not manifest_path.is_file():
-                continue
-
             try:
-                manifest = json.loads(manifest_path.read_text())
+                if isinstance(index, ManifestIndex):
+                    manifest = index.get_manifest(manifest_path)
+                elif manifest_path.is_file():
+                    manifest = json.loads(manifest_path.read_text())
+                else:
+                    manifest = None
             except ValueError as err:
                 _LOGGER.error(
                     "Error parsing manifest.json file at %s: %s", manifest_path, err
                 )
                 continue
 
+            if manifest is None:
+                continue
+
             return cls(
                 hass, f"{root_module.__name__}.{domain}", manifest_path.parent, manifest
             )
@@ -310,7 +414,7 @@ class Integration:
         """Return the component."""
         cache = self.hass.data.setdefault(DATA_COMPONENTS, {})
         if self.domain not in cache:
-            cache[self.domain] = importlib.import_module(self.pkg_path)
+            cache[self.domain] = _import_module(self.pkg_path)
         return cache[self.domain]  # type: ignore
 
     def get_platform(self, platform_name: str) -> ModuleType:
@@ -318,9 +422,7 @@ class Integration:
         cache = self.hass.data.setdefault(DATA_COMPONENTS, {})
         full_name = f"{self.domain}.{platform_name}"
         if full_name not in cache:
-            cache[full_name] = importlib.import_module(
-                f"{self.pkg_path}.{platform_name}"
-            )
+            cache[full_name] = _import_module(f"{self.pkg_path}.{platform_name}")
         return cache[full_name]  # type: ignore
 
     def __repr__(self) -> str:
@@ -330,62 +432,111 @@ class Integration:
 
 async def async_get_integration(hass: "HomeAssistant", domain: str) -> Integration:
     """Get an integration."""
+    int_or_exc = (await async_get_integrations(hass, [domain]))[domain]
+    if isinstance(int_or_exc, Integration):
+        return int_or_exc
+    raise int_or_exc
+
+
+async def async_get_integrations(
+    hass: "HomeAssistant", domains: Iterable[str]
+) -> Dict[str, Union[Integration, Exception]]:
+    """Get integrations, resolving the ones not loaded yet together.
+
+    Integrations that can't be found are returned as IntegrationNotFound.
+    """
     cache = hass.data.get(DATA_INTEGRATIONS)
     if cache is None:
         if not _async_mount_config_dir(hass):
-            raise IntegrationNotFound(domain)
+            return {domain: IntegrationNotFound(domain) for domain in domains}
         cache = hass.data[DATA_INTEGRATIONS] = {}
 
-    int_or_evt: Union[Integration, asyncio.Event, None] = cache.get(domain, _UNDEF)
+    results: Dict[str, Union[Integration, Exception]] = {}
+    in_progress: Dict[str, asyncio.Event] = {}
+    needed: Dict[str, asyncio.Event] = {}
 
-    if isinstance(int_or_evt, asyncio.Event):
-        await int_or_evt.wait()
+    for domain in domains:
         int_or_evt = cache.get(domain, _UNDEF)
-
-        # When we have waited and it's _UNDEF, it doesn't exist
-        # We don't cache that it doesn't exist, or else people can't fix it
-        # and then restart, because their config will never be valid.
-        if int_or_evt is _UNDEF:
-            raise IntegrationNotFound(domain)
-
-    if int_or_evt is not _UNDEF:
-        return cast(Integration, int_or_evt)
-
-    event = cache[domain] = asyncio.Event()
-
+        if isinstance(int_or_evt, asyncio.Event):
+            in_progress[domain] = int_or_evt
+        elif int_or_evt is not _UNDEF:
+            results[domain] = cast(Integration, int_or_evt)
+        elif domain not in needed:
+            needed[domain] = cache[domain] = asyncio.Event()
+
+    if needed:
+        try:
+            await _async_resolve_integrations(hass, cache, needed, results)
+        finally:
+            for domain, event in needed.items():
+                # Remove events of integrations that could not be resolved.
+                if cache.get(domain) is event:
+                    cache.pop(domain)
+                event.set()
+
+    if in_progress:
+        await asyncio.gather(*(event.wait() for event in in_progress.values()))
+        for domain in in_progress:
+            # When we have waited and it's _UNDEF, it doesn't exist
+            # We don't cache that it doesn't exist, or else people can't fix it
+            # and then restart, because their config will never be valid.
+            int_or_undef = cache.get(domain, _UNDEF)
+            if isinstance(int_or_undef, Integration):
+                results[domain] = int_or_undef
+            else:
+                results[domain] = IntegrationNotFound(domain)
+
+    return results
+
+
+async def _async_resolve_integrations(
+    hass: "HomeAssistant",
+    cache: Dict[str, Any],
+    needed: Dict[str, asyncio.Event],
+    results: Dict[str, Union[Integration, Exception]],
+) -> None:
+    """Resolve integrations that are not in the cache."""
     # Instead of using resolve_from_root we use the cache of custom
     # components to find the integration.
-    integration = (await async_get_custom_components(hass)).get(domain)
-    if integration is not None:
+    custom = await async_get_custom_components(hass)
+    to_resolve = []
+    for domain in needed:
+        integration = custom.get(domain)
+        if integration is None:
+            to_resolve.append(domain)
+            continue
         _LOGGER.warning(CUSTOM_WARNING, domain)
-        cache[domain] = integration
-        event.set()
-        return integration
+        cache[domain] = results[domain] = integration
+
+    if not to_resolve:
+        return
 
     from homeassistant import components  # pylint: disable=import-outside-toplevel
 
-    integration = await hass.async_add_executor_job(
-        Integration.resolve_from_root, hass, components, domain
+    await _async_get_manifest_index(hass)
+    built_in = await hass.async_add_executor_job(
+        _resolve_integrations_from_root, hass, components, to_resolve
     )
+    await _async_save_manifest_index(hass)
 
-    if integration is not None:
-        cache[domain] = integration
-        event.set()
-        return integration
-
-    integration = Integration.resolve_legacy(hass, domain)
-    if integration is not None:
-        cache[domain] = integration
-    else:
-        # Remove event from cache.
-        cache.pop(domain)
-
-    event.set()
+    for domain in to_resolve:
+        integration = built_in.get(domain) or Integration.resolve_legacy(hass, domain)
+        if integration is None:
+            results[domain] = IntegrationNotFound(domain)
+        else:
+            cache[domain] = results[domain] = integration
 
-    if not integration:
-        raise IntegrationNotFound(domain)
 
-    return integration
+def _resolve_integrations_from_root(
+    hass: "HomeAssistant", root_module: ModuleType, domains: List[str]
+) -> Dict[str, Integration]:
+    """Resolve multiple integrations from a root module."""
+    integrations = {}
+    for domain in domains:
+        integration = Integration.resolve_from_root(hass, root_module, domain)
+        if integration is not None:
+            integrations[domain] = integration
+    return integrations
 
 
 class LoaderError(Exception):
@@ -411,6 +562,14 @@ class CircularDependency(LoaderError):
         self.to_domain = to_domain
 
 
+def _import_module(name: str) -> ModuleType:
+    """Import a module and log how long it took."""
+    start = timer()
+    module = importlib.import_module(name)
+    _LOGGER.debug("Imported %s in %.3f seconds", name, timer() - start)
+    return module
+
+
 def _load_file(
     hass: "HomeAssistant", comp_or_platform: str, base_paths: List[str]
 ) -> Optional[ModuleType]:
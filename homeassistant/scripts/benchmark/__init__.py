@@ -3,7 +3,7 @@ import argparse
 import asyncio
 import collections
 from contextlib import suppress
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import logging
 from timeit import default_timer as timer
@@ -112,6 +112,69 @@ async def time_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+async def pending_timers_idle(hass):
+    """Tick the clock 1000 times with up to 10k pending timers."""
+    ticks = 1000
+    now = dt_util.utcnow()
+    total = 0
+
+    @core.callback
+    def listener(_):
+        """Handle timer."""
+
+    for timers in (100, 1000, 10000):
+        unsubs = [
+            hass.helpers.event.async_call_later(3600 + i, listener)
+            for i in range(timers)
+        ]
+
+        start = timer()
+        for i in range(ticks):
+            hass.bus.async_fire(
+                EVENT_TIME_CHANGED, {ATTR_NOW: now + timedelta(seconds=i)}
+            )
+        await hass.async_block_till_done()
+        runtime = timer() - start
+        total += runtime
+
+        print(f"{timers} timers: {runtime / ticks * 10 ** 6:.1f} µs per tick")
+        for unsub in unsubs:
+            unsub()
+
+    return total
+
+
+@benchmark
+async def time_pattern_idle(hass):
+    """Tick the clock 1000 times with 500 daily time patterns."""
+    ticks = 1000
+    now = dt_util.utcnow()
+
+    @core.callback
+    def listener(_):
+        """Handle time pattern."""
+
+    unsubs = [
+        hass.helpers.event.async_track_utc_time_change(
+            listener, hour=(now.hour + 12) % 24, minute=i % 60, second=0
+        )
+        for i in range(500)
+    ]
+
+    start = timer()
+    for i in range(ticks):
+        hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: now + timedelta(seconds=i)})
+    await hass.async_block_till_done()
+    runtime = timer() - start
+
+    print(f"500 time patterns: {runtime / ticks * 10 ** 6:.1f} µs per tick")
+    for unsub in unsubs:
+        unsub()
+
+    return runtime
+
+
 @benchmark
 async def state_changed_helper(hass):
     """Run a million events through state changed helper."""
@@ -145,6 +208,73 @@ async def state_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+async def state_changed_domain_routing(hass):
+    """Route 30k state changes of 6000 entities to 10 domain listeners."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.helpers.event import async_track_domain_state_change_event
+
+    domains = [f"domain_{i}" for i in range(30)]
+    entity_ids = [f"{domains[i % 30]}.entity_{i}" for i in range(6000)]
+    listened = domains[:10]
+    changes = 5 * len(entity_ids)
+    jobs = 0
+
+    async_add_job = hass.async_add_job
+
+    def count_add_job(target, *args):
+        """Count the jobs created."""
+        nonlocal jobs
+        jobs += 1
+        return async_add_job(target, *args)
+
+    hass.async_add_job = count_add_job
+
+    @core.callback
+    def listener(event):
+        """Handle state change."""
+
+    def filtering_listener(domain):
+        """Return a listener filtering state changes itself."""
+
+        @core.callback
+        def filter_listener(event):
+            """Handle state change of the domain."""
+            if core.split_entity_id(event.data["entity_id"])[0] == domain:
+                listener(event)
+
+        return filter_listener
+
+    async def run(description, listen):
+        """Change all states and report the jobs created."""
+        nonlocal jobs
+        unsubs = [listen(domain) for domain in listened]
+        jobs = 0
+        start = timer()
+        for i in range(changes):
+            hass.states.async_set(entity_ids[i % len(entity_ids)], i)
+        await hass.async_block_till_done()
+        runtime = timer() - start
+        print(
+            f"{description}: {jobs / changes:.2f} jobs per state change, "
+            f"{runtime:.2f}s"
+        )
+        for unsub in unsubs:
+            unsub()
+        return runtime
+
+    await run(
+        "Listeners filtering themselves",
+        lambda domain: hass.bus.async_listen(
+            EVENT_STATE_CHANGED, filtering_listener(domain)
+        ),
+    )
+    return await run(
+        "Domain routing",
+        lambda domain: async_track_domain_state_change_event(hass, [domain], listener),
+    )
+
+
 @benchmark
 async def logbook_filtering_state(hass):
     """Filter state changes."""
@@ -261,6 +391,40 @@ async def filtering_entity_id(hass):
     return timer() - start
 
 
+@benchmark
+async def filtering_entity_id_many_globs(hass):
+    """Run 100k state changes through entity filters with 10 up to 1000 globs."""
+    events = 10 ** 5
+    entity_ids = [f"sensor.room_{i}_temperature" for i in range(2000)]
+    size = len(entity_ids)
+
+    total = 0
+    for globs in (10, 100, 1000):
+        config = {
+            "include": {
+                "domains": ["light"],
+                "entity_globs": [f"sensor.room_{i}_*" for i in range(globs)],
+                "entities": [],
+            },
+            "exclude": {
+                "domains": [],
+                "entity_globs": ["sensor.*_battery"],
+                "entities": [],
+            },
+        }
+        entities_filter = convert_include_exclude_filter(config)
+
+        start = timer()
+        for i in range(events):
+            entities_filter(entity_ids[i % size])
+        runtime = timer() - start
+        total += runtime
+
+        print(f"{globs} globs: {runtime / events * 10 ** 6:.2f} µs per event")
+
+    return total
+
+
 @benchmark
 async def valid_entity_id(hass):
     """Run valid entity ID a million times."""
@@ -283,6 +447,174 @@ async def json_serialize_states(hass):
     return timer() - start
 
 
+@benchmark
+async def mqtt_message_dispatch(hass):
+    """Dispatch 10k MQTT messages against 5k subscriptions."""
+    # pylint: disable=import-outside-toplevel
+    from paho.mqtt.client import MQTTMessage
+
+    from homeassistant import config_entries
+    from homeassistant.components import mqtt
+
+    count = 0
+    messages = 10 ** 4
+    event = asyncio.Event()
+
+    @core.callback
+    def listener(_):
+        """Handle message."""
+        nonlocal count
+        count += 1
+
+        if count == messages:
+            event.set()
+
+    entry = config_entries.ConfigEntry(
+        1,
+        mqtt.DOMAIN,
+        "Mock Title",
+        {mqtt.CONF_BROKER: "mock-broker"},
+        config_entries.SOURCE_USER,
+        config_entries.CONN_CLASS_LOCAL_PUSH,
+        system_options={},
+    )
+    conf = mqtt.CONFIG_SCHEMA({mqtt.DOMAIN: {mqtt.CONF_BROKER: "mock-broker"}})
+    mqtt_client = mqtt.MQTT(hass, entry, conf[mqtt.DOMAIN])
+
+    # Mix of exact topics and wildcard filters, like a large zigbee2mqtt
+    # and Tasmota install. Only one subscription matches each message.
+    for i in range(5000):
+        if i % 2:
+            topic = f"zigbee2mqtt/device_{i}"
+        else:
+            topic = f"tele/tasmota_{i}/+"
+        await mqtt_client.async_subscribe(topic, listener, 0)
+
+    mqtt_messages = []
+    for i in range(messages):
+        msg = MQTTMessage(topic=f"zigbee2mqtt/device_{(i * 2 + 1) % 5000}".encode())
+        msg.payload = b'{"state": "ON"}'
+        mqtt_messages.append(msg)
+
+    start = timer()
+
+    for msg in mqtt_messages:
+        # pylint: disable=protected-access
+        mqtt_client._mqtt_handle_message(msg)
+
+    await event.wait()
+
+    return timer() - start
+
+
+@benchmark
+async def websocket_state_changed_fanout(hass):
+    """Write 10k state changes to 1 up to 50 subscribed websocket clients."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.auth.models import User
+    from homeassistant.components.websocket_api import commands
+    from homeassistant.components.websocket_api.connection import ActiveConnection
+
+    writes = 10 ** 4
+    user = User(name="Benchmark", perm_lookup=None, is_owner=True, is_active=True)
+    logger = logging.getLogger(__name__)
+
+    def send_message(message):
+        """Serialize like the websocket writer does."""
+        if not isinstance(message, str):
+            JSON_DUMP(message)
+
+    total = 0
+    for clients in (1, 5, 10, 25, 50):
+        connections = [
+            ActiveConnection(logger, hass, send_message, user, None)
+            for _ in range(clients)
+        ]
+        for connection in connections:
+            commands.handle_subscribe_events(
+                hass,
+                connection,
+                {
+                    "id": 1,
+                    "type": "subscribe_events",
+                    "event_type": EVENT_STATE_CHANGED,
+                },
+            )
+
+        start = timer()
+        for i in range(writes):
+            hass.states.async_set(
+                "sensor.power",
+                i,
+                {"unit_of_measurement": "W", "friendly_name": "Power"},
+            )
+        await hass.async_block_till_done()
+        runtime = timer() - start
+        total += runtime
+
+        print(f"{clients} clients: {writes / runtime:.0f} state writes/s")
+
+        for connection in connections:
+            for unsub in connection.subscriptions.values():
+                unsub()
+
+    return total
+
+
+@benchmark
+async def static_file_requests(hass):
+    """Request a frontend bundle 1000 times with different request headers."""
+    # pylint: disable=import-outside-toplevel
+    import gzip
+    from pathlib import Path
+    from tempfile import TemporaryDirectory
+
+    from aiohttp import web
+    from aiohttp.test_utils import TestClient, TestServer
+
+    from homeassistant.components.http.static import CachingStaticResource
+
+    requests = 1000
+    bundle = b"".join(
+        f"function component{i}(){{return {i};}}\n".encode() for i in range(50000)
+    )
+
+    with TemporaryDirectory() as tmp_dir:
+        Path(tmp_dir, "app.js").write_bytes(bundle)
+        Path(tmp_dir, "app.js.gz").write_bytes(gzip.compress(bundle))
+
+        app = web.Application()
+        app.router.register_resource(CachingStaticResource("/static", tmp_dir))
+        client = TestClient(TestServer(app), auto_decompress=False)
+        await client.start_server()
+
+        resp = await client.get("/static/app.js")
+        etag = resp.headers["ETag"]
+
+        total = 0
+        for description, headers in (
+            ("uncompressed", {"Accept-Encoding": ""}),
+            ("gzip", {"Accept-Encoding": "gzip"}),
+            ("not modified", {"Accept-Encoding": "gzip", "If-None-Match": etag}),
+        ):
+            received = 0
+            start = timer()
+            for _ in range(requests):
+                resp = await client.get("/static/app.js", headers=headers)
+                received += len(await resp.read())
+            runtime = timer() - start
+            total += runtime
+
+            print(
+                f"{description}: {requests / runtime:.0f} requests/s, "
+                f"{received / requests / 1024:.0f} KiB per request"
+            )
+
+        await client.close()
+
+    return total
+
+
 def _create_state_changed_event_from_old_new(
     entity_id, event_time_fired, old_state, new_state
 ):
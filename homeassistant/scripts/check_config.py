@@ -5,11 +5,12 @@ from collections.abc import Mapping, Sequence
 from glob import glob
 import logging
 import os
-from typing import Any, Callable, Dict, List, Tuple
+from timeit import default_timer as timer
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from unittest.mock import patch
 
 from homeassistant import bootstrap, core
-from homeassistant.config import get_default_config_dir
+from homeassistant.config import YAML_CONFIG_FILE, get_default_config_dir
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.check_config import async_check_ha_config_file
 import homeassistant.util.yaml.loader as yaml_loader
@@ -71,6 +72,12 @@ def run(script_args: List) -> int:
     parser.add_argument(
         "-s", "--secrets", action="store_true", help="Show secret information"
     )
+    parser.add_argument(
+        "-t",
+        "--timing",
+        action="store_true",
+        help="Show how long loading the configuration takes",
+    )
 
     args, unknown = parser.parse_known_args()
     if unknown:
@@ -82,6 +89,14 @@ def run(script_args: List) -> int:
 
     res = check(config_dir, args.secrets)
 
+    if args.timing:
+        load_times = measure_load_times(config_dir)
+        if load_times is not None:
+            print(
+                color(C_HEAD, "Configuration loaded"),
+                f"cold in {load_times[0]:.3f}s, warm in {load_times[1]:.3f}s",
+            )
+
     domain_info: List[str] = []
     if args.info:
         domain_info = args.info.split(",")
@@ -194,9 +209,12 @@ def check(config_dir, secrets=False):
     for pat in PATCHES.values():
         pat.start()
 
+    # Ensure every file is loaded through the patched functions
+    yaml_loader.clear_parse_cache()
+
     if secrets:
         # Ensure !secrets point to the patched function
-        yaml_loader.yaml.SafeLoader.add_constructor("!secret", yaml_loader.secret_yaml)
+        yaml_loader.add_constructor("!secret", yaml_loader.secret_yaml)
 
     try:
         hass = core.HomeAssistant()
@@ -222,14 +240,33 @@ def check(config_dir, secrets=False):
             pat.stop()
         if secrets:
             # Ensure !secrets point to the original function
-            yaml_loader.yaml.SafeLoader.add_constructor(
-                "!secret", yaml_loader.secret_yaml
-            )
+            yaml_loader.add_constructor("!secret", yaml_loader.secret_yaml)
         bootstrap.clear_secret_cache()
+        yaml_loader.clear_parse_cache()
 
     return res
 
 
+def measure_load_times(config_dir: str) -> Optional[Tuple[float, float]]:
+    """Return how long loading the configuration takes, cold and warm."""
+    config_path = os.path.join(config_dir, YAML_CONFIG_FILE)
+    times = []
+    yaml_loader.clear_parse_cache()
+    try:
+        for _ in range(2):
+            yaml_loader.clear_secret_cache()
+            start = timer()
+            yaml_loader.load_yaml(config_path)
+            times.append(timer() - start)
+    except (OSError, HomeAssistantError):
+        return None
+    finally:
+        yaml_loader.clear_secret_cache()
+        yaml_loader.clear_parse_cache()
+
+    return times[0], times[1]
+
+
 def line_info(obj, **kwargs):
     """Display line config source."""
     if hasattr(obj, "__config_file__"):
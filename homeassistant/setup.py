@@ -9,6 +9,7 @@ from homeassistant import config as conf_util, core, loader, requirements
 from homeassistant.config import async_notify_setup_error
 from homeassistant.const import EVENT_COMPONENT_LOADED, PLATFORM_FORMAT
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import startup_trace
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.util import dt as dt_util
 
@@ -89,7 +90,12 @@ async def _async_process_dependencies(
         return True
 
     _LOGGER.debug("Dependency %s will wait for %s", integration.domain, list(tasks))
-    results = await asyncio.gather(*tasks.values())
+    with startup_trace.async_get_startup_trace(hass).span(
+        integration.domain,
+        startup_trace.PHASE_WAIT_DEPENDENCIES,
+        dependencies=list(tasks),
+    ):
+        results = await asyncio.gather(*tasks.values())
 
     failed = [
         domain
@@ -139,10 +145,13 @@ async def _async_setup_component(
         log_error(str(err), integration.documentation)
         return False
 
+    trace = startup_trace.async_get_startup_trace(hass)
+
     # Some integrations fail on import because they call functions incorrectly.
     # So we do it before validating config to catch these errors.
     try:
-        component = integration.get_component()
+        with trace.span(domain, startup_trace.PHASE_IMPORT):
+            component = integration.get_component()
     except ImportError as err:
         log_error(f"Unable to import component: {err}", integration.documentation)
         return False
@@ -150,9 +159,10 @@ async def _async_setup_component(
         _LOGGER.exception("Setup failed for %s: unknown error", domain)
         return False
 
-    processed_config = await conf_util.async_process_component_config(
-        hass, config, integration
-    )
+    with trace.span(domain, startup_trace.PHASE_CONFIG):
+        processed_config = await conf_util.async_process_component_config(
+            hass, config, integration
+        )
 
     if processed_config is None:
         log_error("Invalid config.", integration.documentation)
@@ -183,14 +193,18 @@ async def _async_setup_component(
             # This should not be replaced with hass.async_add_executor_job because
             # we don't want to track this task in case it blocks startup.
             task = hass.loop.run_in_executor(
-                None, component.setup, hass, processed_config  # type: ignore
+                None,
+                trace.executor_job(domain, component.setup),  # type: ignore
+                hass,
+                processed_config,
             )
         else:
             log_error("No setup function defined.")
             hass.data[DATA_SETUP_STARTED].pop(domain)
             return False
 
-        result = await asyncio.wait_for(task, SLOW_SETUP_MAX_WAIT)
+        with trace.span(domain, startup_trace.PHASE_SETUP):
+            result = await asyncio.wait_for(task, SLOW_SETUP_MAX_WAIT)
     except asyncio.TimeoutError:
         _LOGGER.error(
             "Setup of %s is taking longer than %s seconds."
@@ -275,7 +289,10 @@ async def async_prepare_setup_platform(
         return None
 
     try:
-        platform = integration.get_platform(domain)
+        with startup_trace.async_get_startup_trace(hass).span(
+            integration.domain, startup_trace.PHASE_IMPORT, platform=domain
+        ):
+            platform = integration.get_platform(domain)
     except ImportError as exc:
         log_error(f"Platform not found ({exc}).")
         return None
@@ -319,9 +336,12 @@ async def async_process_deps_reqs(
         raise HomeAssistantError("Could not set up all dependencies.")
 
     if not hass.config.skip_pip and integration.requirements:
-        await requirements.async_get_integration_with_requirements(
-            hass, integration.domain
-        )
+        with startup_trace.async_get_startup_trace(hass).span(
+            integration.domain, startup_trace.PHASE_REQUIREMENTS
+        ):
+            await requirements.async_get_integration_with_requirements(
+                hass, integration.domain
+            )
 
     processed.add(integration.domain)
 
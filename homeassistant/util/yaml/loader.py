@@ -1,10 +1,26 @@
 """Custom loader."""
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import fnmatch
+import hashlib
+from io import StringIO
 import logging
 import os
+import pickle
 import sys
-from typing import Dict, Iterator, List, TypeVar, Union, overload
+import threading
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    overload,
+)
 
 import yaml
 
@@ -29,10 +45,24 @@ except ImportError:
 JSON_TYPE = Union[List, Dict, str]  # pylint: disable=invalid-name
 DICT_T = TypeVar("DICT_T", bound=Dict)  # pylint: disable=invalid-name
 
+# Number of threads to read the files of a directory include with
+MAX_INCLUDE_WORKERS = 8
+
 _LOGGER = logging.getLogger(__name__)
 __SECRET_CACHE: Dict[str, JSON_TYPE] = {}
 
 
+class ParsedFile(NamedTuple):
+    """A parsed file and what it was parsed from."""
+
+    dependencies: Dict[Tuple, Any]
+    data: bytes
+
+
+__PARSE_CACHE: Dict[str, ParsedFile] = {}
+_LOAD_STATE = threading.local()
+
+
 def clear_secret_cache() -> None:
     """Clear the secret cache.
 
@@ -41,6 +71,14 @@ def clear_secret_cache() -> None:
     __SECRET_CACHE.clear()
 
 
+def clear_parse_cache() -> None:
+    """Clear the cache of parsed files.
+
+    Async friendly.
+    """
+    __PARSE_CACHE.clear()
+
+
 class SafeLineLoader(yaml.SafeLoader):
     """Loader class that keeps track of line numbers."""
 
@@ -52,21 +90,134 @@ class SafeLineLoader(yaml.SafeLoader):
         return node
 
 
+class FastSafeLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):  # type: ignore
+    """Loader class using libyaml when it is available."""
+
+    def __init__(self, stream: StringIO) -> None:
+        """Initialize the loader."""
+        super().__init__(stream)
+        self.name = getattr(stream, "name", "<file>")
+
+
 def load_yaml(fname: str) -> JSON_TYPE:
-    """Load a YAML file."""
+    """Load a YAML file.
+
+    Parsed files are kept until the files, secrets and environment variables
+    they were parsed from change.
+    """
+    cached = __PARSE_CACHE.get(fname)
+    if cached is not None and _dependencies_unchanged(cached.dependencies):
+        _add_dependencies(cached.dependencies)
+        return pickle.loads(cached.data)
+
+    dependencies: Dict[Tuple, Any] = {}
+    stack = _dependency_stack()
+    stack.append(dependencies)
+    try:
+        content = _read_file(fname)
+        dependencies[("file", fname)] = _content_hash(content)
+        result = _parse_yaml(content, fname)
+    finally:
+        stack.pop()
+
+    _add_dependencies(dependencies)
+    if ("volatile",) not in dependencies:
+        __PARSE_CACHE[fname] = ParsedFile(
+            dependencies, pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        )
+    return result
+
+
+def _read_file(fname: str) -> str:
+    """Read a YAML file."""
     try:
         with open(fname, encoding="utf-8") as conf_file:
-            # If configuration file is empty YAML returns None
-            # We convert that to an empty dict
-            return yaml.load(conf_file, Loader=SafeLineLoader) or OrderedDict()
-    except yaml.YAMLError as exc:
-        _LOGGER.error(str(exc))
-        raise HomeAssistantError(exc)
+            return conf_file.read()
     except UnicodeDecodeError as exc:
         _LOGGER.error("Unable to read file %s: %s", fname, exc)
         raise HomeAssistantError(exc)
 
 
+def _parse_yaml(content: str, fname: str) -> JSON_TYPE:
+    """Parse YAML, reporting errors with the pure Python loader."""
+    try:
+        # If configuration file is empty YAML returns None
+        # We convert that to an empty dict
+        return yaml.load(_named_stream(content, fname), Loader=FastSafeLoader) or (
+            OrderedDict()
+        )
+    except yaml.YAMLError:
+        pass
+
+    try:
+        return yaml.load(_named_stream(content, fname), Loader=SafeLineLoader) or (
+            OrderedDict()
+        )
+    except yaml.YAMLError as exc:
+        _LOGGER.error(str(exc))
+        raise HomeAssistantError(exc)
+
+
+def _named_stream(content: str, fname: str) -> StringIO:
+    """Return a stream of content named like the file it was read from."""
+    stream = StringIO(content)
+    setattr(stream, "name", fname)
+    return stream
+
+
+def _content_hash(content: str) -> str:
+    """Return the hash of file contents."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _dependency_stack() -> List[Dict[Tuple, Any]]:
+    """Return the dependencies of the files being loaded by this thread."""
+    stack: Optional[List[Dict[Tuple, Any]]] = getattr(_LOAD_STATE, "stack", None)
+    if stack is None:
+        stack = _LOAD_STATE.stack = []
+    return stack
+
+
+def _add_dependencies(dependencies: Dict[Tuple, Any]) -> None:
+    """Add dependencies to the file being loaded."""
+    stack = _dependency_stack()
+    if stack:
+        stack[-1].update(dependencies)
+
+
+def _add_file_dependency(fname: str) -> None:
+    """Add a file, which may not exist, to the file being loaded."""
+    stack = _dependency_stack()
+    if stack and ("file", fname) not in stack[-1]:
+        stack[-1][("file", fname)] = _file_hash(fname)
+
+
+def _file_hash(fname: str) -> Optional[str]:
+    """Return the hash of a file or None if it can't be read."""
+    try:
+        return _content_hash(_read_file(fname))
+    except (OSError, HomeAssistantError):
+        return None
+
+
+def _dependencies_unchanged(dependencies: Dict[Tuple, Any]) -> bool:
+    """Return if the dependencies of a parsed file are unchanged."""
+    for key, value in dependencies.items():
+        if key[0] == "file":
+            current = _file_hash(key[1])
+        elif key[0] == "dir":
+            current = tuple(_find_files(key[1], key[2]))
+        elif key[0] == "env":
+            current = os.environ.get(key[1])
+        else:
+            return False
+
+        if current != value:
+            return False
+
+    return True
+
+
 @overload
 def _add_reference(
     obj: Union[list, NodeListClass], loader: yaml.SafeLoader, node: yaml.nodes.Node
@@ -130,17 +281,48 @@ def _find_files(directory: str, pattern: str) -> Iterator[str]:
                 yield filename
 
 
+def _load_yaml_files(directory: str, pattern: str) -> Iterator[Tuple[str, JSON_TYPE]]:
+    """Load the files of a directory, reading them in parallel."""
+    fnames = list(_find_files(directory, pattern))
+    _add_dependencies({("dir", directory, pattern): tuple(fnames)})
+    fnames = [fname for fname in fnames if os.path.basename(fname) != SECRET_YAML]
+
+    if len(fnames) < 2:
+        for fname in fnames:
+            yield fname, load_yaml(fname)
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=min(len(fnames), MAX_INCLUDE_WORKERS),
+        thread_name_prefix="YAMLLoader",
+    ) as executor:
+        for fname, (loaded_yaml, dependencies) in zip(
+            fnames, executor.map(_load_yaml_with_dependencies, fnames)
+        ):
+            _add_dependencies(dependencies)
+            yield fname, loaded_yaml
+
+
+def _load_yaml_with_dependencies(fname: str) -> Tuple[JSON_TYPE, Dict[Tuple, Any]]:
+    """Load a YAML file in a worker thread and return what it depends on."""
+    dependencies: Dict[Tuple, Any] = {}
+    stack = _dependency_stack()
+    stack.append(dependencies)
+    try:
+        return load_yaml(fname), dependencies
+    finally:
+        stack.pop()
+
+
 def _include_dir_named_yaml(
     loader: SafeLineLoader, node: yaml.nodes.Node
 ) -> OrderedDict:
     """Load multiple files from directory as a dictionary."""
     mapping: OrderedDict = OrderedDict()
     loc = os.path.join(os.path.dirname(loader.name), node.value)
-    for fname in _find_files(loc, "*.yaml"):
+    for fname, loaded_yaml in _load_yaml_files(loc, "*.yaml"):
         filename = os.path.splitext(os.path.basename(fname))[0]
-        if os.path.basename(fname) == SECRET_YAML:
-            continue
-        mapping[filename] = load_yaml(fname)
+        mapping[filename] = loaded_yaml
     return _add_reference(mapping, loader, node)
 
 
@@ -150,10 +332,7 @@ def _include_dir_merge_named_yaml(
     """Load multiple files from directory as a merged dictionary."""
     mapping: OrderedDict = OrderedDict()
     loc = os.path.join(os.path.dirname(loader.name), node.value)
-    for fname in _find_files(loc, "*.yaml"):
-        if os.path.basename(fname) == SECRET_YAML:
-            continue
-        loaded_yaml = load_yaml(fname)
+    for _, loaded_yaml in _load_yaml_files(loc, "*.yaml"):
         if isinstance(loaded_yaml, dict):
             mapping.update(loaded_yaml)
     return _add_reference(mapping, loader, node)
@@ -164,11 +343,7 @@ def _include_dir_list_yaml(
 ) -> List[JSON_TYPE]:
     """Load multiple files from directory as a list."""
     loc = os.path.join(os.path.dirname(loader.name), node.value)
-    return [
-        load_yaml(f)
-        for f in _find_files(loc, "*.yaml")
-        if os.path.basename(f) != SECRET_YAML
-    ]
+    return [loaded_yaml for _, loaded_yaml in _load_yaml_files(loc, "*.yaml")]
 
 
 def _include_dir_merge_list_yaml(
@@ -177,10 +352,7 @@ def _include_dir_merge_list_yaml(
     """Load multiple files from directory as a merged list."""
     loc: str = os.path.join(os.path.dirname(loader.name), node.value)
     merged_list: List[JSON_TYPE] = []
-    for fname in _find_files(loc, "*.yaml"):
-        if os.path.basename(fname) == SECRET_YAML:
-            continue
-        loaded_yaml = load_yaml(fname)
+    for _, loaded_yaml in _load_yaml_files(loc, "*.yaml"):
         if isinstance(loaded_yaml, list):
             merged_list.extend(loaded_yaml)
     return _add_reference(merged_list, loader, node)
@@ -198,14 +370,14 @@ def _ordered_dict(loader: SafeLineLoader, node: yaml.nodes.MappingNode) -> Order
         try:
             hash(key)
         except TypeError:
-            fname = getattr(loader.stream, "name", "")
+            fname = loader.name
             raise yaml.MarkedYAMLError(
                 context=f'invalid key: "{key}"',
                 context_mark=yaml.Mark(fname, 0, line, -1, None, None),
             )
 
         if key in seen:
-            fname = getattr(loader.stream, "name", "")
+            fname = loader.name
             _LOGGER.warning(
                 'YAML file %s contains duplicate key "%s". ' "Check lines %d and %d.",
                 fname,
@@ -227,6 +399,7 @@ def _construct_seq(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
 def _env_var_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> str:
     """Load environment variables and embed it into the configuration YAML."""
     args = node.value.split()
+    _add_dependencies({("env", args[0]): os.environ.get(args[0])})
 
     # Check for a default value
     if len(args) > 1:
@@ -268,6 +441,7 @@ def secret_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
     """Load secrets and embed it into the configuration YAML."""
     secret_path = os.path.dirname(loader.name)
     while True:
+        _add_file_dependency(os.path.join(secret_path, SECRET_YAML))
         secrets = _load_secret_yaml(secret_path)
 
         if node.value in secrets:
@@ -290,6 +464,7 @@ def secret_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
         pwd = keyring.get_password(_SECRET_NAMESPACE, node.value)
         if pwd:
             _LOGGER.debug("Secret %s retrieved from keyring", node.value)
+            _add_dependencies({("volatile",): True})
             return pwd
 
     global credstash  # pylint: disable=invalid-name, global-statement
@@ -300,6 +475,7 @@ def secret_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
             pwd = credstash.getSecret(node.value, table=_SECRET_NAMESPACE)
             if pwd:
                 _LOGGER.debug("Secret %s retrieved from credstash", node.value)
+                _add_dependencies({("volatile",): True})
                 return pwd
         except credstash.ItemNotFound:
             pass
@@ -310,18 +486,18 @@ def secret_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
     raise HomeAssistantError(f"Secret {node.value} not defined")
 
 
-yaml.SafeLoader.add_constructor("!include", _include_yaml)
-yaml.SafeLoader.add_constructor(
-    yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _ordered_dict
-)
-yaml.SafeLoader.add_constructor(
-    yaml.resolver.BaseResolver.DEFAULT_SEQUENCE_TAG, _construct_seq
-)
-yaml.SafeLoader.add_constructor("!env_var", _env_var_yaml)
-yaml.SafeLoader.add_constructor("!secret", secret_yaml)
-yaml.SafeLoader.add_constructor("!include_dir_list", _include_dir_list_yaml)
-yaml.SafeLoader.add_constructor("!include_dir_merge_list", _include_dir_merge_list_yaml)
-yaml.SafeLoader.add_constructor("!include_dir_named", _include_dir_named_yaml)
-yaml.SafeLoader.add_constructor(
-    "!include_dir_merge_named", _include_dir_merge_named_yaml
-)
+def add_constructor(tag: str, constructor: Any) -> None:
+    """Add a constructor to the loaders."""
+    yaml.SafeLoader.add_constructor(tag, constructor)
+    FastSafeLoader.add_constructor(tag, constructor)
+
+
+add_constructor("!include", _include_yaml)
+add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _ordered_dict)
+add_constructor(yaml.resolver.BaseResolver.DEFAULT_SEQUENCE_TAG, _construct_seq)
+add_constructor("!env_var", _env_var_yaml)
+add_constructor("!secret", secret_yaml)
+add_constructor("!include_dir_list", _include_dir_list_yaml)
+add_constructor("!include_dir_merge_list", _include_dir_merge_list_yaml)
+add_constructor("!include_dir_named", _include_dir_named_yaml)
+add_constructor("!include_dir_merge_named", _include_dir_merge_named_yaml)
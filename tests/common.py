@@ -336,7 +336,9 @@ def mock_component(hass, component):
 def mock_registry(hass, mock_entries=None):
     """Mock the Entity Registry."""
     registry = entity_registry.EntityRegistry(hass)
-    registry.entities = mock_entries or OrderedDict()
+    registry.entities = entity_registry.EntityRegistryItems()
+    for key, entry in (mock_entries or {}).items():
+        registry.entities[key] = entry
 
     hass.data[entity_registry.DATA_REGISTRY] = registry
     return registry
@@ -574,6 +576,8 @@ class MockEntityPlatform(entity_platform.EntityPlatform):
         # Otherwise the constructor will blow up.
         if isinstance(platform, Mock) and isinstance(platform.PARALLEL_UPDATES, Mock):
             platform.PARALLEL_UPDATES = 0
+        if isinstance(platform, Mock) and isinstance(platform.PARALLEL_ADDS, Mock):
+            platform.PARALLEL_ADDS = None
 
         super().__init__(
             hass=hass,
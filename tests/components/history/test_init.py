@@ -6,7 +6,8 @@ import json
 import unittest
 
 from homeassistant.components import history, recorder
-from homeassistant.components.recorder.models import process_timestamp
+from homeassistant.components.recorder.models import Statistics, process_timestamp
+from homeassistant.components.recorder.util import session_scope
 import homeassistant.core as ha
 from homeassistant.helpers.json import JSONEncoder
 from homeassistant.setup import async_setup_component, setup_component
@@ -606,6 +607,27 @@ class TestComponentHistory(unittest.TestCase):
         )
         assert list(hist.keys()) == entity_ids
 
+    def test_get_significant_states_share_attributes(self):
+        """Test states with identical attributes share the decoded attributes."""
+        self.init_recorder()
+        entity_id = "sensor.test"
+        start = dt_util.utcnow() - timedelta(minutes=4)
+
+        for i in range(3):
+            with patch(
+                "homeassistant.components.recorder.dt_util.utcnow",
+                return_value=start + timedelta(minutes=i + 1),
+            ):
+                self.hass.states.set(entity_id, str(i), {"unit": "W"})
+                wait_recording_done(self.hass)
+
+        hist = history.get_significant_states(self.hass, start, entity_ids=[entity_id])
+
+        states = hist[entity_id]
+        assert [state.state for state in states] == ["0", "1", "2"]
+        assert states[0].attributes == {"unit": "W"}
+        assert all(state.attributes is states[0].attributes for state in states)
+
     def test_get_significant_states_only(self):
         """Test significant states when significant_states_only is set."""
         self.init_recorder()
@@ -824,3 +846,53 @@ async def test_fetch_period_api_with_include_order(hass, hass_client):
         params={"filter_entity_id": "non.existing,something.else"},
     )
     assert response.status == 200
+
+
+async def test_fetch_period_api_with_resolution(hass, hass_client):
+    """Test the fetch period view serving downsampled statistics."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(
+        hass, "history", {"history": {"exclude": {"entities": ["sensor.hidden"]}}}
+    )
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+
+    def add_statistics():
+        with session_scope(hass=hass) as session:
+            for entity_id in ("sensor.power", "sensor.hidden"):
+                session.add(
+                    Statistics(
+                        entity_id=entity_id,
+                        start=start,
+                        mean=2.0,
+                        min=1.0,
+                        max=3.0,
+                        last=2.5,
+                        count=4,
+                    )
+                )
+
+    await hass.async_add_executor_job(add_statistics)
+    client = await hass_client()
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}", params={"resolution": "hour"}
+    )
+    assert response.status == 200
+    assert await response.json() == [
+        [
+            {
+                "entity_id": "sensor.power",
+                "start": start.isoformat(),
+                "mean": 2.0,
+                "min": 1.0,
+                "max": 3.0,
+                "last": 2.5,
+            }
+        ]
+    ]
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}", params={"resolution": "day"}
+    )
+    assert response.status == 400
@@ -14,7 +14,10 @@ from homeassistant.components.http.ban import (
     IP_BANS_FILE,
     KEY_BANNED_IPS,
     KEY_FAILED_LOGIN_ATTEMPTS,
+    FailedLoginAttempts,
     IpBan,
+    IpBanIndex,
+    async_save_ip_ban,
     setup_bans,
 )
 from homeassistant.components.http.view import request_handler_factory
@@ -97,6 +100,7 @@ async def test_access_from_supervisor_ip(
         resp = await client.get("/")
         assert resp.status == 401
         assert len(app[KEY_BANNED_IPS]) == bans
+        await hass.async_block_till_done()
         assert m_open.call_count == bans
 
         # second request should be forbidden if banned
@@ -153,6 +157,7 @@ async def test_ip_bans_file_creation(hass, aiohttp_client):
         resp = await client.get("/")
         assert resp.status == 401
         assert len(app[KEY_BANNED_IPS]) == len(BANNED_IPS) + 1
+        await hass.async_block_till_done()
         m_open.assert_called_once_with(hass.config.path(IP_BANS_FILE), "a")
 
         resp = await client.get("/")
@@ -213,3 +218,89 @@ async def test_failed_login_attempts_counter(hass, aiohttp_client):
     resp = await client.get("/auth_true")
     assert resp.status == 200
     assert app[KEY_FAILED_LOGIN_ATTEMPTS][remote_ip] == 2
+
+
+async def test_access_from_banned_network(hass, aiohttp_client):
+    """Test accessing to server from an address in a banned network."""
+    app = web.Application()
+    app["hass"] = hass
+    setup_bans(hass, app, 5)
+    set_real_ip = mock_real_ip(app)
+
+    with patch(
+        "homeassistant.components.http.ban.async_load_ip_bans_config",
+        return_value=[IpBan("10.1.0.0/16"), IpBan("2001:db8::/32")],
+    ):
+        client = await aiohttp_client(app)
+
+    for remote_addr in ["10.1.2.3", "10.1.255.255", "2001:db8::1"]:
+        set_real_ip(remote_addr)
+        resp = await client.get("/")
+        assert resp.status == HTTP_FORBIDDEN
+
+    for remote_addr in ["10.2.0.1", "2001:db9::1"]:
+        set_real_ip(remote_addr)
+        resp = await client.get("/")
+        assert resp.status == 404
+
+
+def test_ip_ban_index():
+    """Test looking up bans in the index."""
+    index = IpBanIndex([IpBan("192.168.1.10"), IpBan("172.16.0.0/12")])
+    assert len(index) == 2
+    assert index.is_banned(ip_address("192.168.1.10"))
+    assert not index.is_banned(ip_address("192.168.1.11"))
+    assert index.is_banned(ip_address("172.31.255.1"))
+    assert not index.is_banned(ip_address("172.32.0.1"))
+    assert not index.is_banned(ip_address("::ffff:c0a8:10a"))
+
+    index.add(IpBan("::1"))
+    assert len(index) == 3
+    assert index.is_banned(ip_address("::1"))
+    assert [str(ip_ban.ip_address) for ip_ban in index] == [
+        "192.168.1.10",
+        "172.16.0.0/12",
+        "::1",
+    ]
+
+
+def test_failed_login_attempts_bounded():
+    """Test the least recently failing addresses are forgotten first."""
+    attempts = FailedLoginAttempts(2)
+    first = ip_address("10.0.0.1")
+    second = ip_address("10.0.0.2")
+    third = ip_address("10.0.0.3")
+
+    assert attempts.increment(first) == 1
+    assert attempts.increment(second) == 1
+    assert attempts.increment(first) == 2
+    assert attempts.increment(third) == 1
+
+    assert second not in attempts
+    assert attempts[first] == 2
+    assert attempts[third] == 1
+
+
+async def test_save_ip_bans_batched(hass, aiohttp_client):
+    """Test bans added together are written to the file at once."""
+    app = web.Application()
+    app["hass"] = hass
+    setup_bans(hass, app, 1)
+
+    with patch(
+        "homeassistant.components.http.ban.async_load_ip_bans_config", return_value=[]
+    ):
+        await aiohttp_client(app)
+
+    m_open = mock_open()
+
+    with patch("homeassistant.components.http.ban.open", m_open, create=True):
+        async_save_ip_ban(hass, app, IpBan("200.201.202.204"))
+        async_save_ip_ban(hass, app, IpBan("200.201.202.205"))
+        assert m_open.call_count == 0
+        await hass.async_block_till_done()
+
+    m_open.assert_called_once_with(hass.config.path(IP_BANS_FILE), "a")
+    written = "".join(call[1][0] for call in m_open().write.mock_calls)
+    assert "200.201.202.204" in written
+    assert "200.201.202.205" in written
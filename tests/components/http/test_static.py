@@ -0,0 +1,114 @@
+"""The tests for http static files."""
+import gzip
+
+from aiohttp import web
+import pytest
+
+from homeassistant.components.http.static import CachingStaticResource
+
+from tests.async_mock import patch
+
+
+@pytest.fixture(name="static_dir")
+def static_dir_fixture(tmp_path):
+    """Create a directory with a script and a gzipped copy."""
+    (tmp_path / "app.js").write_text("console.log('hello');")
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(b"console.log('hello');"))
+    (tmp_path / "style.css").write_text("body {}")
+    return tmp_path
+
+
+@pytest.fixture(name="app")
+def app_fixture(static_dir):
+    """Create an app serving the static directory."""
+    app = web.Application()
+    app.router.register_resource(CachingStaticResource("/static", str(static_dir)))
+    return app
+
+
+@pytest.fixture(name="client")
+async def client_fixture(aiohttp_client, app):
+    """Create a client for the app."""
+    return await aiohttp_client(app)
+
+
+async def test_serve_file(client):
+    """Test serving a file with cache headers and an ETag."""
+    resp = await client.get("/static/style.css", headers={"Accept-Encoding": ""})
+    assert resp.status == 200
+    assert await resp.text() == "body {}"
+    assert resp.headers["Content-Type"] == "text/css"
+    assert resp.headers["Cache-Control"].startswith("public, max-age=")
+    assert "Content-Encoding" not in resp.headers
+    assert resp.headers["ETag"]
+
+
+async def test_serve_precompressed(aiohttp_client, app, static_dir):
+    """Test serving the precompressed file the client accepts."""
+    client = await aiohttp_client(app, auto_decompress=False)
+
+    resp = await client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert resp.status == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Content-Type"].endswith("/javascript")
+    assert gzip.decompress(await resp.read()) == b"console.log('hello');"
+
+    (static_dir / "app.js.br").write_bytes(b"brotli")
+    resp = await client.get("/static/app.js", headers={"Accept-Encoding": "gzip, br"},)
+    assert resp.status == 200
+    assert resp.headers["Content-Encoding"] == "br"
+    assert await resp.read() == b"brotli"
+
+    resp = await client.get("/static/app.js", headers={"Accept-Encoding": ""})
+    assert resp.status == 200
+    assert "Content-Encoding" not in resp.headers
+    assert await resp.text() == "console.log('hello');"
+
+
+async def test_not_modified(client):
+    """Test a matching If-None-Match gets a 304."""
+    resp = await client.get("/static/style.css")
+    etag = resp.headers["ETag"]
+
+    resp = await client.get("/static/style.css", headers={"If-None-Match": etag})
+    assert resp.status == 304
+    assert resp.headers["ETag"] == etag
+    assert await resp.read() == b""
+
+    resp = await client.get(
+        "/static/style.css", headers={"If-None-Match": f'"other", W/{etag}'}
+    )
+    assert resp.status == 304
+
+    resp = await client.get("/static/style.css", headers={"If-None-Match": '"other"'})
+    assert resp.status == 200
+
+
+async def test_metadata_cached(client):
+    """Test files are only resolved again after the cache time."""
+    resource_resolve = CachingStaticResource._resolve
+    calls = []
+
+    def _resolve(self, *args):
+        calls.append(args[1])
+        return resource_resolve(self, *args)
+
+    with patch.object(CachingStaticResource, "_resolve", _resolve):
+        for _ in range(3):
+            resp = await client.get("/static/style.css")
+            assert resp.status == 200
+        assert len(calls) == 1
+
+        with patch("homeassistant.components.http.static.METADATA_CACHE_TIME", -1):
+            resp = await client.get("/static/style.css")
+            assert resp.status == 200
+        assert len(calls) == 2
+
+
+async def test_not_found(client):
+    """Test missing files and paths outside the directory."""
+    resp = await client.get("/static/missing.js")
+    assert resp.status == 404
+
+    resp = await client.get("/static/../../etc/passwd")
+    assert resp.status == 404
@@ -7,7 +7,9 @@ import json
 import logging
 import unittest
 
+from aiohttp import ClientPayloadError
 import pytest
+from sqlalchemy.exc import SQLAlchemyError
 import voluptuous as vol
 
 from homeassistant.components import logbook, recorder, sun
@@ -1843,3 +1845,127 @@ class MockLazyEventPartialState(ha.Event):
     def time_fired_isoformat(self):
         """Time event was fired in utc isoformat."""
         return process_timestamp_to_utc_isoformat(self.time_fired)
+
+
+async def test_logbook_view_streams_chunks(hass, hass_client):
+    """Test the logbook view writes entries in multiple chunks."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    for entity_id in ("switch.one", "switch.two", "switch.three"):
+        hass.states.async_set(entity_id, STATE_OFF)
+        hass.states.async_set(entity_id, STATE_ON)
+    await hass.async_add_job(partial(trigger_db_commit, hass))
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    with patch("homeassistant.components.logbook.ENTRIES_PER_CHUNK", 2), patch(
+        "homeassistant.components.logbook.EVENTS_PER_QUERY", 2
+    ):
+        response = await client.get("/api/logbook")
+    assert response.status == 200
+    assert response.headers["Content-Type"] == "application/json"
+    response_json = await response.json()
+    assert [entry["entity_id"] for entry in response_json] == [
+        "switch.one",
+        "switch.two",
+        "switch.three",
+    ]
+
+
+async def test_logbook_view_query_error(hass, hass_client):
+    """Test a failing query results in an error response."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    with patch(
+        "homeassistant.components.logbook._generate_events_query",
+        side_effect=SQLAlchemyError,
+    ):
+        response = await client.get("/api/logbook")
+    assert response.status == 500
+
+
+async def test_logbook_view_stream_error(hass, hass_client):
+    """Test a query failing after the headers are sent aborts the response."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    for entity_id in ("switch.one", "switch.two", "switch.three"):
+        hass.states.async_set(entity_id, STATE_OFF)
+        hass.states.async_set(entity_id, STATE_ON)
+    await hass.async_add_job(partial(trigger_db_commit, hass))
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    humanify = logbook.humanify
+
+    def fail_after_first_entry(*args):
+        yield next(humanify(*args))
+        raise SQLAlchemyError
+
+    client = await hass_client()
+    with patch("homeassistant.components.logbook.ENTRIES_PER_CHUNK", 1), patch(
+        "homeassistant.components.logbook.humanify", side_effect=fail_after_first_entry,
+    ):
+        response = await client.get("/api/logbook")
+        assert response.status == 200
+        with pytest.raises(ClientPayloadError):
+            await response.read()
+
+
+def test_json_chunks():
+    """Test encoding entries as a JSON array in chunks."""
+    with patch("homeassistant.components.logbook.ENTRIES_PER_CHUNK", 2):
+        chunks = list(logbook._json_chunks({"idx": idx} for idx in range(3)))
+
+    assert chunks == [b'[{"idx": 0},{"idx": 1}', b',{"idx": 2}', b"]"]
+    assert json.loads(b"".join(chunks)) == [{"idx": 0}, {"idx": 1}, {"idx": 2}]
+    assert list(logbook._json_chunks([])) == [b"[]"]
+
+
+async def test_entity_attr_cache(hass):
+    """Test the attribute cache is bounded and forgets changed entities."""
+    entity_attr_cache = logbook.EntityAttributeCache(hass, max_size=1)
+    event = Mock(attributes={})
+
+    hass.states.async_set("light.one", STATE_ON, {"friendly_name": "One"})
+    hass.states.async_set("light.two", STATE_ON, {"friendly_name": "Two"})
+    assert entity_attr_cache.get("light.one", "friendly_name", event) == "One"
+
+    hass.states.async_set("light.one", STATE_ON, {"friendly_name": "New"})
+    assert entity_attr_cache.get("light.one", "friendly_name", event) == "One"
+
+    entity_attr_cache.async_invalidate("light.one")
+    assert entity_attr_cache.get("light.one", "friendly_name", event) == "New"
+
+    # Looking up another entity evicts the least recently used one
+    hass.states.async_set("light.one", STATE_ON, {"friendly_name": "Newer"})
+    assert entity_attr_cache.get("light.two", "friendly_name", event) == "Two"
+    assert entity_attr_cache.get("light.one", "friendly_name", event) == "Newer"
+
+
+async def test_entity_attr_cache_removed_entity(hass):
+    """Test attributes of removed entities are not cached."""
+    entity_attr_cache = logbook.EntityAttributeCache(hass)
+
+    assert (
+        entity_attr_cache.get(
+            "light.gone", "friendly_name", Mock(attributes={"friendly_name": "Old"})
+        )
+        == "Old"
+    )
+    assert (
+        entity_attr_cache.get(
+            "light.gone", "friendly_name", Mock(attributes={"friendly_name": "Older"})
+        )
+        == "Older"
+    )
+
+    hass.states.async_set("light.gone", STATE_ON, {"friendly_name": "Back"})
+    assert entity_attr_cache.get("light.gone", "friendly_name", Mock()) == "Back"
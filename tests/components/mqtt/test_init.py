@@ -17,6 +17,7 @@ from homeassistant.const import (
     TEMP_CELSIUS,
 )
 from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry
 from homeassistant.setup import async_setup_component
 from homeassistant.util.dt import utcnow
@@ -331,6 +332,43 @@ async def test_subscribe_topic(hass, mqtt_mock, calls, record_calls):
     assert len(calls) == 1
 
 
+async def test_subscribe_overlapping_topics(hass, mqtt_mock, calls, record_calls):
+    """Test a message is delivered once to every matching subscription."""
+    unsub_exact = await mqtt.async_subscribe(hass, "test-topic/bier", record_calls)
+    await mqtt.async_subscribe(hass, "test-topic/+", record_calls)
+    await mqtt.async_subscribe(hass, "test-topic/#", record_calls)
+    await mqtt.async_subscribe(hass, "other-topic/#", record_calls)
+
+    async_fire_mqtt_message(hass, "test-topic/bier", "test-payload")
+
+    await hass.async_block_till_done()
+    assert sorted(call[0].subscribed_topic for call in calls) == [
+        "test-topic/#",
+        "test-topic/+",
+        "test-topic/bier",
+    ]
+
+    unsub_exact()
+    calls.clear()
+
+    async_fire_mqtt_message(hass, "test-topic/bier", "test-payload")
+
+    await hass.async_block_till_done()
+    assert sorted(call[0].subscribed_topic for call in calls) == [
+        "test-topic/#",
+        "test-topic/+",
+    ]
+
+
+async def test_unsubscribe_twice(hass, mqtt_mock, record_calls):
+    """Test removing a subscription twice raises."""
+    unsub = await mqtt.async_subscribe(hass, "test-topic", record_calls)
+    unsub()
+
+    with pytest.raises(HomeAssistantError):
+        unsub()
+
+
 async def test_subscribe_deprecated(hass, mqtt_mock):
     """Test the subscription of a topic using deprecated callback signature."""
     calls = []
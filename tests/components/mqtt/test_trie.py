@@ -0,0 +1,68 @@
+"""The tests for the MQTT topic trie."""
+import pytest
+
+from homeassistant.components.mqtt.trie import TopicTrie
+
+
+def test_match_exact_and_wildcards():
+    """Test matching exact topics and wildcard filters."""
+    trie = TopicTrie()
+    trie.add("home/kitchen/temperature", "exact")
+    trie.add("home/+/temperature", "level")
+    trie.add("home/#", "subtree")
+    trie.add("#", "all")
+    trie.add("garden/+", "other")
+
+    assert sorted(trie.match("home/kitchen/temperature")) == [
+        "all",
+        "exact",
+        "level",
+        "subtree",
+    ]
+    assert sorted(trie.match("home/kitchen")) == ["all", "subtree"]
+    assert sorted(trie.match("home")) == ["all", "subtree"]
+    assert sorted(trie.match("garden/pond")) == ["all", "other"]
+    assert trie.match("garden/pond/level") == ["all"]
+
+
+def test_match_empty_levels():
+    """Test single level wildcards match empty levels."""
+    trie = TopicTrie()
+    trie.add("+/+", "level")
+    trie.add("/+", "leading")
+
+    assert sorted(trie.match("/finance")) == ["leading", "level"]
+    assert trie.match("finance") == []
+
+
+def test_wildcards_do_not_match_dollar_topics():
+    """Test wildcards on the first level don't match topics starting with $."""
+    trie = TopicTrie()
+    trie.add("#", "all")
+    trie.add("+/info", "level")
+    trie.add("$SYS/#", "sys")
+
+    assert trie.match("$SYS/info") == ["sys"]
+    assert trie.match("$SYS") == ["sys"]
+
+
+def test_remove():
+    """Test removing items prunes the trie."""
+    trie = TopicTrie()
+    trie.add("home/+/temperature", "first")
+    trie.add("home/+/temperature", "second")
+
+    trie.remove("home/+/temperature", "first")
+    assert trie.has_topic_filter("home/+/temperature")
+    assert trie.match("home/kitchen/temperature") == ["second"]
+
+    trie.remove("home/+/temperature", "second")
+    assert not trie.has_topic_filter("home/+/temperature")
+    assert trie.match("home/kitchen/temperature") == []
+    assert not trie._root.children  # pylint: disable=protected-access
+
+    with pytest.raises(KeyError):
+        trie.remove("home/+/temperature", "second")
+
+    with pytest.raises(KeyError):
+        trie.remove("not/registered", "first")
@@ -8,16 +8,24 @@ import pytest
 from homeassistant.components.recorder import (
     CONFIG_SCHEMA,
     DOMAIN,
+    QUEUE_OVERFLOW_DROP_NEW,
+    QUEUE_OVERFLOW_DROP_OLDEST,
+    PurgeTask,
     Recorder,
     run_information,
     run_information_from_instance,
     run_information_with_session,
 )
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+)
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import MATCH_ALL
-from homeassistant.core import ATTR_NOW, EVENT_TIME_CHANGED, Context, callback
+from homeassistant.core import ATTR_NOW, EVENT_TIME_CHANGED, Context, Event, callback
 from homeassistant.setup import async_setup_component
 from homeassistant.util import dt as dt_util
 
@@ -279,6 +287,8 @@ def test_recorder_setup_failure():
             db_retry_wait=3,
             entity_filter=CONFIG_SCHEMA({DOMAIN: {}}),
             exclude_t=[],
+            max_queue_size=0,
+            queue_overflow=QUEUE_OVERFLOW_DROP_OLDEST,
         )
         rec.start()
         rec.join()
@@ -380,6 +390,155 @@ def test_saving_state_with_serializable_data(hass_recorder, caplog):
     assert "State is not JSON serializable" in caplog.text
 
 
+def test_saving_states_in_one_batch(hass_recorder):
+    """Test state changes written in bulk are chained."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+
+    for idx in range(5):
+        hass.states.set("test.batch", str(idx), {})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States).filter_by(entity_id="test.batch"))
+        assert [state.state for state in states] == ["0", "1", "2", "3", "4"]
+        assert states[0].old_state_id is None
+        for previous, state in zip(states, states[1:]):
+            assert state.old_state_id == previous.state_id
+            assert state.event_id > previous.event_id
+
+        events = {
+            event.event_id: event
+            for event in session.query(Events).filter(
+                Events.event_id.in_([state.event_id for state in states])
+            )
+        }
+        assert len(events) == 5
+        assert all(event.event_type == "state_changed" for event in events.values())
+
+    assert instance.metrics.states_recorded >= 5
+    assert instance.metrics.events_recorded >= 5
+
+
+def test_saving_identical_attributes_once(hass_recorder):
+    """Test identical state attributes are stored once."""
+    hass = hass_recorder()
+
+    for idx in range(3):
+        hass.states.set("test.shared_one", str(idx), {"unit": "W"})
+        hass.states.set("test.shared_two", str(idx), {"unit": "W"})
+    hass.states.set("test.shared_two", "3", {"unit": "kW"})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(
+            session.query(States).filter(
+                States.entity_id.in_(["test.shared_one", "test.shared_two"])
+            )
+        )
+        assert len(states) == 7
+        assert len({state.attributes_id for state in states}) == 2
+        assert all(state.attributes is None for state in states)
+        assert states[-1].to_native().attributes == {"unit": "kW"}
+
+        shared_attrs = {
+            attrs.shared_attrs
+            for attrs in session.query(StateAttributes).filter(
+                StateAttributes.attributes_id.in_(
+                    [state.attributes_id for state in states]
+                )
+            )
+        }
+        assert shared_attrs == {'{"unit": "W"}', '{"unit": "kW"}'}
+
+
+def test_recording_continues_after_flush_error(hass_recorder, caplog):
+    """Test a failed flush rolls back and later events are recorded."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+
+    hass.states.set("test.flush", "before")
+    wait_recording_done(hass)
+
+    # Reusing a stored id makes the next flush fail
+    instance._next_ids["event_id"] = 1
+    hass.states.set("test.flush", "failed")
+    wait_recording_done(hass)
+    assert "Error adding events" in caplog.text
+
+    hass.states.set("test.flush", "after")
+    hass.states.set("test.flush", "again")
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States).filter_by(entity_id="test.flush"))
+        assert [state.state for state in states] == ["before", "after", "again"]
+        # The state chain restarts after the rolled back batch
+        assert states[1].old_state_id is None
+        assert states[2].old_state_id == states[1].state_id
+
+
+def _create_recorder(hass, max_queue_size, queue_overflow):
+    """Create a recorder that is not started."""
+    return Recorder(
+        hass,
+        auto_purge=False,
+        keep_days=7,
+        commit_interval=1,
+        uri="sqlite://",
+        db_max_retries=10,
+        db_retry_wait=3,
+        entity_filter=CONFIG_SCHEMA({DOMAIN: {}}),
+        exclude_t=[],
+        max_queue_size=max_queue_size,
+        queue_overflow=queue_overflow,
+    )
+
+
+def test_queue_overflow_drop_new(hass, caplog):
+    """Test new events are dropped when the queue is full."""
+    rec = _create_recorder(hass, 2, QUEUE_OVERFLOW_DROP_NEW)
+    events = [Event(f"test_{idx}") for idx in range(4)]
+
+    for event in events:
+        rec.event_listener(event)
+
+    assert rec.backlog == 2
+    assert rec.queue.get_nowait() is events[0]
+    assert rec.queue.get_nowait() is events[1]
+    assert rec.metrics.events_dropped == 2
+    assert "The recorder queue reached its maximum size of 2" in caplog.text
+
+
+def test_queue_overflow_drop_oldest(hass):
+    """Test the oldest events are dropped when the queue is full."""
+    rec = _create_recorder(hass, 2, QUEUE_OVERFLOW_DROP_OLDEST)
+    events = [Event(f"test_{idx}") for idx in range(4)]
+
+    for event in events:
+        rec.event_listener(event)
+
+    assert rec.backlog == 2
+    assert rec.queue.get_nowait() is events[2]
+    assert rec.queue.get_nowait() is events[3]
+    assert rec.metrics.events_dropped == 2
+
+
+def test_queue_overflow_keeps_control_items(hass):
+    """Test items controlling the recorder are never dropped."""
+    rec = _create_recorder(hass, 1, QUEUE_OVERFLOW_DROP_OLDEST)
+    time_changed = Event(EVENT_TIME_CHANGED, {ATTR_NOW: dt_util.utcnow()})
+
+    rec.do_adhoc_purge()
+    rec.event_listener(Event("test"))
+    rec.event_listener(time_changed)
+
+    assert rec.backlog == 2
+    assert isinstance(rec.queue.get_nowait(), PurgeTask)
+    assert rec.queue.get_nowait() is time_changed
+    assert rec.metrics.events_dropped == 1
+
+
 def test_run_information(hass_recorder):
     """Ensure run_information returns expected data."""
     before_start_recording = dt_util.utcnow()
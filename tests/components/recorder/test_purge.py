@@ -3,11 +3,23 @@ from datetime import datetime, timedelta
 import json
 import unittest
 
+from sqlalchemy.exc import SQLAlchemyError
+
 from homeassistant.components import recorder
-from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
-from homeassistant.components.recorder.purge import purge_old_data
+from homeassistant.components.recorder.const import (
+    DATA_INSTANCE,
+    EVENT_RECORDER_PURGE_PROGRESS,
+)
+from homeassistant.components.recorder.models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatisticsShortTerm,
+)
+from homeassistant.components.recorder.purge import purge_old_data, purge_pending
 from homeassistant.components.recorder.util import session_scope
+import homeassistant.core as ha
 from homeassistant.util import dt as dt_util
 
 from tests.async_mock import patch
@@ -23,6 +35,10 @@ class TestRecorderPurge(unittest.TestCase):
         init_recorder_component(self.hass)
         self.hass.start()
         self.addCleanup(self.tear_down_cleanup)
+        # Purge the test rows in batches of two
+        patcher = patch("homeassistant.components.recorder.purge.PURGE_BATCH_SIZE", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def tear_down_cleanup(self):
         """Stop everything that was started."""
@@ -142,6 +158,157 @@ class TestRecorderPurge(unittest.TestCase):
             assert finished
             assert states.count() == 2
 
+    def test_purge_unused_state_attributes(self):
+        """Test purging keeps only attributes still used by a state."""
+        now = dt_util.utcnow()
+        eleven_days_ago = now - timedelta(days=11)
+
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            old_attrs = StateAttributes(shared_attrs='{"old": 1}')
+            kept_attrs = StateAttributes(shared_attrs='{"kept": 1}')
+            session.add_all([old_attrs, kept_attrs])
+            session.flush()
+            for timestamp, attrs in (
+                (eleven_days_ago, old_attrs),
+                (eleven_days_ago, kept_attrs),
+                (now, kept_attrs),
+            ):
+                session.add(
+                    States(
+                        entity_id="test.attributes",
+                        domain="test",
+                        state="on",
+                        attributes_id=attrs.attributes_id,
+                        last_changed=timestamp,
+                        last_updated=timestamp,
+                        created=timestamp,
+                    )
+                )
+
+        with session_scope(hass=self.hass) as session:
+            attributes = session.query(StateAttributes)
+            assert attributes.count() == 2
+
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            assert not finished
+            assert attributes.count() == 2
+
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            assert not finished
+            assert [attrs.shared_attrs for attrs in attributes] == ['{"kept": 1}']
+
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            assert finished
+            assert attributes.count() == 1
+
+    def test_purge_short_term_statistics_in_batches(self):
+        """Test short term statistics are purged in batches."""
+        now = dt_util.utcnow()
+
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            for days in (11, 10, 9, 0):
+                session.add(
+                    StatisticsShortTerm(
+                        entity_id="sensor.test",
+                        start=now - timedelta(days=days),
+                        mean=1,
+                    )
+                )
+
+        with session_scope(hass=self.hass) as session:
+            statistics = session.query(StatisticsShortTerm)
+
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            assert not finished
+            assert statistics.count() == 2
+
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            assert not finished
+            assert statistics.count() == 1
+
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            assert finished
+            assert statistics.count() == 1
+
+    def test_purge_reports_progress(self):
+        """Test the progress of a purge is reported with events."""
+        self._add_test_states()
+        self._add_test_events()
+        progress = []
+
+        @ha.callback
+        def progress_listener(event):
+            progress.append(event.data)
+
+        self.hass.bus.listen(EVENT_RECORDER_PURGE_PROGRESS, progress_listener)
+
+        self.hass.services.call("recorder", "purge", service_data={"keep_days": 4})
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+        self.hass.block_till_done()
+
+        assert [(data["deleted"], data["remaining"]) for data in progress] == [
+            (2, 6),
+            (4, 4),
+            (6, 2),
+            (8, 0),
+            (8, 0),
+        ]
+        assert [data["finished"] for data in progress] == [False] * 4 + [True]
+        assert progress[-1]["rows_per_second"] > 0
+        assert self.hass.data[DATA_INSTANCE].purge_progress is None
+
+    def test_purge_failure_keeps_progress(self):
+        """Test a failed batch is reported and the purge resumes later."""
+        instance = self.hass.data[DATA_INSTANCE]
+        self._add_test_states()
+        progress = []
+
+        @ha.callback
+        def progress_listener(event):
+            progress.append(event.data)
+
+        self.hass.bus.listen(EVENT_RECORDER_PURGE_PROGRESS, progress_listener)
+
+        assert not purge_old_data(instance, 4, repack=False)
+        purge_before = instance.purge_progress.purge_before
+
+        with patch(
+            "homeassistant.components.recorder.purge._delete_batch",
+            side_effect=SQLAlchemyError,
+        ):
+            assert purge_old_data(instance, 4, repack=False)
+        self.hass.block_till_done()
+
+        assert progress[-1]["failed"]
+        assert not progress[-1]["finished"]
+        assert progress[-1]["remaining"] == 2
+        assert instance.purge_progress.deleted == 2
+        assert instance.purge_progress.purge_before == purge_before
+
+        assert not purge_old_data(instance, 4, repack=False)
+        assert purge_old_data(instance, 4, repack=False)
+        self.hass.block_till_done()
+
+        assert progress[-1]["finished"]
+        assert not progress[-1]["failed"]
+        assert progress[-1]["deleted"] == 4
+        assert instance.purge_progress is None
+
+    def test_purge_pending(self):
+        """Test detecting a purge that did not complete."""
+        instance = self.hass.data[DATA_INSTANCE]
+        self._add_test_states()
+
+        assert purge_pending(instance, 4)
+        assert not purge_pending(instance, 12)
+
     def test_purge_old_events(self):
         """Test deleting old events."""
         self._add_test_events()
@@ -223,7 +390,6 @@ class TestRecorderPurge(unittest.TestCase):
                 self.hass.services.call("recorder", "purge", service_data=service_data)
                 self.hass.block_till_done()
                 self.hass.data[DATA_INSTANCE].block_till_done()
-                assert (
-                    mock_logger.debug.mock_calls[4][1][0]
-                    == "Vacuuming SQL DB to free space"
+                assert "Vacuuming SQL DB to free space" in (
+                    call[1][0] for call in mock_logger.debug.mock_calls
                 )
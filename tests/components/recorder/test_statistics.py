@@ -0,0 +1,203 @@
+"""The tests for the recorder statistics."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from homeassistant.components.recorder import StatisticsTask, statistics
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.models import Statistics, StatisticsShortTerm
+from homeassistant.components.recorder.util import session_scope
+import homeassistant.core as ha
+from homeassistant.util import dt as dt_util
+
+from .common import wait_recording_done
+
+from tests.common import (
+    get_test_home_assistant,
+    init_recorder_component,
+    mock_state_change_event,
+)
+
+ZERO = datetime(2020, 7, 1, 10, 0, tzinfo=dt_util.UTC)
+
+
+@pytest.fixture
+def hass_recorder():
+    """Home Assistant fixture with in-memory recorder."""
+    hass = get_test_home_assistant()
+
+    def setup_recorder(config=None):
+        """Set up with params."""
+        init_recorder_component(hass, config)
+        hass.start()
+        hass.block_till_done()
+        hass.data[DATA_INSTANCE].block_till_done()
+        return hass
+
+    yield setup_recorder
+    hass.stop()
+
+
+def record_states(hass, entity_id, states):
+    """Record states of an entity at the given points in time."""
+    for point_in_time, state in states:
+        mock_state_change_event(
+            hass,
+            ha.State(
+                entity_id, state, last_changed=point_in_time, last_updated=point_in_time
+            ),
+        )
+    wait_recording_done(hass)
+
+
+def compile_periods(hass, start, periods):
+    """Compile statistics of consecutive 5 minute periods."""
+    instance = hass.data[DATA_INSTANCE]
+    for idx in range(periods):
+        instance.queue.put(StatisticsTask(start + idx * statistics.SHORT_TERM_PERIOD))
+    instance.block_till_done()
+
+
+def test_period_start():
+    """Test rounding down to the start of a period."""
+    point_in_time = datetime(2020, 7, 1, 10, 14, 59, 10, tzinfo=dt_util.UTC)
+    assert statistics.period_start(
+        point_in_time, statistics.SHORT_TERM_PERIOD
+    ) == datetime(2020, 7, 1, 10, 10, tzinfo=dt_util.UTC)
+    assert statistics.period_start(
+        point_in_time, statistics.LONG_TERM_PERIOD
+    ) == datetime(2020, 7, 1, 10, tzinfo=dt_util.UTC)
+
+
+def test_compile_short_term_statistics(hass_recorder):
+    """Test aggregating numeric states of a 5 minute period weighted by time."""
+    hass = hass_recorder()
+    record_states(
+        hass,
+        "sensor.power",
+        [
+            (ZERO, "10"),
+            (ZERO + timedelta(minutes=1), "unavailable"),
+            (ZERO + timedelta(minutes=2), "30"),
+            (ZERO + timedelta(minutes=4), "20"),
+            (ZERO + timedelta(minutes=5), "1000"),
+        ],
+    )
+    record_states(hass, "switch.text", [(ZERO, "on")])
+
+    compile_periods(hass, ZERO, 1)
+
+    with session_scope(hass=hass) as session:
+        rows = [row.to_dict() for row in session.query(StatisticsShortTerm)]
+
+    assert rows == [
+        {
+            "entity_id": "sensor.power",
+            "start": ZERO.isoformat(),
+            "mean": 22.5,
+            "min": 10.0,
+            "max": 30.0,
+            "last": 20.0,
+        }
+    ]
+
+
+def test_compile_statistics_twice(hass_recorder):
+    """Test a period is only compiled once."""
+    hass = hass_recorder()
+    record_states(hass, "sensor.power", [(ZERO, "10")])
+
+    compile_periods(hass, ZERO, 1)
+    compile_periods(hass, ZERO, 1)
+
+    with session_scope(hass=hass) as session:
+        assert session.query(StatisticsShortTerm).count() == 1
+
+
+def test_compile_hourly_statistics(hass_recorder):
+    """Test hourly statistics are compiled after the last period of an hour."""
+    hass = hass_recorder()
+    record_states(
+        hass,
+        "sensor.power",
+        [
+            (ZERO, "10"),
+            (ZERO + timedelta(minutes=1), "20"),
+            (ZERO + timedelta(minutes=30), "60"),
+            (ZERO + timedelta(minutes=59), "5"),
+        ],
+    )
+
+    compile_periods(hass, ZERO, 11)
+    with session_scope(hass=hass) as session:
+        assert session.query(Statistics).count() == 0
+
+    compile_periods(hass, ZERO + 11 * statistics.SHORT_TERM_PERIOD, 1)
+    with session_scope(hass=hass) as session:
+        hourly = statistics.statistics_during_period(
+            session, ZERO, period=statistics.PERIOD_HOUR
+        )
+        short_term = statistics.statistics_during_period(
+            session, ZERO, period=statistics.PERIOD_5MINUTE
+        )
+
+    assert hourly == {
+        "sensor.power": [
+            {
+                "entity_id": "sensor.power",
+                "start": ZERO.isoformat(),
+                "mean": pytest.approx(2335 / 60),
+                "min": 5.0,
+                "max": 60.0,
+                "last": 5.0,
+            }
+        ]
+    }
+    assert [row["mean"] for row in short_term["sensor.power"]] == [18.0] + [
+        20.0
+    ] * 5 + [60.0] * 5 + [49.0]
+
+
+def test_compile_carries_unchanged_states(hass_recorder):
+    """Test entities without state changes in a period keep their value."""
+    hass = hass_recorder()
+    record_states(
+        hass,
+        "sensor.power",
+        [(ZERO, "10"), (ZERO + timedelta(minutes=12), "unavailable")],
+    )
+
+    compile_periods(hass, ZERO, 4)
+
+    with session_scope(hass=hass) as session:
+        short_term = statistics.statistics_during_period(
+            session, ZERO, period=statistics.PERIOD_5MINUTE
+        )
+
+    # Not carried once the entity became unavailable
+    assert [
+        (row["start"], row["mean"], row["last"]) for row in short_term["sensor.power"]
+    ] == [
+        (ZERO.isoformat(), 10.0, 10.0),
+        ((ZERO + timedelta(minutes=5)).isoformat(), 10.0, 10.0),
+        ((ZERO + timedelta(minutes=10)).isoformat(), 10.0, 10.0),
+    ]
+
+
+def test_compile_missed_hourly_statistics(hass_recorder):
+    """Test hours missed by the periodic compile are compiled later."""
+    hass = hass_recorder()
+    record_states(hass, "sensor.power", [(ZERO, "10")])
+
+    # The period ending the hour was never compiled
+    compile_periods(hass, ZERO, 11)
+    compile_periods(hass, ZERO + timedelta(hours=2), 1)
+
+    with session_scope(hass=hass) as session:
+        hourly = statistics.statistics_during_period(
+            session, ZERO, period=statistics.PERIOD_HOUR
+        )
+
+    assert [(row["start"], row["mean"]) for row in hourly["sensor.power"]] == [
+        (ZERO.isoformat(), 10.0)
+    ]
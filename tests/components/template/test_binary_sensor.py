@@ -209,10 +209,10 @@ class TestBinarySensorTemplate(unittest.TestCase):
 
     @mock.patch(
         "homeassistant.components.template.binary_sensor."
-        "BinarySensorTemplate._async_render"
+        "BinarySensorTemplate._async_handle_state_result"
     )
-    def test_match_all(self, _async_render):
-        """Test MATCH_ALL in template."""
+    def test_match_all(self, _async_handle_state_result):
+        """Test a template without entities renders on any state change."""
         with assert_setup_component(1):
             assert setup.setup_component(
                 self.hass,
@@ -230,11 +230,11 @@ class TestBinarySensorTemplate(unittest.TestCase):
         self.hass.block_till_done()
         self.hass.start()
         self.hass.block_till_done()
-        init_calls = len(_async_render.mock_calls)
+        init_calls = len(_async_handle_state_result.mock_calls)
 
         self.hass.states.set("sensor.any_state", "update")
         self.hass.block_till_done()
-        assert len(_async_render.mock_calls) == init_calls
+        assert len(_async_handle_state_result.mock_calls) == init_calls + 1
 
     def test_attributes(self):
         """Test the attributes."""
@@ -555,7 +555,7 @@ async def test_invalid_availability_template_keeps_component_available(hass, cap
 
 
 async def test_no_update_template_match_all(hass, caplog):
-    """Test that we do not update sensors that match on all."""
+    """Test templates without entities are tracked by their result."""
     hass.states.async_set("binary_sensor.test_sensor", "true")
 
     await setup.async_setup_component(
@@ -584,26 +584,7 @@ async def test_no_update_template_match_all(hass, caplog):
     )
     await hass.async_block_till_done()
     assert len(hass.states.async_all()) == 5
-    assert (
-        "Template binary sensor 'all_state' has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the value template"
-    ) in caplog.text
-    assert (
-        "Template binary sensor 'all_icon' has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the icon template"
-    ) in caplog.text
-    assert (
-        "Template binary sensor 'all_entity_picture' has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the entity_picture template"
-    ) in caplog.text
-    assert (
-        "Template binary sensor 'all_attribute' has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the test_attribute template"
-    ) in caplog.text
+    assert "has no entity ids configured to track" not in caplog.text
 
     assert hass.states.get("binary_sensor.all_state").state == "off"
     assert hass.states.get("binary_sensor.all_icon").state == "off"
@@ -618,13 +599,14 @@ async def test_no_update_template_match_all(hass, caplog):
     assert hass.states.get("binary_sensor.all_entity_picture").state == "on"
     assert hass.states.get("binary_sensor.all_attribute").state == "on"
 
+    # The value templates track the state they use
     hass.states.async_set("binary_sensor.test_sensor", "false")
     await hass.async_block_till_done()
 
     assert hass.states.get("binary_sensor.all_state").state == "on"
-    assert hass.states.get("binary_sensor.all_icon").state == "on"
-    assert hass.states.get("binary_sensor.all_entity_picture").state == "on"
-    assert hass.states.get("binary_sensor.all_attribute").state == "on"
+    assert hass.states.get("binary_sensor.all_icon").state == "off"
+    assert hass.states.get("binary_sensor.all_entity_picture").state == "off"
+    assert hass.states.get("binary_sensor.all_attribute").state == "off"
 
     await hass.helpers.entity_component.async_update_entity("binary_sensor.all_state")
     await hass.helpers.entity_component.async_update_entity("binary_sensor.all_icon")
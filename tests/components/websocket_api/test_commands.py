@@ -1,4 +1,6 @@
 """Tests for WebSocket API commands."""
+from datetime import timedelta
+
 from async_timeout import timeout
 
 from homeassistant.components.websocket_api import const
@@ -10,10 +12,12 @@ from homeassistant.components.websocket_api.auth import (
 from homeassistant.components.websocket_api.const import URL
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import polling
 from homeassistant.loader import async_get_integration
 from homeassistant.setup import async_setup_component
 
-from tests.common import async_mock_service
+from tests.async_mock import AsyncMock
+from tests.common import MockModule, async_mock_service, mock_integration
 
 
 async def test_call_service(hass, websocket_client):
@@ -515,3 +519,58 @@ async def test_manifest_get(hass, websocket_client):
     assert msg["type"] == const.TYPE_RESULT
     assert not msg["success"]
     assert msg["error"]["code"] == "not_found"
+
+
+async def test_startup_trace(hass, websocket_client):
+    """Test fetching the startup trace."""
+    mock_integration(hass, MockModule("comp"))
+    assert await async_setup_component(hass, "comp", {})
+
+    await websocket_client.send_json({"id": 5, "type": "startup/trace"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    assert msg["result"]["displayTimeUnit"] == "ms"
+    assert any(
+        event["ph"] == "X" and event["cat"] == "comp"
+        for event in msg["result"]["traceEvents"]
+    )
+
+
+async def test_startup_trace_requires_admin(websocket_client, hass_admin_user):
+    """Test fetching the startup trace without being admin."""
+    hass_admin_user.groups = []
+    await websocket_client.send_json({"id": 5, "type": "startup/trace"})
+
+    msg = await websocket_client.receive_json()
+    assert not msg["success"]
+    assert msg["error"]["code"] == const.ERR_UNAUTHORIZED
+
+
+async def test_polling_stats(hass, websocket_client):
+    """Test fetching the polling statistics."""
+    polling.async_track_polling(hass, "light.demo", AsyncMock(), timedelta(seconds=30))
+
+    await websocket_client.send_json({"id": 5, "type": "polling/stats"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    assert msg["result"] == {
+        "light.demo": {
+            "polls": 0,
+            "overruns": 0,
+            "last_duration": 0.0,
+            "max_duration": 0.0,
+            "average_duration": 0.0,
+        }
+    }
+
+
+async def test_polling_stats_requires_admin(websocket_client, hass_admin_user):
+    """Test fetching the polling statistics without being admin."""
+    hass_admin_user.groups = []
+    await websocket_client.send_json({"id": 5, "type": "polling/stats"})
+
+    msg = await websocket_client.receive_json()
+    assert not msg["success"]
+    assert msg["error"]["code"] == const.ERR_UNAUTHORIZED
@@ -52,6 +52,7 @@ async def test_pending_msg_peak(hass, mock_low_peak, hass_ws_client, caplog):
     # Kill writer task and fill queue past peak
     for _ in range(5):
         instance._to_write.put_nowait(None)
+    await instance._writer_task
 
     # Trigger the peak check
     instance._send_message({})
@@ -0,0 +1,49 @@
+"""Test Websocket API messages module."""
+import json
+
+from homeassistant.components.websocket_api import messages
+from homeassistant.core import Event
+
+from tests.async_mock import patch
+
+
+def test_cached_event_message():
+    """Test an event is serialized once for all subscriptions."""
+    event = Event("test_event", {"hello": "world"})
+
+    with patch(
+        "homeassistant.components.websocket_api.const.JSON_DUMP",
+        side_effect=messages.const.JSON_DUMP,
+    ) as mock_dump:
+        first = messages.cached_event_message(1, event)
+        second = messages.cached_event_message(22, event)
+
+    assert mock_dump.call_count == 1
+
+    first_msg = json.loads(first)
+    second_msg = json.loads(second)
+    assert first_msg["id"] == 1
+    assert second_msg["id"] == 22
+    assert first_msg["type"] == second_msg["type"] == "event"
+    assert first_msg["event"] == second_msg["event"]
+    assert first_msg["event"]["event_type"] == "test_event"
+    assert first_msg["event"]["data"] == {"hello": "world"}
+
+
+def test_cached_event_message_payload_contains_template():
+    """Test only the message id is replaced."""
+    event = Event("test_event", {"value": messages.IDEN_TEMPLATE})
+
+    msg = json.loads(messages.cached_event_message(5, event))
+
+    assert msg["id"] == 5
+    assert msg["event"]["data"] == {"value": messages.IDEN_TEMPLATE}
+
+
+def test_cached_event_message_not_serializable():
+    """Test an event that can't be serialized returns the plain message."""
+    event = Event("test_event", {"value": object()})
+
+    msg = messages.cached_event_message(5, event)
+
+    assert msg == {"id": 5, "type": "event", "event": event}
@@ -8,7 +8,7 @@ import pytest
 from homeassistant.const import UNIT_PERCENTAGE
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
-from homeassistant.helpers import entity_platform, entity_registry
+from homeassistant.helpers import entity_platform, entity_registry, startup_trace
 from homeassistant.helpers.entity import async_generate_entity_id
 from homeassistant.helpers.entity_component import (
     DEFAULT_SCAN_INTERVAL,
@@ -135,7 +135,7 @@ async def test_update_state_adds_entities_with_update_before_add_false(hass):
     assert not ent.update.called
 
 
-@patch("homeassistant.helpers.entity_platform.async_track_time_interval")
+@patch("homeassistant.helpers.entity_platform.async_track_polling")
 async def test_set_scan_interval_via_platform(mock_track, hass):
     """Test the setting of the scan interval via platform."""
 
@@ -154,7 +154,7 @@ async def test_set_scan_interval_via_platform(mock_track, hass):
 
     await hass.async_block_till_done()
     assert mock_track.called
-    assert timedelta(seconds=30) == mock_track.call_args[0][2]
+    assert timedelta(seconds=30) == mock_track.call_args[0][3]
 
 
 async def test_adding_entities_with_generator_and_thread_callback(hass):
@@ -910,3 +910,115 @@ async def test_invalid_entity_id(hass):
         await platform.async_add_entities([entity])
     assert entity.hass is None
     assert entity.platform is None
+
+
+async def test_states_written_after_entities_added(hass):
+    """Test states are written once all entities of a batch are added."""
+    platform = MockEntityPlatform(hass)
+    written_early = []
+
+    class AddedEntity(MockEntity):
+        async def async_added_to_hass(self):
+            await asyncio.sleep(0)
+            written_early.append(hass.states.get(self.entity_id) is not None)
+
+    entities = [AddedEntity(name=f"entity {idx}") for idx in range(3)]
+    await platform.async_add_entities(entities)
+
+    assert written_early == [False, False, False]
+    assert len(hass.states.async_entity_ids()) == 3
+
+
+async def test_parallel_adds_with_constant(hass):
+    """Test PARALLEL_ADDS limits how many entities are added at once."""
+    platform = MockEntityPlatform(hass, platform=Mock(PARALLEL_ADDS=2))
+    current = 0
+    peak = 0
+
+    class AddedEntity(MockEntity):
+        async def async_added_to_hass(self):
+            nonlocal current, peak
+            current += 1
+            peak = max(peak, current)
+            await asyncio.sleep(0)
+            current -= 1
+
+    await platform.async_add_entities(
+        [AddedEntity(name=f"entity {idx}") for idx in range(5)]
+    )
+
+    assert peak == 2
+    assert len(hass.states.async_entity_ids()) == 5
+
+
+async def test_entity_ids_claimed_across_platforms(hass):
+    """Test platforms adding at the same time do not pick the same entity ID."""
+    platform1 = MockEntityPlatform(hass, platform_name="platform_1")
+    platform2 = MockEntityPlatform(hass, platform_name="platform_2")
+
+    class AddedEntity(MockEntity):
+        async def async_added_to_hass(self):
+            await asyncio.sleep(0)
+
+    entity1 = AddedEntity(name="kitchen")
+    entity2 = AddedEntity(name="kitchen")
+    await asyncio.gather(
+        platform1.async_add_entities([entity1]),
+        platform2.async_add_entities([entity2]),
+    )
+
+    assert entity1.entity_id == "test_domain.kitchen"
+    assert entity2.entity_id == "test_domain.kitchen_2"
+    assert hass.data[entity_platform.DATA_PENDING_ENTITY_IDS] == {}
+
+
+async def test_failing_entity_does_not_block_batch(hass):
+    """Test an entity failing to be added does not stop the others."""
+    platform = MockEntityPlatform(hass)
+
+    class FailingEntity(MockEntity):
+        async def async_added_to_hass(self):
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await platform.async_add_entities(
+            [MockEntity(name="first"), FailingEntity(name="fail"), MockEntity()]
+        )
+
+    assert hass.states.get("test_domain.first") is not None
+    assert hass.states.get("test_domain.fail") is None
+    assert hass.states.get("test_domain.unnamed_device") is not None
+
+
+async def test_add_entities_traced(hass):
+    """Test adding entities is recorded in the startup trace."""
+    platform = MockEntityPlatform(hass)
+    await platform.async_add_entities([MockEntity(), MockEntity()])
+
+    span = startup_trace.async_get_startup_trace(hass).spans[-1]
+    assert span.domain == PLATFORM
+    assert span.phase == startup_trace.PHASE_ADD_ENTITIES
+    assert span.args["platform"] == DOMAIN
+    assert span.args["entities"] == 2
+    assert span.args["entities_per_second"] > 0
+
+
+async def test_polling_batches_sync_updates(hass):
+    """Test sync entities are updated from a single executor job."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=20))
+    updates = []
+
+    entities = [MockEntity(should_poll=True, name=f"ent {idx}") for idx in range(3)]
+    for entity in entities:
+        entity.update = lambda entity=entity: updates.append(entity)
+
+    await component.async_add_entities(entities)
+
+    with patch.object(
+        hass, "async_add_executor_job", wraps=hass.async_add_executor_job
+    ) as mock_executor:
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+        await hass.async_block_till_done()
+
+    assert mock_executor.call_count == 1
+    assert updates == entities
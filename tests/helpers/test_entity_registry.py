@@ -285,6 +285,20 @@ def test_async_get_entity_id(registry):
     assert registry.async_get_entity_id("light", "hue", "123") is None
 
 
+def test_async_get_entity_id_follows_updates(registry):
+    """Test that the unique ID lookup follows renames and removals."""
+    entry = registry.async_get_or_create("light", "hue", "1234")
+    registry.async_update_entity(entry.entity_id, new_entity_id="light.kitchen")
+    assert registry.async_get_entity_id("light", "hue", "1234") == "light.kitchen"
+
+    registry.async_update_entity("light.kitchen", new_unique_id="5678")
+    assert registry.async_get_entity_id("light", "hue", "1234") is None
+    assert registry.async_get_entity_id("light", "hue", "5678") == "light.kitchen"
+
+    registry.async_remove("light.kitchen")
+    assert registry.async_get_entity_id("light", "hue", "5678") is None
+
+
 async def test_updating_config_entry_id(hass, registry, update_events):
     """Test that we update config entry id in registry."""
     mock_config_1 = MockConfigEntry(domain="light", entry_id="mock-id-1")
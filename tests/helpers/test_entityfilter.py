@@ -248,3 +248,29 @@ def test_filter_schema_include_exclude():
     }
     filt = INCLUDE_EXCLUDE_FILTER_SCHEMA(conf)
     assert filt.config == conf
+
+
+def test_many_globs():
+    """Test all globs are matched when merged into one pattern."""
+    globs = [f"sensor.room_{idx}_*" for idx in range(100)]
+    testfilter = generate_filter([], [], [], [], globs, ["sensor.room_5_battery"])
+
+    assert testfilter("sensor.room_0_temperature")
+    assert testfilter("sensor.room_99_temperature")
+    assert testfilter("sensor.room_5_humidity")
+    assert not testfilter("sensor.room_5_battery")
+    assert not testfilter("sensor.room_100_temperature")
+    assert not testfilter("light.room_1_ceiling")
+
+
+def test_filter_memoizes_verdict():
+    """Test entity ids are only tested once."""
+    testfilter = generate_filter(["light"], [], [], [], ["sensor.*_power"])
+
+    for _ in range(3):
+        assert testfilter("light.kitchen")
+        assert not testfilter("sensor.kitchen_energy")
+
+    cache_info = testfilter.cache_info()
+    assert cache_info.misses == 2
+    assert cache_info.hits == 4
@@ -1,5 +1,6 @@
 """Test event helpers."""
 # pylint: disable=protected-access
+import asyncio
 from datetime import datetime, timedelta
 
 from astral import Astral
@@ -11,6 +12,7 @@ import homeassistant.core as ha
 from homeassistant.core import callback
 from homeassistant.helpers.event import (
     async_call_later,
+    async_track_domain_state_change_event,
     async_track_point_in_time,
     async_track_point_in_utc_time,
     async_track_same_state,
@@ -19,6 +21,7 @@ from homeassistant.helpers.event import (
     async_track_sunrise,
     async_track_sunset,
     async_track_template,
+    async_track_template_result,
     async_track_time_change,
     async_track_time_interval,
     async_track_utc_time_change,
@@ -86,6 +89,89 @@ async def test_track_point_in_time(hass):
     assert len(runs) == 2
 
 
+async def test_track_point_in_utc_time_order_and_cancel(hass):
+    """Test point in time listeners run once in deadline order."""
+    start = datetime(1986, 7, 9, 12, 0, 0, tzinfo=dt_util.UTC)
+    runs = []
+
+    for delay in (3, 1, 2):
+        async_track_point_in_utc_time(
+            hass,
+            callback(lambda now, delay=delay: runs.append(delay)),
+            start + timedelta(seconds=delay),
+        )
+    unsub = async_track_point_in_utc_time(
+        hass, callback(lambda now: runs.append("cancelled")), start
+    )
+    unsub()
+    unsub()
+
+    _send_time_changed(hass, start + timedelta(seconds=5))
+    await hass.async_block_till_done()
+    assert runs == [1, 2, 3]
+
+    _send_time_changed(hass, start + timedelta(seconds=6))
+    await hass.async_block_till_done()
+    assert runs == [1, 2, 3]
+    assert not hass.bus.async_listeners().get(ha.EVENT_TIME_CHANGED)
+
+
+async def test_track_point_in_utc_time_cancelled_are_removed(hass):
+    """Test cancelled listeners do not pile up in the heap."""
+    start = datetime(1986, 7, 9, 12, 0, 0, tzinfo=dt_util.UTC)
+    runs = []
+
+    async_track_point_in_utc_time(hass, callback(lambda now: runs.append(now)), start)
+    for i in range(100):
+        async_track_point_in_utc_time(
+            hass, callback(lambda now: runs.append(now)), start + timedelta(seconds=i)
+        )()
+
+    assert len(hass.data["track_point_in_time_timers"]._heap) <= 2
+
+    _send_time_changed(hass, start)
+    await hass.async_block_till_done()
+    assert runs == [start]
+
+
+async def test_track_point_in_utc_time_loop_timer(hass):
+    """Test point in time listeners run at their deadline without ticks."""
+    runs = []
+    point_in_time = dt_util.utcnow() + timedelta(seconds=0.05)
+
+    async_track_point_in_utc_time(
+        hass, callback(lambda now: runs.append(now)), point_in_time
+    )
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+    assert len(runs) == 1
+    assert runs[0] >= point_in_time
+
+
+async def test_track_point_in_utc_time_clock_rollback(hass):
+    """Test the loop timer rearms if the wall clock was set back."""
+    runs = []
+    now = dt_util.utcnow()
+    point_in_time = now + timedelta(seconds=0.05)
+
+    async_track_point_in_utc_time(
+        hass, callback(lambda now: runs.append(now)), point_in_time
+    )
+    with patch(
+        "homeassistant.helpers.event.dt_util.utcnow",
+        return_value=now - timedelta(seconds=10),
+    ):
+        await asyncio.sleep(0.1)
+        await hass.async_block_till_done()
+        assert runs == []
+
+    # Jumping the clock forward runs the listener on the next tick
+    _send_time_changed(hass, point_in_time)
+    await hass.async_block_till_done()
+    assert runs == [point_in_time]
+
+
 async def test_track_state_change(hass):
     """Test track_state_change."""
     # 2 lists to track how often our callbacks get called
@@ -257,6 +343,52 @@ async def test_async_track_state_change_event(hass):
     unsub_throws()
 
 
+async def test_async_track_domain_state_change_event(hass):
+    """Test async_track_domain_state_change_event."""
+    light_events = []
+    all_events = []
+
+    @ha.callback
+    def light_callback(event):
+        light_events.append(event)
+
+    @ha.callback
+    def any_callback(event):
+        all_events.append(event)
+
+    unsub_light = async_track_domain_state_change_event(hass, ["Light"], light_callback)
+    unsub_any = async_track_domain_state_change_event(
+        hass, ["light", "switch"], any_callback
+    )
+
+    hass.states.async_set("light.bowl", "on")
+    hass.states.async_set("switch.kitchen", "on")
+    hass.states.async_set("sensor.power", "5")
+    await hass.async_block_till_done()
+    assert [event.data["entity_id"] for event in light_events] == ["light.bowl"]
+    assert [event.data["entity_id"] for event in all_events] == [
+        "light.bowl",
+        "switch.kitchen",
+    ]
+
+    # State changes in other domains do not create a job
+    with patch.object(hass, "async_add_job") as mock_add_job:
+        hass.states.async_set("sensor.power", "6")
+    assert not mock_add_job.called
+
+    unsub_light()
+    hass.states.async_set("light.bowl", "off")
+    await hass.async_block_till_done()
+    assert len(light_events) == 1
+    assert len(all_events) == 3
+
+    unsub_any()
+    hass.states.async_set("light.bowl", "on")
+    await hass.async_block_till_done()
+    assert len(all_events) == 3
+    assert "track_domain_state_change_listener" not in hass.data
+
+
 async def test_track_template(hass):
     """Test tracking template."""
     specific_runs = []
@@ -324,6 +456,131 @@ async def test_track_template(hass):
     assert len(wildercard_runs) == 2
 
 
+async def test_track_template_result_domain(hass):
+    """Test a template iterating a domain only tracks that domain."""
+    hass.states.async_set("sensor.one", "on")
+    hass.states.async_set("light.one", "on")
+    results = []
+
+    @ha.callback
+    def result_callback(event, result):
+        results.append((event.data["entity_id"], result))
+
+    template = Template(
+        "{{ states.sensor | selectattr('state', 'eq', 'on') | list | count }}", hass
+    )
+    unsub = async_track_template_result(hass, template, result_callback)
+
+    hass.states.async_set("light.one", "off")
+    hass.states.async_set("light.two", "on")
+    await hass.async_block_till_done()
+    assert results == []
+
+    hass.states.async_set("sensor.one", "off")
+    await hass.async_block_till_done()
+    assert results == [("sensor.one", "0")]
+
+    hass.states.async_set("sensor.two", "on")
+    await hass.async_block_till_done()
+    assert results[-1] == ("sensor.two", "1")
+
+    hass.states.async_remove("sensor.one")
+    await hass.async_block_till_done()
+    assert results[-1] == ("sensor.one", "1")
+    assert len(results) == 3
+
+    unsub()
+    hass.states.async_set("sensor.two", "off")
+    await hass.async_block_till_done()
+    assert len(results) == 3
+    assert "track_domain_state_change_listener" not in hass.data
+
+
+async def test_track_template_result_domain_count(hass):
+    """Test counting a domain only tracks entities being added or removed."""
+    hass.states.async_set("sensor.one", "on")
+    results = []
+
+    @ha.callback
+    def result_callback(event, result):
+        results.append(result)
+
+    async_track_template_result(
+        hass, Template("{{ states.sensor | count }}", hass), result_callback
+    )
+
+    hass.states.async_set("sensor.one", "off")
+    await hass.async_block_till_done()
+    assert results == []
+
+    hass.states.async_set("sensor.two", "on")
+    await hass.async_block_till_done()
+    assert results == ["2"]
+
+
+async def test_track_template_result_all_states_rate_limit(hass):
+    """Test templates iterating all states are rate limited."""
+    results = []
+
+    @ha.callback
+    def result_callback(event, result):
+        results.append(result)
+
+    now = dt_util.utcnow()
+    with patch("homeassistant.helpers.event.dt_util.utcnow", return_value=now):
+        async_track_template_result(
+            hass, Template("{{ states | count }}", hass), result_callback
+        )
+        hass.states.async_set("sensor.one", "on")
+        hass.states.async_set("light.one", "on")
+        await hass.async_block_till_done()
+    assert results == []
+
+    async_fire_time_changed(hass, now + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert results == ["2"]
+
+    with patch(
+        "homeassistant.helpers.event.dt_util.utcnow",
+        return_value=now + timedelta(seconds=5),
+    ):
+        hass.states.async_set("light.two", "on")
+        await hass.async_block_till_done()
+    assert results == ["2", "3"]
+
+
+async def test_track_template_result_dependencies_change(hass):
+    """Test the tracked entities follow the last render."""
+    hass.states.async_set("input_boolean.switch", "off")
+    hass.states.async_set("sensor.one", "1")
+    hass.states.async_set("sensor.two", "2")
+    results = []
+
+    @ha.callback
+    def result_callback(event, result):
+        results.append(result)
+
+    template = Template(
+        "{{ states('sensor.two') if is_state('input_boolean.switch', 'on') "
+        "else states('sensor.one') }}",
+        hass,
+    )
+    async_track_template_result(hass, template, result_callback)
+
+    hass.states.async_set("sensor.two", "3")
+    await hass.async_block_till_done()
+    assert results == []
+
+    hass.states.async_set("input_boolean.switch", "on")
+    await hass.async_block_till_done()
+    assert results == ["3"]
+
+    hass.states.async_set("sensor.one", "4")
+    hass.states.async_set("sensor.two", "5")
+    await hass.async_block_till_done()
+    assert results == ["3", "5"]
+
+
 async def test_track_same_state_simple_trigger(hass):
     """Test track_same_change with trigger simple."""
     thread_runs = []
@@ -893,6 +1150,146 @@ async def test_periodic_task_leaving_dst(hass):
     unsub()
 
 
+async def test_periodic_task_entering_dst_hourly(hass):
+    """Test an hourly task skips the hour missing when entering dst."""
+    timezone = dt_util.get_time_zone("Europe/Vienna")
+    dt_util.set_default_time_zone(timezone)
+    runs = []
+
+    unsub = async_track_time_change(hass, runs.append, minute=30, second=0)
+
+    _send_time_changed(hass, timezone.localize(datetime(2018, 3, 25, 1, 0, 0)))
+    await hass.async_block_till_done()
+    assert runs == []
+
+    _send_time_changed(hass, timezone.localize(datetime(2018, 3, 25, 1, 30, 0)))
+    await hass.async_block_till_done()
+    assert len(runs) == 1
+
+    # 2:30 does not exist, local time jumps from 1:59:59 to 3:00:00
+    _send_time_changed(hass, timezone.localize(datetime(2018, 3, 25, 3, 0, 0)))
+    await hass.async_block_till_done()
+    assert len(runs) == 1
+
+    _send_time_changed(hass, timezone.localize(datetime(2018, 3, 25, 3, 30, 0)))
+    await hass.async_block_till_done()
+    assert len(runs) == 2
+    assert runs[-1].hour == 3
+    assert runs[-1].minute == 30
+
+    unsub()
+
+
+async def test_periodic_task_leaving_dst_hourly(hass):
+    """Test an hourly task runs in both repeated hours when leaving dst."""
+    timezone = dt_util.get_time_zone("Europe/Vienna")
+    dt_util.set_default_time_zone(timezone)
+    runs = []
+
+    unsub = async_track_time_change(hass, runs.append, minute=30, second=0)
+
+    _send_time_changed(
+        hass, timezone.localize(datetime(2018, 10, 28, 2, 0, 0), is_dst=True)
+    )
+    await hass.async_block_till_done()
+    assert runs == []
+
+    for is_dst in (True, False):
+        # The wall clock is the same, the UTC time an hour apart
+        _send_time_changed(
+            hass, timezone.localize(datetime(2018, 10, 28, 2, 30, 0), is_dst=is_dst)
+        )
+        await hass.async_block_till_done()
+
+    assert len(runs) == 2
+    assert runs[1] - runs[0] == timedelta(hours=1)
+
+    _send_time_changed(hass, timezone.localize(datetime(2018, 10, 28, 3, 0, 0)))
+    await hass.async_block_till_done()
+    assert len(runs) == 2
+
+    unsub()
+
+
+async def test_periodic_task_time_zone_change(hass):
+    """Test local tasks are armed again when the time zone changes."""
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/Vienna"))
+    runs = []
+
+    unsub = async_track_time_change(hass, runs.append, hour=12, minute=0, second=0)
+
+    _send_time_changed(hass, datetime(2018, 6, 1, 9, 0, 0, tzinfo=dt_util.UTC))
+    await hass.async_block_till_done()
+
+    # Noon in Vienna is 10:00 UTC, in New York 16:00 UTC
+    dt_util.set_default_time_zone(dt_util.get_time_zone("America/New_York"))
+    hass.bus.async_fire(ha.EVENT_CORE_CONFIG_UPDATE)
+    await hass.async_block_till_done()
+
+    _send_time_changed(hass, datetime(2018, 6, 1, 10, 0, 0, tzinfo=dt_util.UTC))
+    await hass.async_block_till_done()
+    assert runs == []
+
+    _send_time_changed(hass, datetime(2018, 6, 1, 16, 0, 0, tzinfo=dt_util.UTC))
+    await hass.async_block_till_done()
+    assert len(runs) == 1
+
+    unsub()
+
+
+async def test_periodic_task_clock_jumps_forward(hass):
+    """Test a task runs once when the clock jumps past several matches."""
+    runs = []
+
+    unsub = async_track_utc_time_change(hass, runs.append, minute=0, second=0)
+
+    _send_time_changed(hass, datetime(2014, 5, 24, 12, 0, 0))
+    await hass.async_block_till_done()
+    assert len(runs) == 1
+
+    _send_time_changed(hass, datetime(2014, 5, 24, 15, 0, 30))
+    await hass.async_block_till_done()
+    assert len(runs) == 2
+
+    _send_time_changed(hass, datetime(2014, 5, 24, 15, 59, 59))
+    await hass.async_block_till_done()
+    assert len(runs) == 2
+
+    _send_time_changed(hass, datetime(2014, 5, 24, 16, 0, 0))
+    await hass.async_block_till_done()
+    assert len(runs) == 3
+
+    unsub()
+
+
+async def test_periodic_tasks_share_timer(hass):
+    """Test time patterns wait on one shared timer instead of every tick."""
+    runs = []
+    listeners = hass.bus.async_listeners().get(ha.EVENT_TIME_CHANGED, 0)
+
+    unsubs = [
+        async_track_utc_time_change(hass, runs.append, minute=minute, second=0)
+        for minute in range(10)
+    ]
+    assert hass.bus.async_listeners()[ha.EVENT_TIME_CHANGED] == listeners + 1
+
+    now = dt_util.utcnow().replace(minute=0, second=30, microsecond=0)
+    _send_time_changed(hass, now)
+    await hass.async_block_till_done()
+    assert runs == []
+
+    # The first pattern fires from the loop timer without a time changed event
+    with patch("homeassistant.util.dt.utcnow", return_value=now.replace(minute=1)):
+        timers = hass.data["track_point_in_time_timers"]
+        timers._async_expired()
+    await hass.async_block_till_done()
+    assert runs == [now.replace(minute=1)]
+
+    for unsub in unsubs:
+        unsub()
+    assert hass.bus.async_listeners().get(ha.EVENT_TIME_CHANGED, 0) == listeners
+
+
 async def test_call_later(hass):
     """Test calling an action later."""
 
@@ -0,0 +1,121 @@
+"""Test the polling scheduler."""
+# pylint: disable=protected-access
+import asyncio
+from datetime import timedelta
+
+from homeassistant.helpers import polling
+import homeassistant.util.dt as dt_util
+
+from tests.common import async_fire_time_changed
+
+INTERVAL = timedelta(seconds=30)
+
+
+async def test_polls_every_interval(hass):
+    """Test a job is polled every interval until it is removed."""
+    calls = []
+
+    async def poll(now):
+        calls.append(now)
+
+    remove = polling.async_track_polling(hass, "light.demo", poll, INTERVAL)
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
+    await hass.async_block_till_done()
+    assert calls == []
+
+    now = dt_util.utcnow() + INTERVAL
+    async_fire_time_changed(hass, now)
+    await hass.async_block_till_done()
+    assert calls == [now]
+
+    async_fire_time_changed(hass, dt_util.utcnow() + INTERVAL)
+    await hass.async_block_till_done()
+    assert len(calls) == 2
+
+    stats = polling.async_get_polling_stats(hass)["light.demo"]
+    assert stats.polls == 2
+    assert stats.overruns == 0
+    assert stats.max_duration >= stats.last_duration >= 0
+
+    remove()
+    async_fire_time_changed(hass, dt_util.utcnow() + INTERVAL)
+    await hass.async_block_till_done()
+    assert len(calls) == 2
+    assert hass.data[polling.DATA_POLLING_SCHEDULER]._heap == []
+
+
+async def test_phases_are_spread(hass):
+    """Test jobs added together are polled at different phases."""
+
+    async def poll(now):
+        pass
+
+    for idx in range(4):
+        polling.async_track_polling(hass, f"sensor.demo_{idx}", poll, INTERVAL)
+
+    scheduler = hass.data[polling.DATA_POLLING_SCHEDULER]
+    # The first poll is one interval after the job was added
+    assert len({due for due, _, _ in scheduler._heap}) <= 4
+
+    async_fire_time_changed(hass, dt_util.utcnow() + INTERVAL)
+    await hass.async_block_till_done()
+
+    dues = sorted(due for due, _, _ in scheduler._heap)
+    now = dt_util.utcnow()
+    assert all(now < due <= now + INTERVAL for due in dues)
+    gaps = [(later - earlier).total_seconds() for earlier, later in zip(dues, dues[1:])]
+    assert min(gaps) > INTERVAL.total_seconds() / 10
+
+
+async def test_overrun_backs_off(hass, caplog):
+    """Test a job that is still running when due is skipped and backs off."""
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls = 0
+
+    async def poll(now):
+        nonlocal calls
+        calls += 1
+        started.set()
+        await release.wait()
+
+    polling.async_track_polling(hass, "sensor.slow", poll, INTERVAL)
+    scheduler = hass.data[polling.DATA_POLLING_SCHEDULER]
+    stats = polling.async_get_polling_stats(hass)["sensor.slow"]
+
+    try:
+        async_fire_time_changed(hass, dt_util.utcnow() + INTERVAL)
+        await asyncio.wait_for(started.wait(), 1)
+
+        async_fire_time_changed(hass, dt_util.utcnow() + INTERVAL * 2)
+        await asyncio.sleep(0)
+        assert calls == 1
+        assert stats.overruns == 1
+        assert "took longer than the scheduled update interval" in caplog.text
+
+        job = scheduler._heap[0][2]
+        assert job.backoff == 2
+        assert scheduler._heap[0][0] > dt_util.utcnow() + INTERVAL
+    finally:
+        release.set()
+
+    await hass.async_block_till_done()
+    assert stats.polls == 1
+    assert job.backoff == 1
+
+
+async def test_poll_errors_are_logged(hass, caplog):
+    """Test an error while polling does not stop the job."""
+
+    async def poll(now):
+        raise ValueError("boom")
+
+    polling.async_track_polling(hass, "sensor.broken", poll, INTERVAL)
+
+    for _ in range(2):
+        async_fire_time_changed(hass, dt_util.utcnow() + INTERVAL)
+        await hass.async_block_till_done()
+
+    assert polling.async_get_polling_stats(hass)["sensor.broken"].polls == 2
+    assert "Error while polling sensor.broken" in caplog.text
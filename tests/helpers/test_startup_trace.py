@@ -0,0 +1,81 @@
+"""Test the startup trace helper."""
+import time
+
+from homeassistant.helpers import startup_trace
+
+from tests.async_mock import patch
+
+
+async def test_span_records_phase(hass):
+    """Test spans are recorded per integration."""
+    trace = startup_trace.async_get_startup_trace(hass)
+    assert startup_trace.async_get_startup_trace(hass) is trace
+
+    with trace.span("light", startup_trace.PHASE_IMPORT, platform="hue"):
+        pass
+
+    span = trace.spans[-1]
+    assert span.domain == "light"
+    assert span.phase == startup_trace.PHASE_IMPORT
+    assert span.end >= span.start
+    assert span.args == {"platform": "hue"}
+
+
+async def test_spans_are_capped(hass):
+    """Test the trace stops recording after MAX_SPANS."""
+    trace = startup_trace.StartupTrace()
+    with patch.object(startup_trace, "MAX_SPANS", 2):
+        for _ in range(3):
+            trace.add("light", startup_trace.PHASE_SETUP, 1, 2)
+    assert len(trace.spans) == 2
+
+
+async def test_executor_job_records_wait(hass):
+    """Test executor jobs record how long they were queued."""
+    trace = startup_trace.StartupTrace()
+
+    def setup(value):
+        return value * 2
+
+    job = trace.executor_job("demo", setup)
+    assert await hass.async_add_executor_job(job, 21) == 42
+    assert [span.phase for span in trace.spans] == [startup_trace.PHASE_EXECUTOR_WAIT]
+
+
+async def test_as_chrome_trace(hass):
+    """Test exporting the trace in the Chrome trace event format."""
+    trace = startup_trace.StartupTrace()
+    origin = trace.origin
+    trace.add("light", startup_trace.PHASE_IMPORT, origin + 0.5, origin + 0.75)
+    trace.add("switch", startup_trace.PHASE_SETUP, origin + 1, origin + 2, entry="x")
+    trace.add("light", startup_trace.PHASE_SETUP, origin + 1, origin + 1.5)
+
+    exported = trace.as_chrome_trace()
+    assert exported["displayTimeUnit"] == "ms"
+    events = exported["traceEvents"]
+
+    assert [event["ph"] for event in events] == ["M", "X", "M", "X", "X"]
+    assert events[0]["args"] == {"name": "light"}
+    assert events[2]["args"] == {"name": "switch"}
+    assert events[1] == {
+        "name": "import",
+        "cat": "light",
+        "ph": "X",
+        "pid": 1,
+        "tid": 1,
+        "ts": 500000,
+        "dur": 250000,
+        "args": {},
+    }
+    assert events[3]["tid"] == 2
+    assert events[3]["args"] == {"entry": "x"}
+    assert events[4]["tid"] == 1
+    assert events[4]["ts"] == 1000000
+    assert events[4]["dur"] == 500000
+
+
+def test_origin_is_monotonic():
+    """Test the trace origin uses the monotonic clock."""
+    before = time.monotonic()
+    trace = startup_trace.StartupTrace()
+    assert before <= trace.origin <= time.monotonic()
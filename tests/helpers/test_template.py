@@ -80,6 +80,21 @@ def test_template_equality():
         template.Template(["{{ template_one }}"])
 
 
+def test_compiled_template_shared(hass):
+    """Test templates with the same source share the compiled template."""
+    template_one = template.Template("{{ 1 + 1 }}", hass)
+    template_two = template.Template("{{ 1 + 1 }}", hass)
+
+    assert template_one.async_render() == "2"
+    with patch.object(
+        template.TemplateEnvironment, "_generate", side_effect=AssertionError
+    ):
+        assert template_two.async_render() == "2"
+
+    assert template_one._compiled is template_two._compiled
+    assert template.Template("{{ 1 + 2 }}", hass).async_render() == "3"
+
+
 def test_invalid_template(hass):
     """Invalid template raises error."""
     tmpl = template.Template("{{", hass)
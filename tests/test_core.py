@@ -1395,3 +1395,56 @@ async def test_start_events(hass):
         EVENT_HOMEASSISTANT_STARTED,
     ]
     assert core_states == [ha.CoreState.starting, ha.CoreState.running]
+
+
+async def test_event_filter(hass):
+    """Test listeners are only scheduled for events passing the event filter."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event)
+
+    @ha.callback
+    def event_filter(event):
+        """Mock event filter."""
+        return event.data["keep"]
+
+    unsub = hass.bus.async_listen("test", listener, event_filter=event_filter)
+
+    with patch.object(hass, "async_add_job") as mock_add_job:
+        hass.bus.async_fire("test", {"keep": False})
+    assert not mock_add_job.called
+
+    hass.bus.async_fire("test", {"keep": True})
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+
+    unsub()
+    hass.bus.async_fire("test", {"keep": True})
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+
+
+async def test_event_filter_that_throws(hass, caplog):
+    """Test an event filter raising skips only its listener."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event)
+
+    @ha.callback
+    def event_filter(event):
+        """Mock event filter."""
+        raise ValueError
+
+    hass.bus.async_listen("test", listener, event_filter=event_filter)
+    hass.bus.async_listen("test", listener)
+    hass.bus.async_fire("test")
+    await hass.async_block_till_done()
+
+    assert len(calls) == 1
+    assert "Error in event filter" in caplog.text
@@ -1,12 +1,20 @@
 """Test to verify that we can load components."""
+from datetime import timedelta
+
 import pytest
 
 from homeassistant.components import http, hue
 from homeassistant.components.hue import light as hue_light
 import homeassistant.loader as loader
+from homeassistant.util.dt import utcnow
 
 from tests.async_mock import ANY, patch
-from tests.common import MockModule, async_mock_service, mock_integration
+from tests.common import (
+    MockModule,
+    async_fire_time_changed,
+    async_mock_service,
+    mock_integration,
+)
 
 
 async def test_component_dependencies(hass):
@@ -258,3 +266,54 @@ async def test_get_custom_components_safe_mode(hass):
     """Test that we get empty custom components in safe mode."""
     hass.config.safe_mode = True
     assert await loader.async_get_custom_components(hass) == {}
+
+
+async def test_get_integrations(hass):
+    """Test built-in integrations are resolved together."""
+    with patch(
+        "homeassistant.loader._resolve_integrations_from_root",
+        wraps=loader._resolve_integrations_from_root,
+    ) as mock_resolve:
+        integrations = await loader.async_get_integrations(
+            hass, ["http", "hue", "test", "non_existing"]
+        )
+
+    assert mock_resolve.call_count == 1
+    assert sorted(mock_resolve.mock_calls[0][1][2]) == ["http", "hue", "non_existing"]
+    assert integrations["http"].domain == "http"
+    assert integrations["hue"].domain == "hue"
+    assert integrations["test"].pkg_path == "custom_components.test"
+    assert isinstance(integrations["non_existing"], loader.IntegrationNotFound)
+
+    # Missing integrations are not cached, found ones are
+    assert await loader.async_get_integration(hass, "http") is integrations["http"]
+    with pytest.raises(loader.IntegrationNotFound):
+        await loader.async_get_integration(hass, "non_existing")
+
+
+async def test_manifest_index(hass, hass_storage):
+    """Test manifests are stored in an index and read again when changed."""
+    integration = await loader.async_get_integration(hass, "http")
+    manifest_path = str(integration.file_path / "manifest.json")
+    async_fire_time_changed(
+        hass, utcnow() + timedelta(seconds=loader.MANIFEST_INDEX_SAVE_DELAY)
+    )
+    await hass.async_block_till_done()
+
+    stored = hass_storage[loader.MANIFEST_INDEX_KEY]["data"]["manifests"]
+    assert stored[manifest_path]["manifest"]["domain"] == "http"
+    assert "is_built_in" not in stored[manifest_path]["manifest"]
+
+    # A manifest with the same modification time is taken from the index
+    stored[manifest_path]["manifest"]["name"] = "Indexed HTTP"
+    hass.data.pop(loader.DATA_INTEGRATIONS)
+    hass.data.pop(loader.DATA_MANIFEST_INDEX)
+    integration = await loader.async_get_integration(hass, "http")
+    assert integration.name == "Indexed HTTP"
+
+    # A changed manifest is read again
+    stored[manifest_path]["mtime"] -= 1
+    hass.data.pop(loader.DATA_INTEGRATIONS)
+    hass.data.pop(loader.DATA_MANIFEST_INDEX)
+    integration = await loader.async_get_integration(hass, "http")
+    assert integration.name == "HTTP"
@@ -12,7 +12,7 @@ from homeassistant import config_entries, setup
 import homeassistant.config as config_util
 from homeassistant.const import EVENT_COMPONENT_LOADED, EVENT_HOMEASSISTANT_START
 from homeassistant.core import callback
-from homeassistant.helpers import discovery
+from homeassistant.helpers import discovery, startup_trace
 from homeassistant.helpers.config_validation import (
     PLATFORM_SCHEMA,
     PLATFORM_SCHEMA_BASE,
@@ -587,3 +587,26 @@ async def test_parallel_entry_setup(hass):
     await setup.async_setup_component(hass, "comp", {})
 
     assert calls == [1, 2, 1, 2]
+
+
+async def test_setup_records_startup_trace(hass):
+    """Test the phases of setting up an integration are traced."""
+    mock_integration(hass, MockModule("dep"))
+    mock_integration(hass, MockModule("comp", dependencies=["dep"]))
+
+    assert await setup.async_setup_component(hass, "comp", {})
+
+    trace = startup_trace.async_get_startup_trace(hass)
+    phases = {span.phase for span in trace.spans if span.domain == "comp"}
+    assert {
+        startup_trace.PHASE_WAIT_DEPENDENCIES,
+        startup_trace.PHASE_IMPORT,
+        startup_trace.PHASE_CONFIG,
+        startup_trace.PHASE_SETUP,
+    } <= phases
+    wait = next(
+        span
+        for span in trace.spans
+        if span.domain == "comp" and span.phase == startup_trace.PHASE_WAIT_DEPENDENCIES
+    )
+    assert wait.args == {"dependencies": ["dep"]}
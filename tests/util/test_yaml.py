@@ -461,3 +461,73 @@ def test_duplicate_key(caplog):
     with patch_yaml_files(files):
         load_yaml_config_file(YAML_CONFIG_FILE)
     assert "contains duplicate key" in caplog.text
+
+
+def test_load_yaml_line_info(tmp_path):
+    """Test the fast loader keeps the file and line of loaded objects."""
+    fname = str(tmp_path / YAML_CONFIG_FILE)
+    with open(fname, "w") as fp:
+        fp.write("first: 1\nsecond:\n  - item\n")
+
+    doc = yaml.load_yaml(fname)
+    assert doc.__config_file__ == fname
+    assert doc["second"].__config_file__ == fname
+    assert doc["second"].__line__ == 2
+
+
+def test_load_yaml_cached(tmp_path):
+    """Test parsed files are reused until they change."""
+    fname = str(tmp_path / YAML_CONFIG_FILE)
+    with open(fname, "w") as fp:
+        fp.write("key:\n  - value\n")
+
+    with patch.object(
+        yaml_loader, "_parse_yaml", wraps=yaml_loader._parse_yaml
+    ) as mock_parse:
+        first = yaml.load_yaml(fname)
+        first["key"].append("changed")
+        second = yaml.load_yaml(fname)
+        assert mock_parse.call_count == 1
+        assert second == {"key": ["value"]}
+        assert second["key"].__line__ == 1
+
+        with open(fname, "w") as fp:
+            fp.write("key:\n  - other\n")
+        assert yaml.load_yaml(fname) == {"key": ["other"]}
+        assert mock_parse.call_count == 2
+
+
+def test_load_yaml_cached_include_dir(tmp_path):
+    """Test parsed files are parsed again when an included directory changes."""
+    fname = str(tmp_path / YAML_CONFIG_FILE)
+    with open(fname, "w") as fp:
+        fp.write("key: !include_dir_merge_list included\n")
+    (tmp_path / "included").mkdir()
+    (tmp_path / "included" / "one.yaml").write_text("- one\n")
+
+    assert yaml.load_yaml(fname) == {"key": ["one"]}
+
+    (tmp_path / "included" / "two.yaml").write_text("- two\n")
+    assert yaml.load_yaml(fname) == {"key": ["one", "two"]}
+
+    (tmp_path / "included" / "one.yaml").write_text("- three\n")
+    assert yaml.load_yaml(fname) == {"key": ["three", "two"]}
+
+
+def test_load_yaml_cached_env_var_and_secret(tmp_path):
+    """Test parsed files are parsed again when secrets or variables change."""
+    fname = str(tmp_path / YAML_CONFIG_FILE)
+    with open(fname, "w") as fp:
+        fp.write("env: !env_var TEST_YAML_VAR\nsecret: !secret test_secret\n")
+    secrets = tmp_path / yaml.SECRET_YAML
+    secrets.write_text("test_secret: one\n")
+
+    with patch.dict(os.environ, {"TEST_YAML_VAR": "one"}):
+        assert yaml.load_yaml(fname) == {"env": "one", "secret": "one"}
+
+    with patch.dict(os.environ, {"TEST_YAML_VAR": "two"}):
+        assert yaml.load_yaml(fname) == {"env": "two", "secret": "one"}
+
+        secrets.write_text("test_secret: two\n")
+        yaml.clear_secret_cache()
+        assert yaml.load_yaml(fname) == {"env": "two", "secret": "two"}